@@ -1,121 +1,274 @@
 import bpy
+import bpy.utils.previews
 import json
-import urllib.request
-import urllib.parse
-import urllib.error
 import os
 import uuid
-import mimetypes
 import time
-import shutil
+import math
+import fnmatch
+import threading
+import concurrent.futures
+
+from . import preprocess
+from . import mesh_export
+from . import import_dedup
+from . import object_render
+from .core import graph
+from .core.artifact_store import ArtifactStore
+from .core.client import ComfyUIClient, NO_RETRY
+from .core import schema
+from .core.injection import InjectionPlan, image_input_key
+from .core.journal import JobJournal
+from .core.warmup import WarmupTracker
+from .core import hooks
+from .core import team_cache
+from .core.thumbnails import ThumbnailCache, MODEL_EXTS as THUMBNAIL_MODEL_EXTS
+from .src import gen_sound
 
 print("Retexturity Addon v1.4.0 Loaded")
 
 # ------------------------------------------------------------------------
-# ComfyUI API Client (using urllib to avoid external dependencies)
+# Artifact Store
 # ------------------------------------------------------------------------
 
-class ComfyUIClient:
-    def __init__(self, base_url):
-        self.base_url = base_url.rstrip('/')
-        self.client_id = str(uuid.uuid4())
+_artifact_stores = {}
+
+def store_references(store):
+    """Store files still in use: results of finished jobs and images the open file loads from the store"""
+    paths = [job.result_path for _, job in iter_jobs({'DONE', 'IMPORTED'})]
+    prefix = store.root + os.sep
+    for image in bpy.data.images:
+        if image.source != 'FILE' or image.packed_file or not image.filepath:
+            continue
+        path = os.path.abspath(bpy.path.abspath(image.filepath, library=image.library))
+        if path.startswith(prefix):
+            paths.append(path)
+    return paths
+
+def artifact_store_root(prefs):
+    return os.path.abspath(bpy.path.abspath(prefs.output_path))
+
+def get_artifact_store(prefs):
+    """Return the (cached) artifact store rooted at the addon output directory"""
+    root = artifact_store_root(prefs)
+    store = _artifact_stores.get(root)
+    if store is None:
+        store = ArtifactStore(root)
+        _artifact_stores[root] = store
+    return store
 
-    def _request(self, endpoint, method='GET', data=None, headers=None):
-        url = f"{self.base_url}{endpoint}"
-        if headers is None:
-            headers = {}
-        
-        if data is not None and method == 'POST':
-            if headers.get('Content-Type') == 'application/json':
-                data = json.dumps(data).encode('utf-8')
-            elif not isinstance(data, bytes):
-                 # Assume data is already encoded bytes if not json
-                 pass
-
-        req = urllib.request.Request(url, data=data, method=method)
-        
-        for k, v in headers.items():
-            req.add_header(k, v)
 
-        try:
-            with urllib.request.urlopen(req) as response:
-                return response.read()
-        except urllib.error.URLError as e:
-            print(f"ComfyUI Error: {e}")
-            return None
-
-    def check_connection(self):
-        # Simple check to see if server is up, e.g. getting system stats or just root
-        return self._request("/system_stats") is not None
-
-    def queue_prompt(self, prompt, client_id=None):
-        if client_id is None:
-            client_id = self.client_id
-        
-        data = {"prompt": prompt, "client_id": client_id}
-        response = self._request("/prompt", method='POST', data=data, headers={'Content-Type': 'application/json'})
-        if response:
-            return json.loads(response)
-        return None
+# ------------------------------------------------------------------------
+# Team Cache
+# ------------------------------------------------------------------------
+# Optional directory shared by several workstations. Generate looks up the
+# key of the prompt it is about to queue there first, and finished results
+# are published back from a background thread.
 
-    def upload_image(self, filepath, subfolder="", folder_type="input"):
-        # Multipart form data upload implementation using urllib
-        if not os.path.exists(filepath):
-            print(f"File not found: {filepath}")
-            return None
+_team_caches = {}
 
-        boundary = '----WebKitFormBoundary' + uuid.uuid4().hex
-        headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
-        
-        filename = os.path.basename(filepath)
-        mime_type = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
-        
-        with open(filepath, 'rb') as f:
-            file_content = f.read()
-
-        body = []
-        # Image part
-        body.append(f'--{boundary}'.encode('utf-8'))
-        body.append(f'Content-Disposition: form-data; name="image"; filename="{filename}"'.encode('utf-8'))
-        body.append(f'Content-Type: {mime_type}'.encode('utf-8'))
-        body.append(b'')
-        body.append(file_content)
-        
-        # Other fields
-        if subfolder:
-            body.append(f'--{boundary}'.encode('utf-8'))
-            body.append(b'Content-Disposition: form-data; name="subfolder"')
-            body.append(b'')
-            body.append(subfolder.encode('utf-8'))
-            
-        body.append(f'--{boundary}'.encode('utf-8'))
-        body.append(b'Content-Disposition: form-data; name="type"')
-        body.append(b'')
-        body.append(folder_type.encode('utf-8'))
-        
-        body.append(f'--{boundary}--'.encode('utf-8'))
-        body.append(b'')
-        
-        payload = b'\r\n'.join(body)
-        
-        response = self._request("/upload/image", method='POST', data=payload, headers=headers)
-        if response:
-            return json.loads(response)
+def get_team_cache(prefs):
+    """Return the (cached) shared team cache, or None when none is configured"""
+    if not prefs.team_cache_dir:
         return None
-
-    def get_history(self, prompt_id):
-        response = self._request(f"/history/{prompt_id}")
-        if response:
-            return json.loads(response)
+    root = os.path.abspath(bpy.path.abspath(prefs.team_cache_dir))
+    cache = _team_caches.get(root)
+    if cache is None:
+        cache = team_cache.TeamCache(root)
+        _team_caches[root] = cache
+    return cache
+
+def add_team_cache_job(props, prefs, key, entry, object_name="", texture_target_name=""):
+    """Copy a team cache hit into the local store and add it as a finished job"""
+    now = time.time()
+    final_path = get_artifact_store(prefs).put_file(
+        entry["path"], filename=entry["filename"],
+        workflow=entry.get("workflow"),
+        object_name=entry.get("object_name"),
+        params=entry.get("params"),
+        prompt_id=entry.get("prompt_id"),
+        timings={"queued": now, "finished": now, "duration": 0.0})
+
+    job = props.jobs.add()
+    job.job_id = uuid.uuid4().hex
+    job.server = prefs.api_url
+    job.workflow_name = entry.get("workflow") or os.path.basename(props.workflow_file)
+    job.object_name = object_name
+    job.texture_target_name = texture_target_name
+    job.cache_key = key
+    job.start_time = now
+    job.state = 'DONE'
+    job.progress = 1.0
+    job.result_path = final_path
+    job.result_name = entry["filename"]
+    invalidate_gallery()
+    return job
+
+def team_cache_key(props, prefs, plan, output_node_id, render_digest, mesh_path):
+    """Team cache key of the generation about to be queued, or None if there is no cache"""
+    if get_team_cache(prefs) is None:
         return None
 
-    def get_image(self, filename, subfolder, folder_type):
-        params = urllib.parse.urlencode({
-            "filename": filename,
-            "subfolder": subfolder,
-            "type": folder_type
-        })
-        return self._request(f"/view?{params}")
+    inputs = []
+    if render_digest:
+        inputs.append(render_digest)
+    for i in plan.image_slots:
+        image_path = props.node_params[i].image_path
+        if image_path and os.path.exists(image_path):
+            inputs.append(team_cache.file_digest(image_path))
+    if mesh_path:
+        inputs.append(team_cache.file_digest(mesh_path))
+
+    # Preprocessing changes the uploaded pixels, so its settings are part of the input
+    preprocess_settings = None
+    if props.preprocess_enabled:
+        preprocess_settings = [props.preprocess_size, props.preprocess_padding,
+                               props.preprocess_format, props.preprocess_quality]
+    return team_cache.cache_key(plan.workflow_hash, param_overrides(props, plan), inputs,
+                                output=output_node_id or "",
+                                texture_only=bool(mesh_path),
+                                preprocess=preprocess_settings)
+
+def publish_to_team_cache(job, prefs):
+    cache = get_team_cache(prefs)
+    if cache is None or not job.cache_key or not job.result_path:
+        return
+    src_path = job.result_path
+    args = (job.cache_key, src_path, job.result_name)
+    metadata = {
+        "workflow": job.workflow_name,
+        "object_name": job.object_name,
+        "params": json.loads(job.injected_json) if job.injected_json else {},
+        "prompt_id": job.prompt_id,
+    }
+
+    # Copying a GLB to a network share must not stall the dispatcher
+    def publish():
+        try:
+            cache.publish(*args, **metadata)
+            cache.remove_stale_temp()
+            print(f"[Retexturity] Published {os.path.basename(src_path)} to the team cache")
+        except OSError as e:
+            print(f"[Retexturity] Could not publish to the team cache: {e}")
+
+    threading.Thread(target=publish, name="retexturity-team-cache", daemon=True).start()
+
+
+# ------------------------------------------------------------------------
+# Injection Plans
+# ------------------------------------------------------------------------
+# Compiled once per loaded workflow so Generate neither re-parses the
+# workflow JSON nor re-dispatches on param types. Plans are keyed by the
+# workflow and its param entries (props.plan_key), so scenes using
+# different workflows each keep theirs.
+
+MAX_INJECTION_PLANS = 8
+
+_injection_plans = {}
+
+def compile_injection_plan(props):
+    plan = InjectionPlan(props.full_workflow_json,
+                         [(p.node_id, p.param_name, p.value_type) for p in props.node_params],
+                         getters=PARAM_GETTERS)
+    props.plan_key = plan.key
+    _injection_plans.pop(plan.key, None)
+    _injection_plans[plan.key] = plan
+    while len(_injection_plans) > MAX_INJECTION_PLANS:
+        # Dicts keep insertion order: drop the least recently compiled
+        del _injection_plans[next(iter(_injection_plans))]
+    return plan
+
+def get_injection_plan(props):
+    plan = _injection_plans.get(props.plan_key)
+    if plan is None or len(plan) != len(props.node_params):
+        # e.g. after reopening the .blend: compile lazily from the stored JSON
+        plan = compile_injection_plan(props)
+    return plan
+
+def param_overrides(props, plan):
+    """Current values of every non-image param as {node_id: {input_name: value}}"""
+    return plan.values(props.node_params)
+
+
+# ------------------------------------------------------------------------
+# Model Warm-up
+# ------------------------------------------------------------------------
+
+_warmup = WarmupTracker()
+
+WARMUP_STATE_ICONS = {
+    'QUEUED': 'TIME',
+    'RUNNING': 'PLAY',
+    'WARM': 'CHECKMARK',
+    'SKIPPED': 'CHECKMARK',
+    'FAILED': 'ERROR',
+}
+
+def start_warmup(prefs, workflow):
+    """Queue the model-loading subgraph of workflow in the background. Returns (ok, message)."""
+    loader_classes = {c.strip() for c in prefs.warmup_loader_classes.split(",") if c.strip()}
+    prompt = graph.build_warmup_prompt(workflow, loader_classes)
+    if prompt is None:
+        return False, "Workflow has no model loader to warm up"
+
+    index = get_schema_cache().cached(prefs.api_url.rstrip('/'))
+    if index and not index.has_class(graph.WARMUP_SINK_CLASS):
+        return False, f"Server has no {graph.WARMUP_SINK_CLASS} node (update ComfyUI to use warm-up)"
+
+    if not _warmup.start(prefs.api_url, prompt):
+        return False, "A warm-up is already running"
+    if not bpy.app.timers.is_registered(redraw_warmup):
+        bpy.app.timers.register(redraw_warmup, first_interval=1.0)
+    return True, "Warming up models..."
+
+def redraw_warmup():
+    tag_redraw()
+    return 1.0 if _warmup.is_active() else None
+
+
+# ------------------------------------------------------------------------
+# Node Definitions (/object_info)
+# ------------------------------------------------------------------------
+
+_schema_cache = None
+
+def get_schema_cache():
+    global _schema_cache
+    if _schema_cache is None:
+        cache_dir = bpy.utils.extension_path_user(__package__, path="schema", create=True)
+        _schema_cache = schema.SchemaCache(cache_dir)
+    return _schema_cache
+
+_schema_refreshing = set()
+_schema_refreshing_lock = threading.Lock()
+
+def refresh_schema_async(prefs):
+    """Bring the cached /object_info of the configured server up to date on a worker thread"""
+    server = prefs.api_url.rstrip('/')
+    with _schema_refreshing_lock:
+        if server in _schema_refreshing:
+            return
+        _schema_refreshing.add(server)
+
+    def refresh():
+        try:
+            # Own client: the shared one's last_error_* belong to the main thread
+            get_schema_cache().get(ComfyUIClient(server))
+        except Exception as e:
+            print(f"[Retexturity] Could not load node definitions: {e}")
+        finally:
+            with _schema_refreshing_lock:
+                _schema_refreshing.discard(server)
+
+    threading.Thread(target=refresh, name="retexturity-schema", daemon=True).start()
+
+def get_schema_index(prefs, refresh=False):
+    """SchemaIndex for the configured server, or None if it cannot be obtained"""
+    try:
+        return get_schema_cache().get(get_client(prefs.api_url), refresh=refresh)
+    except Exception as e:
+        print(f"[Retexturity] Could not load node definitions: {e}")
+        return None
 
 
 # ------------------------------------------------------------------------
@@ -144,6 +297,47 @@ class RetexturityAddonPreferences(bpy.types.AddonPreferences):
         description="Absolute path to your ComfyUI 'output' folder (e.g. U:\\ComfyUI\\output)"
     )
 
+    team_cache_dir: bpy.props.StringProperty(
+        name="Team Cache Directory",
+        subtype='DIR_PATH',
+        description="Directory shared with other workstations (e.g. a network mount). Results generated by anyone "
+                    "from the same workflow, parameters and inputs are reused instead of queued. Leave empty to disable"
+    )
+
+    # Artifact Store Retention
+    store_max_size_mb: bpy.props.IntProperty(
+        name="Max Store Size (MB)",
+        default=4096,
+        min=0,
+        description="Least recently used results are removed beyond this size. 0 = unlimited"
+    )
+
+    store_max_age_days: bpy.props.IntProperty(
+        name="Max Age (Days)",
+        default=0,
+        min=0,
+        description="Results not used for this many days are removed. 0 = keep forever"
+    )
+
+    validate_before_queue: bpy.props.BoolProperty(
+        name="Validate Before Queueing",
+        default=True,
+        description="Check node types, enum values and ranges against the server's /object_info before queueing"
+    )
+
+    # Model warm-up
+    warmup_on_load: bpy.props.BoolProperty(
+        name="Warm Up Models on Load",
+        default=False,
+        description="When a workflow is loaded, queue just its model loaders so the first Generate starts on a warm server"
+    )
+
+    warmup_loader_classes: bpy.props.StringProperty(
+        name="Model Loader Nodes",
+        default="Trellis2LoadModel",
+        description="Comma-separated class_types that load model weights"
+    )
+
     # Sound Settings
     play_sound_on_finish: bpy.props.BoolProperty(
         name="Play Sound on Finish",
@@ -151,23 +345,104 @@ class RetexturityAddonPreferences(bpy.types.AddonPreferences):
         description="Play a sound when generation completes"
     )
 
+    bulk_queue_depth: bpy.props.IntProperty(
+        name="Bulk Queue Depth",
+        default=2,
+        min=1,
+        max=32,
+        description="Bulk jobs are only submitted while the server queue holds fewer prompts than this"
+    )
+
+    bulk_workflows: bpy.props.StringProperty(
+        name="Bulk Workflows",
+        default="*BatchExport*",
+        description="Comma-separated file name patterns of workflows whose jobs always go to the bulk lane"
+    )
+
+    notify_desktop: bpy.props.BoolProperty(
+        name="Desktop Notification",
+        default=False,
+        description="Show a system notification when jobs finish"
+    )
+
+    webhook_url: bpy.props.StringProperty(
+        name="Webhook URL",
+        description="POST a JSON summary of finished jobs to this URL (e.g. a local chat bot). Leave empty to disable"
+    )
+
+    hook_script: bpy.props.StringProperty(
+        name="Hook Script",
+        subtype='FILE_PATH',
+        description="Python file defining on_complete(event), called in a background thread (must not use bpy)"
+    )
+
+    notify_batch_window: bpy.props.FloatProperty(
+        name="Batch Window",
+        default=3.0,
+        min=0.0,
+        max=60.0,
+        unit='TIME_ABSOLUTE',
+        description="Jobs finishing within this many seconds of each other trigger a single notification"
+    )
+
     custom_sound_path: bpy.props.StringProperty(
         name="Custom Sound File",
         subtype='FILE_PATH',
         description="Path to custom sound file (wav, mp3, ogg). Leave empty for default."
     )
 
+    # Texture-only mode: node used to load the uploaded mesh on the server
+    mesh_loader_class: bpy.props.StringProperty(
+        name="Mesh Loader Node",
+        default="Trellis2LoadMesh",
+        description="ComfyUI class_type that loads a mesh file from the input folder for Trellis2MeshTexturing"
+    )
+
+    mesh_loader_input: bpy.props.StringProperty(
+        name="Mesh Loader Input",
+        default="glb_path",
+        description="Name of the mesh loader input that receives the uploaded file name"
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "api_url")
         layout.prop(self, "comfyui_output_path")
         layout.prop(self, "output_path")
+
+        row = layout.row()
+        row.prop(self, "validate_before_queue")
+        row.operator("retexturity.refresh_schema", icon='FILE_REFRESH')
+        row = layout.row()
+        row.prop(self, "bulk_queue_depth")
+        row.prop(self, "bulk_workflows")
+
+        box = layout.box()
+        box.label(text="Result Storage", icon='DISK_DRIVE')
+        row = box.row()
+        row.prop(self, "store_max_size_mb")
+        row.prop(self, "store_max_age_days")
+        box.prop(self, "team_cache_dir")
+
+        box = layout.box()
+        box.label(text="Model Warm-up", icon='FORCE_CHARGE')
+        box.prop(self, "warmup_on_load")
+        box.prop(self, "warmup_loader_classes")
+
+        box = layout.box()
+        box.label(text="Texture-Only Mode", icon='TEXTURE')
+        box.prop(self, "mesh_loader_class")
+        box.prop(self, "mesh_loader_input")
         
         box = layout.box()
         box.label(text="Notification Settings", icon='SOUND')
         box.prop(self, "play_sound_on_finish")
         if self.play_sound_on_finish:
              box.prop(self, "custom_sound_path")
+        box.prop(self, "notify_desktop")
+        box.prop(self, "webhook_url")
+        box.prop(self, "hook_script")
+        box.prop(self, "notify_batch_window")
 
 # ------------------------------------------------------------------------
 # Properties
@@ -197,12 +472,42 @@ def get_node_items(self, context):
 
     return items if items else [("NONE", "No Nodes found", "")]
 
+# Blender needs the strings of dynamic enum items kept alive
+_param_enum_items = {}
+
+def get_param_enum_items(self, context):
+    items = _param_enum_items.get(self.enum_items_json)
+    if items is None:
+        try:
+            options = json.loads(self.enum_items_json) if self.enum_items_json else []
+        except ValueError:
+            options = []
+        items = [(str(o), str(o), "") for o in options] or [("NONE", "No options", "")]
+        _param_enum_items[self.enum_items_json] = items
+    return items
+
+def enum_param_value(param):
+    """Map an ENUM param's identifier back to the typed option value"""
+    for option in json.loads(param.enum_items_json or "[]"):
+        if str(option) == param.enum_val:
+            return option
+    return param.enum_val
+
+# Value readers per param type, resolved per param when the injection plan is compiled
+PARAM_GETTERS = {
+    'INT': lambda p: p.int_val,
+    'FLOAT': lambda p: p.float_val,
+    'STRING': lambda p: p.str_val,
+    'BOOL': lambda p: p.bool_val,
+    'ENUM': enum_param_value,
+}
+
 class RetexturityNodeParam(bpy.types.PropertyGroup):
     node_id: bpy.props.StringProperty()
     node_title: bpy.props.StringProperty()
     param_name: bpy.props.StringProperty()
     
-    # Type identifier: 'INT', 'FLOAT', 'STRING', 'BOOL'
+    # Type identifier: 'INT', 'FLOAT', 'STRING', 'BOOL', 'ENUM', 'IMAGE'
     value_type: bpy.props.StringProperty() 
     
     # Values
@@ -210,6 +515,10 @@ class RetexturityNodeParam(bpy.types.PropertyGroup):
     float_val: bpy.props.FloatProperty()
     str_val: bpy.props.StringProperty()
     bool_val: bpy.props.BoolProperty()
+
+    # For Enum Params (options come from the server's /object_info)
+    enum_items_json: bpy.props.StringProperty()
+    enum_val: bpy.props.EnumProperty(items=get_param_enum_items)
     
     # For Image Params
     image_path: bpy.props.StringProperty(
@@ -217,6 +526,59 @@ class RetexturityNodeParam(bpy.types.PropertyGroup):
         description="Select image file to upload to ComfyUI"
     )
 
+JOB_STATES = [
+    ('PENDING', "Pending", "Held back by the addon until the server queue has room (bulk lane)"),
+    ('QUEUED', "Queued", "Waiting in the ComfyUI queue"),
+    ('RUNNING', "Running", "Executing on the server"),
+    ('DONE', "Done", "Result ready to import"),
+    ('IMPORTED', "Imported", "Result imported into the scene"),
+    ('FAILED', "Failed", "Generation or result retrieval failed"),
+    ('CANCELLING', "Cancelling", "Waiting for the server to confirm the cancellation"),
+    ('CANCELLED', "Cancelled", "Cancelled by the user"),
+]
+
+ACTIVE_JOB_STATES = {'PENDING', 'QUEUED', 'RUNNING', 'CANCELLING'}
+
+# Interactive jobs jump the server queue, bulk jobs are drip-fed behind them
+JOB_LANES = [
+    ('INTERACTIVE', "Interactive", "Queued at the front of the server queue"),
+    ('BULK', "Bulk", "Submitted a few at a time to keep the server queue short"),
+]
+
+class RetexturityJob(bpy.types.PropertyGroup):
+    job_id: bpy.props.StringProperty()
+    prompt_id: bpy.props.StringProperty()
+    server: bpy.props.StringProperty()
+    state: bpy.props.EnumProperty(items=JOB_STATES, default='QUEUED')
+    lane: bpy.props.EnumProperty(items=JOB_LANES, default='INTERACTIVE')
+    progress: bpy.props.FloatProperty(min=0.0, max=1.0, subtype='FACTOR')
+    queue_position: bpy.props.IntProperty()
+    error: bpy.props.StringProperty()
+    start_time: bpy.props.FloatProperty()
+    cancel_time: bpy.props.FloatProperty()
+
+    workflow_name: bpy.props.StringProperty()
+    workflow_hash: bpy.props.StringProperty()
+    object_name: bpy.props.StringProperty()
+    output_node_id: bpy.props.StringProperty()
+    # Team cache key of the generation, published under it once done
+    cache_key: bpy.props.StringProperty()
+    # Restored from the job journal after a crash or unsaved reload
+    reattached: bpy.props.BoolProperty()
+    # Multi-object mode: place the result at object_name, import it as soon as it is done
+    place_at_source: bpy.props.BoolProperty()
+    auto_import: bpy.props.BoolProperty()
+    # Object that receives a texture-only result on import
+    texture_target_name: bpy.props.StringProperty()
+
+    # Submitted prompt and injected values (for retry and the artifact index)
+    prompt_json: bpy.props.StringProperty()
+    injected_json: bpy.props.StringProperty()
+
+    result_path: bpy.props.StringProperty(subtype='FILE_PATH')
+    # Original file name of the result (stored files are named by hash)
+    result_name: bpy.props.StringProperty()
+
 class RetexturityNodeState(bpy.types.PropertyGroup):
     node_id: bpy.props.StringProperty()
     node_title: bpy.props.StringProperty()
@@ -231,6 +593,7 @@ class RetexturityNodeState(bpy.types.PropertyGroup):
 
 def load_workflow_common(context, filepath):
     props = context.scene.retexturity_props
+    prefs = context.preferences.addons[__package__].preferences
     
     if not filepath or not os.path.exists(filepath):
         return False, "Workflow file not found"
@@ -252,6 +615,14 @@ def load_workflow_common(context, filepath):
         if not valid:
             return False, "Invalid API Format. Please use 'Save (API Format)' in ComfyUI Dev Mode."
 
+        # Node definitions from the server, used to type enum params. Only the
+        # cached copy is used here (this also runs from the dropdown's update
+        # callback); a stale or missing one is refreshed in the background.
+        index = get_schema_cache().cached(prefs.api_url.rstrip('/'))
+        refresh_schema_async(prefs)
+        if index is None:
+            print("[Retexturity] No node definitions cached yet, fetching them. Reload the workflow for dropdowns.")
+
         # Populate Parameters
         props.node_params.clear()
         props.node_states.clear()
@@ -310,6 +681,12 @@ def load_workflow_common(context, filepath):
                         start_type = 'FLOAT'
                     elif isinstance(param_value, str):
                         start_type = 'STRING'
+
+                    # Real dropdowns when the server knows the option list
+                    spec = index.input_spec(node_data.get("class_type"), param_name) if index else None
+                    options = spec["options"] if spec else None
+                    if start_type not in (None, 'IMAGE', 'BOOL') and options and param_value in options:
+                        start_type = 'ENUM'
                     
                     if start_type:
                         item = props.node_params.add()
@@ -326,6 +703,9 @@ def load_workflow_common(context, filepath):
                             item.float_val = param_value
                         elif start_type == 'STRING':
                             item.str_val = param_value
+                        elif start_type == 'ENUM':
+                            item.enum_items_json = json.dumps(options)
+                            item.enum_val = str(param_value)
                         elif start_type == 'IMAGE':
                             # Don't set default unless it's a path, usually it's just a filename.
                             # Let user pick.
@@ -334,6 +714,7 @@ def load_workflow_common(context, filepath):
         # Store for usage
         props.full_workflow_json = json.dumps(workflow)
         props.cached_nodes_json = json.dumps(workflow)
+        compile_injection_plan(props)
         
         # Try to auto-select likely candidates
         input_cand = None
@@ -359,12 +740,46 @@ def load_workflow_common(context, filepath):
             props.input_node_id = input_cand
         if output_cand:
             props.output_node_id = output_cand
+
+        if prefs.warmup_on_load:
+            start_warmup(prefs, workflow)
         
         return True, f"Loaded workflow with {len(workflow)} nodes"
         
     except Exception as e:
         return False, f"Failed to load JSON: {str(e)}"
 
+class RETEXTURITY_OT_warmup(bpy.types.Operator):
+    """Load the workflow's models on the server now so the next Generate starts warm"""
+    bl_idname = "retexturity.warmup"
+    bl_label = "Warm Up Models"
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        prefs = context.preferences.addons[__package__].preferences
+        if not props.full_workflow_json:
+            self.report({'ERROR'}, "No workflow loaded.")
+            return {'CANCELLED'}
+        # Use the current param values so the real prompt hits the same cached loader
+        plan = get_injection_plan(props)
+        ok, msg = start_warmup(prefs, plan.instantiate(param_overrides(props, plan)))
+        self.report({'INFO'} if ok else {'WARNING'}, msg)
+        return {'FINISHED'} if ok else {'CANCELLED'}
+
+class RETEXTURITY_OT_refresh_schema(bpy.types.Operator):
+    """Re-download the node definitions (/object_info) from the server"""
+    bl_idname = "retexturity.refresh_schema"
+    bl_label = "Refresh Node Definitions"
+
+    def execute(self, context):
+        prefs = context.preferences.addons[__package__].preferences
+        index = get_schema_index(prefs, refresh=True)
+        if index is None:
+            self.report({'ERROR'}, f"Could not fetch /object_info from {prefs.api_url}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{len(index)} node types cached. Reload the workflow to update dropdowns.")
+        return {'FINISHED'}
+
 class RETEXTURITY_OT_load_workflow(bpy.types.Operator):
     """Load and parse the ComfyUI API Workflow JSON from manual file selection"""
     bl_idname = "retexturity.load_workflow"
@@ -453,43 +868,123 @@ class RetexturityProperties(bpy.types.PropertyGroup):
     # Collection of Node UI States (Collapsible)
     node_states: bpy.props.CollectionProperty(type=RetexturityNodeState)
 
-    is_generating: bpy.props.BoolProperty(
-        name="Is Generating",
-        default=False
+    # Job Table (one entry per submitted generation)
+    jobs: bpy.props.CollectionProperty(type=RetexturityJob)
+
+    # Texture-Only Mode
+    texture_only_mode: bpy.props.BoolProperty(
+        name="Texture Only (Keep Mesh)",
+        default=False,
+        description="Upload the active mesh and only run the Trellis2MeshTexturing stage on it"
     )
-    
-    # Stores the path to the pending result for manual import
-    latest_generated_filepath: bpy.props.StringProperty(
-        subtype='FILE_PATH'
+
+    # Staged Execution
+    staged_execution: bpy.props.BoolProperty(
+        name="Reuse Cached Stages",
+        default=False,
+        description="Resubmit with the previous uploads so ComfyUI only re-executes nodes downstream of changed parameters"
+    )
+
+    # Uploads and injected values of the last submitted run
+    stage_snapshot_json: bpy.props.StringProperty()
+    # Key of the compiled InjectionPlan for the loaded workflow
+    plan_key: bpy.props.StringProperty()
+
+    # Upload Preprocessing
+    preprocess_enabled: bpy.props.BoolProperty(
+        name="Preprocess Uploads",
+        default=False,
+        description="Crop to the alpha bounding box and downscale images locally before uploading"
     )
 
+    preprocess_size: bpy.props.IntProperty(
+        name="Target Size",
+        default=1024,
+        min=64,
+        max=4096,
+        description="Longest side of the uploaded image in pixels (images are never upscaled)"
+    )
+
+    preprocess_padding: bpy.props.FloatProperty(
+        name="Padding",
+        default=0.05,
+        min=0.0,
+        max=0.5,
+        subtype='FACTOR',
+        description="Margin kept around the cropped foreground, relative to its size"
+    )
+
+    preprocess_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('PNG', "PNG", "Lossless, keeps alpha"),
+            ('WEBP', "WebP", "Smaller files, keeps alpha"),
+            ('JPEG', "JPEG", "Smallest files, drops alpha (server must remove the background)"),
+        ],
+        default='PNG'
+    )
+
+    preprocess_quality: bpy.props.IntProperty(
+        name="Quality",
+        default=90,
+        min=1,
+        max=100,
+        description="Compression quality for WebP/JPEG"
+    )
+
+    gallery_page: bpy.props.IntProperty(min=0)
+
+def is_bulk_workflow(prefs, workflow_file):
+    """True if jobs of workflow_file belong in the bulk lane (e.g. batch exports)"""
+    name = os.path.basename(workflow_file)
+    return any(fnmatch.fnmatch(name, pattern.strip())
+               for pattern in prefs.bulk_workflows.split(",") if pattern.strip())
+
+def prepare_upload(props, filepath):
+    """Return the file that should actually be uploaded for filepath"""
+    if not props.preprocess_enabled:
+        return filepath
+
+    try:
+        out_path, stats = preprocess.preprocess_image(
+            filepath,
+            target_size=props.preprocess_size,
+            padding=props.preprocess_padding,
+            file_format=props.preprocess_format,
+            quality=props.preprocess_quality,
+        )
+    except Exception as e:
+        print(f"[Retexturity] Preprocessing failed for {filepath}, uploading original: {e}")
+        return filepath
+
+    if stats:
+        print(f"[Retexturity] Preprocessed {os.path.basename(filepath)}: "
+              f"{stats['source_size'][0]}x{stats['source_size'][1]} -> {stats['output_size'][0]}x{stats['output_size'][1]}, "
+              f"{stats['source_bytes'] // 1024} KB -> {stats['output_bytes'] // 1024} KB")
+    return out_path
+
 class RETEXTURITY_OT_generate(bpy.types.Operator):
-    """Send render to ComfyUI and retrieve result (Non-Blocking)"""
+    """Send render to ComfyUI and add a job to the job table (Non-Blocking)"""
     bl_idname = "retexturity.generate"
     bl_label = "Generate"
-    
-    _timer = None
-    _prompt_id = None
-    _client = None
-    _start_time = 0
+
+    bulk: bpy.props.BoolProperty(
+        name="Bulk",
+        description="Add the job to the bulk lane instead of queueing it at the front",
+        options={'SKIP_SAVE'}
+    )
     
     def execute(self, context):
-        self._start_time = time.time()
         props = context.scene.retexturity_props
-        
-        # Check if already running
-        if props.is_generating:
-             self.report({'WARNING'}, "Already generating...")
-             return {'CANCELLED'}
 
         # Get URL from Preferences
         prefs = context.preferences.addons[__package__].preferences
         api_url = prefs.api_url
         
-        self._client = ComfyUIClient(api_url)
+        client = get_client(api_url)
         
         # 1. Check Connection
-        if not self._client.check_connection():
+        if not client.check_connection():
             self.report({'ERROR'}, f"Could not connect to ComfyUI at {api_url}. Check Preferences.")
             return {'CANCELLED'}
 
@@ -497,25 +992,45 @@ class RETEXTURITY_OT_generate(bpy.types.Operator):
             self.report({'ERROR'}, "No workflow loaded.")
             return {'CANCELLED'}
 
-        if not props.full_workflow_json:
-            self.report({'ERROR'}, "No workflow loaded.")
-            return {'CANCELLED'}
+        output_node_id = props.output_node_id
+
+        # Texture-only mode needs a mesh to ship
+        target_obj = None
+        if props.texture_only_mode:
+            target_obj = context.active_object
+            if not target_obj or target_obj.type != 'MESH':
+                self.report({'ERROR'}, "Texture Only mode needs an active mesh object.")
+                return {'CANCELLED'}
         
+        plan = get_injection_plan(props)
+        params = props.node_params
+
+        # Staged execution: reuse the uploads of the previous run so ComfyUI's
+        # node cache keeps every stage upstream of the params that changed
+        workflow_hash = plan.workflow_hash
+        snapshot = {}
+        if props.staged_execution and props.stage_snapshot_json:
+            snapshot = json.loads(props.stage_snapshot_json)
+            if snapshot.get("workflow_hash") != workflow_hash:
+                snapshot = {}
+        render_upload = None
+        render_path = None
+        render_digest = None
+        manual_uploads = {}
+        injected = {}
+        # (node_id, input) pairs holding names of files uploaded for this run
+        uploaded_inputs = set()
+
         # CHECK FOR LOCAL IMAGE PARAMS
-        has_manual_images = False
-        workflow = json.loads(props.full_workflow_json)
-        
-        for p in props.node_params:
-            if p.value_type == 'IMAGE' and p.image_path and os.path.exists(p.image_path):
-                has_manual_images = True
-                break
+        has_manual_images = any(params[i].image_path and os.path.exists(params[i].image_path)
+                                for i in plan.image_slots)
         
-        uploaded_filename = None
-        uploaded_subfolder = ""
-        uploaded_type = "input"
-
         # 2. Render OR Upload Manual Images
-        if not has_manual_images:
+        if not has_manual_images and snapshot.get("render_upload"):
+            self.report({'INFO'}, "Reusing cached input render...")
+            render_upload = snapshot["render_upload"]
+            render_digest = snapshot.get("render_digest")
+        elif not has_manual_images:
             # LEGACY FLOW: Render Scene
             temp_dir = bpy.app.tempdir
             render_path = os.path.join(temp_dir, "retexturity_input.png")
@@ -536,317 +1051,1024 @@ class RETEXTURITY_OT_generate(bpy.types.Operator):
             if not os.path.exists(render_path):
                  self.report({'ERROR'}, "Render failed.")
                  return {'CANCELLED'}
-    
+            render_digest = team_cache.file_digest(render_path)
+
+        else:
+             self.report({'INFO'}, "Using manual images (skipping render)...")
+
+        # Texture-only: the exported mesh is an input of the generation too
+        mesh_path = None
+        if target_obj:
+            mesh_path = os.path.join(bpy.app.tempdir, "retexturity_source_mesh.glb")
+            stats = mesh_export.export_object_glb(target_obj, context.evaluated_depsgraph_get(), mesh_path)
+            print(f"[Retexturity] Exported {target_obj.name}: {stats['vertices']} verts, "
+                  f"{stats['triangles']} tris, {stats['bytes'] // 1024} KB")
+
+        # Shared team cache: someone may already have generated exactly this
+        key = None
+        if render_digest or has_manual_images:
+            key = team_cache_key(props, prefs, plan, output_node_id, render_digest, mesh_path)
+        if key:
+            entry = get_team_cache(prefs).lookup(key)
+            if entry:
+                active = context.active_object
+                try:
+                    add_team_cache_job(props, prefs, key, entry,
+                                       object_name=target_obj.name if target_obj else (active.name if active else ""),
+                                       texture_target_name=target_obj.name if target_obj else "")
+                except OSError as e:
+                    print(f"[Retexturity] Team cache hit could not be copied, generating instead: {e}")
+                else:
+                    self.report({'INFO'}, f"Result found in the team cache (generated on {entry.get('host', 'another workstation')}).")
+                    return {'FINISHED'}
+
+        if render_path:
             # 3. Upload Render
             self.report({'INFO'}, "Uploading render...")
-            upload_resp = self._client.upload_image(render_path, subfolder="") 
+            upload_resp = client.upload_image(prepare_upload(props, render_path), subfolder="")
             if not upload_resp:
                 self.report({'ERROR'}, "Failed to upload render.")
                 return {'CANCELLED'}
             
-            uploaded_filename = upload_resp.get("name")
-            uploaded_subfolder = upload_resp.get("subfolder", "")
-            uploaded_type = upload_resp.get("type", "input")
-            
+            render_upload = {
+                "name": upload_resp.get("name"),
+                "subfolder": upload_resp.get("subfolder", ""),
+                "type": upload_resp.get("type", "input"),
+            }
+
+        # Values to write into the template, {node_id: {input_name: value}}
+        overrides = {}
+
+        if render_upload:
             # Update Input Node (Legacy)
             input_id = props.input_node_id
-            if input_id in workflow:
-                node_inputs = workflow[input_id].get("inputs", {})
-                image_key = None
-                if "image" in node_inputs: image_key = "image"
-                elif "filename" in node_inputs: image_key = "filename"
-                elif "image_path" in node_inputs: image_key = "image_path"
-                
-                if image_key:
-                    node_inputs[image_key] = uploaded_filename
-                    node_inputs["subfolder"] = uploaded_subfolder
-                    node_inputs["type"] = uploaded_type
-                else:
-                    node_inputs["image"] = uploaded_filename
-                    node_inputs["subfolder"] = uploaded_subfolder
-                    node_inputs["type"] = uploaded_type
-
-        else:
-             self.report({'INFO'}, "Using manual images (skipping render)...")
+            if input_id in plan.template:
+                image_key = image_input_key(plan.template[input_id].get("inputs", {}))
+                overrides[input_id] = {
+                    image_key: render_upload["name"],
+                    "subfolder": render_upload["subfolder"],
+                    "type": render_upload["type"],
+                }
+                injected[input_id] = {"__render__": render_upload["name"]}
+                uploaded_inputs.add((input_id, image_key))
 
         # 4. INJECT PARAMETERS (and Upload Manual Images)
-        for param in props.node_params:
-            if param.node_id in workflow:
-                # Update value based on type
+        for i, (node_id, param_name, value_type) in enumerate(plan.entries):
+            param = params[i]
+            if value_type == 'IMAGE':
                 new_val = None
-                
-                if param.value_type == 'IMAGE':
-                    # Upload if valid path
-                    if param.image_path and os.path.exists(param.image_path):
-                         print(f"[Retexturity] Uploading manual image: {param.image_path}")
-                         resp = self._client.upload_image(param.image_path)
-                         if resp:
-                             new_val = resp.get("name")
-                             # Note: If node needs subfolder/type, we assume default or inject if key exists?
-                             # For simplicity, we just inject filename. Most nodes handle root.
-                elif param.value_type == 'INT':
-                    new_val = param.int_val
-                elif param.value_type == 'FLOAT':
-                    new_val = param.float_val
-                elif param.value_type == 'STRING':
-                    new_val = param.str_val
-                elif param.value_type == 'BOOL':
-                    new_val = param.bool_val
-                
-                if new_val is not None:
-                    workflow[param.node_id]["inputs"][param.param_name] = new_val
+                # Upload if valid path
+                if param.image_path and os.path.exists(param.image_path):
+                    st = os.stat(param.image_path)
+                    upload_key = f"{param.image_path}|{st.st_mtime}|{st.st_size}"
+                    new_val = snapshot.get("manual_uploads", {}).get(upload_key)
+                    if not new_val:
+                        print(f"[Retexturity] Uploading manual image: {param.image_path}")
+                        resp = client.upload_image(prepare_upload(props, param.image_path))
+                        if resp:
+                            # Only the filename is injected; most nodes read from the input root
+                            new_val = resp.get("name")
+                    if new_val:
+                        manual_uploads[upload_key] = new_val
+                if new_val is None:
+                    continue
+                uploaded_inputs.add((node_id, param_name))
+            else:
+                new_val = plan.getters[i](param)
 
-        # 5. Queue Prompt
-        self.report({'INFO'}, "Queuing prompt...")
+            overrides.setdefault(node_id, {})[param_name] = new_val
+            injected.setdefault(node_id, {})[param_name] = new_val
+
+        workflow = plan.instantiate(overrides)
+
+        # 4b. Texture-only: upload the mesh and keep only the texturing stage
+        if target_obj:
+            self.report({'INFO'}, "Uploading mesh...")
+            mesh_resp = client.upload_image(mesh_path)
+            if not mesh_resp:
+                self.report({'ERROR'}, "Failed to upload mesh.")
+                return {'CANCELLED'}
+
+            try:
+                workflow = graph.build_texture_only_prompt(
+                    workflow, mesh_resp.get("name"), prefs.mesh_loader_class, prefs.mesh_loader_input)
+            except ValueError as e:
+                self.report({'ERROR'}, f"Texture Only mode: {e}")
+                return {'CANCELLED'}
+
+            # The selected output may have been part of the dropped geometry stage
+            if output_node_id not in workflow:
+                exports = [n for n in workflow if "export" in workflow[n].get("class_type", "").lower()]
+                if exports:
+                    output_node_id = exports[0]
+
+            for loader_id in graph.find_nodes(workflow, prefs.mesh_loader_class):
+                injected[loader_id] = {prefs.mesh_loader_input: mesh_resp.get("name")}
+                uploaded_inputs.add((loader_id, prefs.mesh_loader_input))
+
+        # Report which stages will actually run
+        if snapshot.get("values") is not None:
+            dirty = graph.dirty_nodes(workflow, graph.changed_nodes(snapshot["values"], injected))
+            rerun, cached = graph.stage_summary(workflow, dirty)
+            print(f"[Retexturity] Staged run. Re-executing: {', '.join(rerun) or 'nothing'}")
+            print(f"[Retexturity] Cached on server: {', '.join(cached) or 'nothing'}")
+            self.report({'INFO'}, f"Staged run: {len(dirty)} of {len(workflow)} nodes dirty")
+
+        # Pre-flight validation against the cached node definitions
+        index = get_schema_cache().cached(client.base_url)
+        if prefs.validate_before_queue and index:
+            errors = schema.validate_prompt(workflow, index, skip=uploaded_inputs)
+            if errors:
+                for error in errors:
+                    print(f"[Retexturity] Validation: {error}")
+                more = f" (+{len(errors) - 1} more, see console)" if len(errors) > 1 else ""
+                self.report({'ERROR'}, f"Invalid workflow: {errors[0]}{more}")
+                return {'CANCELLED'}
 
         # 5. Queue Prompt
         self.report({'INFO'}, "Queuing prompt...")
-        prompt_resp = self._client.queue_prompt(workflow)
-        if not prompt_resp or "prompt_id" not in prompt_resp:
+        active = context.active_object
+        job = props.jobs.add()
+        job.job_id = uuid.uuid4().hex
+        job.server = api_url
+        job.workflow_name = os.path.basename(props.workflow_file)
+        job.workflow_hash = workflow_hash
+        job.cache_key = key or ""
+        job.object_name = target_obj.name if target_obj else (active.name if active else "")
+        job.output_node_id = output_node_id or ""
+        job.texture_target_name = target_obj.name if target_obj else ""
+        job.prompt_json = json.dumps(workflow)
+        job.injected_json = json.dumps(injected)
+
+        bulk = self.bulk or is_bulk_workflow(prefs, props.workflow_file)
+        if bulk:
+            # The dispatcher submits it once the server queue has room
+            job.lane = 'BULK'
+            job.state = 'PENDING'
+            job.start_time = time.time()
+            journal_submit(job)
+        elif not submit_job(job):
+             props.jobs.remove(len(props.jobs) - 1)
              self.report({'ERROR'}, "Failed to queue prompt.")
              return {'CANCELLED'}
-        
-        self._prompt_id = prompt_resp['prompt_id']
-        self.report({'INFO'}, f"Prompt queued: {self._prompt_id}. Waiting for result...")
-        
-        # Start Modal Timer
-        props.is_generating = True
-        wm = context.window_manager
-        # Check every 2 seconds to avoid spamming connection
-        self._timer = wm.event_timer_add(2.0, window=context.window)
-        wm.modal_handler_add(self)
-        
-        return {'RUNNING_MODAL'}
 
-    def modal(self, context, event):
-        props = context.scene.retexturity_props
-        
-        if not props.is_generating:
-            return self.cancel(context)
-        
-        if event.type == 'TIMER':
-            # Check status
-            print(f"[Retexturity] Checking history for {self._prompt_id}...")
-            try:
-                history_data = self._client.get_history(self._prompt_id)
-            except Exception as e:
-                print(f"[Retexturity] Error connecting to history: {e}")
-                history_data = None
+        props.stage_snapshot_json = json.dumps({
+            "workflow_hash": workflow_hash,
+            "values": injected,
+            "render_upload": render_upload,
+            "render_digest": render_digest,
+            "manual_uploads": manual_uploads,
+        })
+        if bulk:
+            self.report({'INFO'}, "Job added to the bulk lane.")
+        else:
+            self.report({'INFO'}, f"Prompt queued: {job.prompt_id}. Waiting for result...")
 
-            if history_data and self._prompt_id in history_data:
-                print(f"[Retexturity] History found for {self._prompt_id}!")
-                # Finished! Handle result
-                try:
-                    self.handle_result(context, history_data)
-                except Exception as e:
-                    self.report({'ERROR'}, f"Error handling result: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # Cleanup
-                return self.cancel(context)
-            else:
-                # Still running or not found yet
-                pass
-                
-        return {'PASS_THROUGH'}
+        ensure_dispatcher()
+        return {'FINISHED'}
 
-    def handle_result(self, context, history_data):
+# Renders happen one at a time on the main thread; uploads and /prompt
+# calls for finished renders run on these workers in the meantime
+UPLOAD_WORKERS = 4
+
+def upload_and_queue(server, upload_path, plan, overrides, input_id, image_key, index=None):
+    """
+    Worker-thread half of multi-object generation (no bpy access): upload
+    the render, build the prompt from the plan, validate it against index
+    (if given) and queue it at the front, like any interactive job.
+    Returns (prompt, uploaded_name, prompt_id, queued_at, error); prompt_id
+    is None on failure.
+    """
+    client = worker_client(server)
+    resp = client.upload_image(upload_path)
+    if not resp:
+        return None, None, None, None, "Failed to upload render"
+
+    overrides = dict(overrides)
+    overrides[input_id] = dict(overrides.get(input_id, {}), **{
+        image_key: resp.get("name"),
+        "subfolder": resp.get("subfolder", ""),
+        "type": resp.get("type", "input"),
+    })
+    prompt = plan.instantiate(overrides)
+    if index:
+        errors = schema.validate_prompt(prompt, index, skip={(input_id, image_key)})
+        if errors:
+            return prompt, resp.get("name"), None, None, f"Invalid workflow: {errors[0]}"
+    queued = client.queue_prompt(prompt, front=True)
+    if not queued or "prompt_id" not in queued:
+        return prompt, resp.get("name"), None, None, prompt_error_message(client) or "Failed to queue prompt"
+    return prompt, resp.get("name"), queued["prompt_id"], time.time(), None
+
+class RETEXTURITY_OT_generate_selected(bpy.types.Operator):
+    """Render every selected object on its own and queue one job per object"""
+    bl_idname = "retexturity.generate_selected"
+    bl_label = "Generate per Object"
+
+    auto_import: bpy.props.BoolProperty(
+        name="Import When Done",
+        default=True,
+        description="Import each result at its source object as soon as it is ready"
+    )
+
+    def execute(self, context):
         props = context.scene.retexturity_props
-        
-        # Debugging Response
-        prompt_data = history_data[self._prompt_id]
-        if "outputs" not in prompt_data:
-             print(f"[Retexturity] WARNING: 'outputs' key missing in history for {self._prompt_id}. Data keys: {prompt_data.keys()}")
-             return
-
-        outputs = prompt_data.get("outputs", {})
-        print(f"[Retexturity] Outputs keys: {list(outputs.keys())}")
-        
-        output_id = props.output_node_id
-        print(f"[Retexturity] Expected Output Node ID: {output_id}")
-        
-        target_file = None
-        source_path = None
-        fname = None
-        
-        # 1. Try to get file from History API
-        if output_id in outputs:
-            node_output = outputs[output_id]
-            print(f"[Retexturity] Output Data for {output_id}: {node_output}")
-            
-            valid_keys = ['images', 'gifs', 'files', 'meshes']
-            for key in valid_keys:
-                if key in node_output and len(node_output[key]) > 0:
-                    target_file = node_output[key][0]
-                    print(f"[Retexturity] Found target file in key '{key}': {target_file}")
-                    break
-        
-        # 2. If API failed (silent node), try Fallback: Scan Output Folder for latest file
         prefs = context.preferences.addons[__package__].preferences
-        comfyui_output_dir_pref = prefs.comfyui_output_path
-        
-        if not target_file:
-            print(f"[Retexturity] Target node {output_id} not in history outputs.")
-            
-            if comfyui_output_dir_pref and os.path.exists(comfyui_output_dir_pref):
-                 print(f"[Retexturity] Attempting fallback: Scaning {comfyui_output_dir_pref} for recent files...")
-                 # Find latest file
-                 latest_file = None
-                 latest_time = 0
-                 
-                 # Scan for specific extensions to be safe
-                 valid_exts = ['.glb', '.gltf', '.obj', '.png', '.jpg', '.exr']
-                 
-                 for f in os.listdir(comfyui_output_dir_pref):
-                     fp = os.path.join(comfyui_output_dir_pref, f)
-                     if os.path.isfile(fp):
-                         ext = os.path.splitext(f)[1].lower()
-                         if ext in valid_exts:
-                             mtime = os.path.getmtime(fp)
-                             if mtime > latest_time:
-                                 latest_time = mtime
-                                 latest_file = fp
-                 
-                 # Check if it was created AFTER we started
-                 # Giving a small buffer (e.g. -1s) just in case of clock skew, though unlikely on same machine
-                 if latest_file and latest_time >= (self._start_time - 1.0):
-                     print(f"[Retexturity] Fallback SUCCESS. Found recent file: {latest_file}")
-                     source_path = latest_file
-                     fname = os.path.basename(latest_file)
-                     # We have a source path directly now
-                 else:
-                     print(f"[Retexturity] Fallback Failed. No new files found. Latest was {latest_file} at {latest_time} (Job start: {self._start_time})")
-            else:
-                 print(f"[Retexturity] No ComfyUI Output Path configured for fallback.")
-
-        # 3. Construct Source/Dest if we got it from API
-        if target_file and "filename" in target_file:
-            fname = target_file.get("filename")
-            sub = target_file.get("subfolder", "")
-            ftype = target_file.get("type", "output")
-            # Logic continues below...
-            
-        if not fname and not source_path:
-             print(f"[Retexturity] ERROR: Could not determine result file from API or Fallback.")
-             self.report({'WARNING'}, "Could not determine result file. Check console.")
-             return
+        api_url = prefs.api_url
 
-        self.report({'INFO'}, f"Processing result: {fname}")
-        print(f"[Retexturity] Processing result for file: {fname}")
-        
-        addon_output_dir_pref = prefs.output_path
-        addon_output_dir = os.path.abspath(bpy.path.abspath(addon_output_dir_pref))
-        if not os.path.exists(addon_output_dir):
-            os.makedirs(addon_output_dir)
-
-        # If we didn't get source_path from fallback, try to build it from API data
-        if not source_path and comfyui_output_dir_pref:
-             comfyui_output_dir_abs = os.path.abspath(bpy.path.abspath(comfyui_output_dir_pref))
-             if os.path.exists(comfyui_output_dir_abs):
-                if sub:
-                    source_path = os.path.join(comfyui_output_dir_abs, sub, fname)
-                else:
-                    source_path = os.path.join(comfyui_output_dir_abs, fname)
-                
-                # Check existence
-                if not os.path.exists(source_path):
-                     print(f"[Retexturity] File from API not found at {source_path}")
-                     # Wait loop logic was here...
-        
-        # ... logic merges here ...
-        
-        # Destination Path
-        dest_path = os.path.join(addon_output_dir, f"{fname}")
-        if os.path.exists(dest_path):
-                name, ext = os.path.splitext(fname)
-                dest_path = os.path.join(addon_output_dir, f"{name}_{int(time.time())}{ext}")
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not objects:
+            self.report({'ERROR'}, "Select one or more mesh objects.")
+            return {'CANCELLED'}
+        if not props.full_workflow_json:
+            self.report({'ERROR'}, "No workflow loaded.")
+            return {'CANCELLED'}
 
-        final_path = None
-        
-        if source_path and os.path.exists(source_path):
-            # Copy local function
+        client = get_client(api_url)
+        if not client.check_connection():
+            self.report({'ERROR'}, f"Could not connect to ComfyUI at {api_url}. Check Preferences.")
+            return {'CANCELLED'}
+
+        plan = get_injection_plan(props)
+        input_id = props.input_node_id
+        if input_id not in plan.template:
+            self.report({'ERROR'}, "Select the workflow's input image node.")
+            return {'CANCELLED'}
+        image_key = image_input_key(plan.template[input_id].get("inputs", {}))
+        overrides = param_overrides(props, plan)
+
+        # Check the shared part up front so a bad workflow fails before any
+        # render; each prompt is validated again once its upload name is in
+        index = get_schema_cache().cached(client.base_url)
+        if not prefs.validate_before_queue:
+            index = None
+        if index:
+            errors = schema.validate_prompt(plan.instantiate(overrides), index, skip={(input_id, image_key)})
+            if errors:
+                for error in errors:
+                    print(f"[Retexturity] Validation: {error}")
+                self.report({'ERROR'}, f"Invalid workflow: {errors[0]}")
+                return {'CANCELLED'}
+
+        # Render object N+1 while object N uploads and the server starts on it
+        submitted = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+            for i, obj in enumerate(objects):
+                render_path = os.path.join(bpy.app.tempdir, f"retexturity_object_{i}.png")
+                if not object_render.render_isolated(context, obj, render_path):
+                    self.report({'WARNING'}, f"Render failed for {obj.name}")
+                    continue
+                future = pool.submit(upload_and_queue, api_url, prepare_upload(props, render_path),
+                                     plan, overrides, input_id, image_key, index)
+                submitted.append((obj, future))
+
+        queued = 0
+        for obj, future in submitted:
             try:
-                print(f"[Retexturity] Copying {source_path} -> {dest_path}")
-                shutil.copy2(source_path, dest_path)
-                self.report({'INFO'}, f"Copied to: {dest_path}")
-                final_path = dest_path
+                prompt, uploaded_name, prompt_id, queued_at, error = future.result()
             except Exception as e:
-                print(f"[Retexturity] Copy FAILED: {e}")
-                self.report({'ERROR'}, f"Failed to copy: {e}")
-                return
-        elif target_file:
-             # Try API download if we have target_file data but no local source_path found
-             # ...
-             pass # Existing API fallback logic
-             
-             # Re-implementing simplified flow to handle both cases efficiently without duplicate code
-             # Let's replace the block below entirely
-        
-        # REFACTORED BLOCK START
-        if final_path:
-             pass # Already copied
-        elif target_file:
-             # Fallback to API
-             print(f"[Retexturity] Trying API download for {fname}")
-             raw_data = self._client.get_image(fname, sub, ftype)
-             if raw_data:
-                with open(dest_path, 'wb') as f:
-                    f.write(raw_data)
-                self.report({'INFO'}, f"Downloaded to: {dest_path}")
-                final_path = dest_path
-        
-                self.report({'INFO'}, f"Downloaded to: {dest_path}")
-                final_path = dest_path
-        
-        if final_path:
-            # 1. Store path for UI
-            props.latest_generated_filepath = final_path
-            
-            # 2. Play Sound
-            if prefs.play_sound_on_finish:
-                try:
-                    import aud
-                    device = aud.Device()
-                    sound_file = prefs.custom_sound_path
-                    
-                    if not sound_file or not os.path.exists(sound_file):
-                         # Default
-                         addon_dir = os.path.dirname(__file__)
-                         sound_file = os.path.join(addon_dir, "sounds", "sound.wav")
-                    
-                    if os.path.exists(sound_file):
-                        sound = aud.Sound(sound_file)
-                        handle = device.play(sound)
-                    else:
-                        print(f"[Retexturity] Sound file not found: {sound_file}")
+                prompt_id, error = None, str(e)
+            if not prompt_id:
+                print(f"[Retexturity] Upload/queue failed for {obj.name}: {error}")
+                self.report({'WARNING'}, f"Could not queue {obj.name}: {error}")
+                continue
+
+            injected = dict(overrides)
+            injected[input_id] = {"__render__": uploaded_name}
+            job = props.jobs.add()
+            job.job_id = uuid.uuid4().hex
+            job.server = api_url
+            job.prompt_id = prompt_id
+            job.state = 'QUEUED'
+            job.lane = 'INTERACTIVE'
+            # When the server got it, not when the last render finished
+            job.start_time = queued_at
+            job.workflow_name = os.path.basename(props.workflow_file)
+            job.workflow_hash = plan.workflow_hash
+            job.object_name = obj.name
+            job.output_node_id = props.output_node_id or ""
+            job.place_at_source = True
+            job.auto_import = self.auto_import
+            job.prompt_json = json.dumps(prompt)
+            job.injected_json = json.dumps(injected)
+            journal_submit(job)
+            queued += 1
+
+        if not queued:
+            self.report({'ERROR'}, "No job could be queued.")
+            return {'CANCELLED'}
+
+        ensure_dispatcher()
+        self.report({'INFO'}, f"Queued {queued} of {len(objects)} objects.")
+        return {'FINISHED'}
+
+# ------------------------------------------------------------------------
+# Job Dispatcher
+# ------------------------------------------------------------------------
+# A single timer polls every active job of every scene. Each server gets one
+# /queue request per tick; /history is only asked for prompts that have left
+# the queue.
+
+DISPATCH_INTERVAL = 2.0
+
+_clients = {}
+
+def get_client(server):
+    """Return the shared ComfyUIClient for a server URL"""
+    client = _clients.get(server)
+    if client is None:
+        client = ComfyUIClient(server)
+        _clients[server] = client
+    return client
+
+def worker_client(server):
+    """
+    Client for a worker thread: its own last_error_* state, but the shared
+    client's retry policy, transport and per-server circuit breaker.
+    """
+    shared = get_client(server)
+    client = ComfyUIClient(server, retry_policy=shared.retry_policy, transport=shared.transport)
+    client.breaker = shared.breaker
+    return client
+
+def iter_jobs(states=None):
+    for scene in bpy.data.scenes:
+        for job in scene.retexturity_props.jobs:
+            if states is None or job.state in states:
+                yield scene, job
+
+def find_job(props, job_id):
+    for index, job in enumerate(props.jobs):
+        if job.job_id == job_id:
+            return index, job
+    return -1, None
+
+def submit_job(job, retry=None, keep_pending=False):
+    """
+    Queue (or re-queue) a job's prompt. Returns True on success. With
+    keep_pending, a job whose request did not get through (as opposed to
+    being rejected by the server) stays as it is for the next attempt.
+    """
+    client = get_client(job.server)
+    prompt_resp = client.queue_prompt(json.loads(job.prompt_json), front=job.lane == 'INTERACTIVE', retry=retry)
+    if not prompt_resp or "prompt_id" not in prompt_resp:
+        rejected = client.last_error_status is not None and client.last_error_status < 500
+        if keep_pending and not rejected:
+            return False
+        job.state = 'FAILED'
+        job.error = prompt_error_message(client) or "Failed to queue prompt"
+        return False
+
+    job.prompt_id = prompt_resp['prompt_id']
+    job.state = 'QUEUED'
+    job.progress = 0.0
+    job.queue_position = 0
+    job.error = ""
+    job.start_time = time.time()
+    journal_submit(job)
+    return True
+
+# ------------------------------------------------------------------------
+# Job Journal
+# ------------------------------------------------------------------------
+# Jobs in the scene are only as durable as the .blend. The journal keeps
+# every in-flight prompt on disk so a crash or a reload without saving can
+# reattach to it instead of regenerating.
+
+JOURNAL_FIELDS = (
+    "prompt_id", "server", "state", "lane", "workflow_name", "workflow_hash", "object_name",
+    "output_node_id", "cache_key", "texture_target_name", "place_at_source", "auto_import",
+    "prompt_json", "injected_json", "start_time",
+)
+
+# Unfinished journal entries this old are dropped (e.g. from a crashed
+# session that was never reopened)
+JOURNAL_MAX_AGE = 7 * 86400
+
+_journal = None
+
+def get_journal():
+    global _journal
+    if _journal is None:
+        journal_dir = bpy.utils.extension_path_user(__package__, path="", create=True)
+        _journal = JobJournal(os.path.join(journal_dir, "jobs.jsonl"))
+    return _journal
+
+def journal_submit(job):
+    try:
+        get_journal().record(job.job_id,
+                             blend=bpy.data.filepath,
+                             scene=job.id_data.name,
+                             **{field: getattr(job, field) for field in JOURNAL_FIELDS})
+    except OSError as e:
+        print(f"[Retexturity] Could not write job journal: {e}")
+
+def journal_rekey_job(scene, job):
+    try:
+        get_journal().record(job.job_id, blend=bpy.data.filepath, scene=scene.name)
+    except OSError as e:
+        print(f"[Retexturity] Could not write job journal: {e}")
+
+def journal_rekey():
+    """Point the journal entries of active jobs at the file they are now saved in"""
+    for scene, job in iter_jobs(ACTIVE_JOB_STATES):
+        journal_rekey_job(scene, job)
+
+def journal_state(job):
+    try:
+        get_journal().record(job.job_id, state=job.state, error=job.error, result_path=job.result_path)
+    except OSError as e:
+        print(f"[Retexturity] Could not write job journal: {e}")
+
+def reattach_jobs():
+    """
+    Restore unfinished journal jobs of the current file that are missing
+    from its scenes. Jobs of another running Blender are left alone, also
+    when both files are unsaved.
+    """
+    try:
+        journal = get_journal()
+        records = journal.adoptable(ACTIVE_JOB_STATES, bpy.data.filepath)
+    except OSError as e:
+        print(f"[Retexturity] Could not read job journal: {e}")
+        return 0
+
+    known = {job.job_id for _, job in iter_jobs()}
+    restored = 0
+    for record in records:
+        if record["job_id"] in known:
+            continue
+        scene = bpy.data.scenes.get(record.get("scene", "")) or bpy.context.scene
+        if scene is None:
+            continue
+        job = scene.retexturity_props.jobs.add()
+        job.job_id = record["job_id"]
+        for field in JOURNAL_FIELDS:
+            if field in record:
+                setattr(job, field, record[field])
+        job.reattached = True
+        # Claim it, so other instances see this session as the owner
+        journal_rekey_job(scene, job)
+        restored += 1
+        print(f"[Retexturity] Reattached to prompt {job.prompt_id} on {job.server}")
+
+    try:
+        journal.compact(ACTIVE_JOB_STATES, force=True, max_age=JOURNAL_MAX_AGE)
+    except OSError as e:
+        print(f"[Retexturity] Could not compact job journal: {e}")
+
+    if restored:
+        ensure_dispatcher()
+    return restored
+
+def prompt_error_message(client):
+    """Summarize a /prompt validation error returned by the server, if any"""
+    try:
+        body = json.loads(client.last_error_body or b"{}")
+    except ValueError:
+        return None
+    for node_id, node_error in (body.get("node_errors") or {}).items():
+        for err in node_error.get("errors", []):
+            return f"{node_error.get('class_type', node_id)}: {err.get('details') or err.get('message')}"
+    return (body.get("error") or {}).get("message")
+
+def ensure_dispatcher():
+    if not bpy.app.timers.is_registered(dispatch_jobs):
+        bpy.app.timers.register(dispatch_jobs, first_interval=DISPATCH_INTERVAL, persistent=True)
+
+def tag_redraw():
+    wm = bpy.context.window_manager
+    if not wm:
+        return
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def parse_queue(queue_data):
+    """Return (running_ids, {pending_id: position}) from a /queue response"""
+    running = set()
+    pending = {}
+    if not queue_data:
+        return running, pending
+    for item in queue_data.get("queue_running", []):
+        running.add(item[1])
+    ordered = sorted(queue_data.get("queue_pending", []), key=lambda item: item[0])
+    for position, item in enumerate(ordered, start=1):
+        pending[item[1]] = position
+    return running, pending
+
+def dispatch_jobs():
+    active = [job for _, job in iter_jobs(ACTIVE_JOB_STATES)]
+    if not active:
+        return None
+
+    prefs = bpy.context.preferences.addons[__package__].preferences
+
+    by_server = {}
+    for job in active:
+        by_server.setdefault(job.server, []).append(job)
+
+    for server, jobs in by_server.items():
+        client = get_client(server)
+        if client.breaker.is_open():
+            # Server marked down: don't hammer it, jobs keep their state until it is back
+            continue
+        try:
+            queue_data = client.get_queue(retry=NO_RETRY)
+        except Exception as e:
+            print(f"[Retexturity] Error reading queue from {server}: {e}")
+            queue_data = None
+        running, pending = parse_queue(queue_data)
+
+        for job in jobs:
+            dispatch_job(client, job, queue_data is not None, running, pending, prefs)
+            if job.state not in ACTIVE_JOB_STATES:
+                journal_state(job)
+                if job.state != 'CANCELLED':
+                    notify_completion(job)
+
+        if queue_data is not None:
+            feed_bulk_lane(jobs, len(running) + len(pending), prefs.bulk_queue_depth)
+
+    tag_redraw()
+    return DISPATCH_INTERVAL
+
+def feed_bulk_lane(jobs, depth, target_depth):
+    """Submit pending bulk jobs, oldest first, until the server queue holds target_depth prompts"""
+    waiting = sorted((job for job in jobs if job.state == 'PENDING'), key=lambda job: job.start_time)
+    for job in waiting:
+        if depth >= target_depth:
+            break
+        # Timer thread: a single attempt, the next tick is the retry
+        if not submit_job(job, retry=NO_RETRY, keep_pending=True):
+            if job.state != 'FAILED':
+                # Didn't get through, the server is probably struggling
+                break
+            journal_state(job)
+            continue
+        print(f"[Retexturity] Bulk job submitted as {job.prompt_id} (server queue depth {depth + 1})")
+        depth += 1
+
+def dispatch_job(client, job, queue_ok, running, pending, prefs):
+    if job.state == 'PENDING':
+        # Waiting in the bulk lane, see feed_bulk_lane
+        return
+    if job.state == 'CANCELLING':
+        confirm_cancel(client, job, running, pending, prefs)
+        return
+    if job.job_id in _downloads:
+        # Its history was already read, only the result download is outstanding
+        finish_job(job, {}, prefs)
+        return
+    if job.prompt_id in running:
+        job.state = 'RUNNING'
+        job.queue_position = 0
+        job.progress = 0.5
+        return
+    if job.prompt_id in pending:
+        job.state = 'QUEUED'
+        job.queue_position = pending[job.prompt_id]
+        return
+
+    # Not queued anymore (or queue unavailable): look for a history entry
+    try:
+        history_data = client.get_history(job.prompt_id, retry=NO_RETRY)
+    except Exception as e:
+        print(f"[Retexturity] Error connecting to history: {e}")
+        history_data = None
+
+    if history_data and job.prompt_id in history_data:
+        print(f"[Retexturity] History found for {job.prompt_id}!")
+        finish_job(job, history_data[job.prompt_id], prefs)
+    elif job.reattached and queue_ok and history_data is not None:
+        # The server answered but knows nothing about it (e.g. it was restarted meanwhile)
+        job.state = 'FAILED'
+        job.error = "Prompt was lost on the server while Blender was closed"
+
+def cancel_jobs(jobs):
+    """
+    Free the server for every job in jobs: pending prompts are deleted from
+    the queue, running ones are interrupted (only if they are really ours).
+    The dispatcher confirms the cancellation through /queue and /history.
+    """
+    by_server = {}
+    for job in jobs:
+        if job.state == 'PENDING':
+            # Never reached the server
+            job.state = 'CANCELLED'
+            journal_state(job)
+        elif job.state in {'QUEUED', 'RUNNING'}:
+            by_server.setdefault(job.server, []).append(job)
+
+    # Runs on the main thread, so nothing here is retried with backoff: a
+    # request that fails is repeated by confirm_cancel on the next tick
+    for server, server_jobs in by_server.items():
+        client = get_client(server)
+        running, pending = parse_queue(client.get_queue(retry=NO_RETRY))
+
+        to_delete = [job.prompt_id for job in server_jobs if job.prompt_id in pending]
+        if to_delete:
+            client.delete_from_queue(to_delete, retry=NO_RETRY)
+
+        for job in server_jobs:
+            if job.prompt_id in running:
+                client.interrupt(job.prompt_id)
+            job.state = 'CANCELLING'
+            job.cancel_time = time.time()
+            journal_state(job)
+
+    if by_server:
+        ensure_dispatcher()
+
+CANCEL_RETRY_INTERVAL = 10.0
+
+def confirm_cancel(client, job, running, pending, prefs):
+    if job.prompt_id in pending:
+        # Deletion did not go through (e.g. network error), try again
+        client.delete_from_queue([job.prompt_id], retry=NO_RETRY)
+        return
+    if job.prompt_id in running:
+        # Still executing: the interrupt is only checked between node steps
+        if time.time() - job.cancel_time > CANCEL_RETRY_INTERVAL:
+            client.interrupt(job.prompt_id)
+            job.cancel_time = time.time()
+        return
+
+    # Gone from the queue: either deleted (no history) or interrupted
+    history_data = client.get_history(job.prompt_id, retry=NO_RETRY)
+    if history_data is None:
+        # Server unreachable: don't conclude anything, ask again next tick
+        return
+    entry = history_data.get(job.prompt_id)
+    if entry and entry.get("status", {}).get("status_str") == "success":
+        # Too late to cancel: keep the result, but don't drop it into the scene
+        print(f"[Retexturity] Job {job.prompt_id} finished before the cancel reached the server")
+        job.auto_import = False
+        finish_job(job, entry, prefs)
+        return
+    job.state = 'CANCELLED'
+    job.progress = 0.0
+    print(f"[Retexturity] Job {job.prompt_id} cancelled on {job.server}")
+
+def history_error(prompt_data):
+    """Extract an error message from a failed history entry, or None"""
+    status = prompt_data.get("status", {})
+    if status.get("status_str") != "error":
+        return None
+    for msg_type, msg_data in status.get("messages", []):
+        if msg_type == "execution_error":
+            return f"{msg_data.get('node_type', 'Node')}: {msg_data.get('exception_message', '').strip()}"
+    return "Execution failed on the server"
+
+def finish_job(job, prompt_data, prefs):
+    error = history_error(prompt_data)
+    if error:
+        job.state = 'FAILED'
+        job.error = error
+        print(f"[Retexturity] Job {job.prompt_id} failed: {error}")
+        return
+
+    try:
+        final_path, fname = handle_result(job, prompt_data, prefs)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        final_path, fname = None, None
+        job.error = f"Error handling result: {e}"
+
+    if final_path is DOWNLOADING:
+        # Still outside the server queue next tick, which comes back here
+        job.progress = max(job.progress, 0.9)
+        return
+    if not final_path:
+        job.state = 'FAILED'
+        job.error = job.error or "Failed to retrieve file via Copy or Download."
+        return
+
+    job.state = 'DONE'
+    job.progress = 1.0
+    job.result_path = final_path
+    job.result_name = fname
+    invalidate_gallery()
+    publish_to_team_cache(job, prefs)
+    if job.auto_import:
+        auto_import_job(job)
+    else:
+        print("[Retexturity] Generation Complete! See panel to Import.")
+
+def auto_import_job(job):
+    """Run the import operator for job from the dispatcher timer"""
+    scene = job.id_data
+    window = next((w for w in bpy.context.window_manager.windows if w.scene == scene), None)
+    if window is None:
+        print(f"[Retexturity] No window shows scene {scene.name}, leaving {job.result_name} to import manually")
+        return
+    try:
+        with bpy.context.temp_override(window=window):
+            bpy.ops.retexturity.import_result(job_id=job.job_id)
+    except Exception as e:
+        print(f"[Retexturity] Automatic import failed: {e}")
+
+# ------------------------------------------------------------------------
+# Completion Notifications
+# ------------------------------------------------------------------------
+# Finished jobs are collected for notify_batch_window seconds and announced
+# once. The sound plays on the main thread from a cached device and buffer;
+# every other hook runs on the HookRunner thread.
+
+_hook_runner = hooks.HookRunner()
+_finished_jobs = []
+_sound_cache = {"device": None, "key": None, "sound": None}
+
+# Extra hooks registered by scripts or other addons: callables taking the event dict
+completion_hooks = []
+
+def register_completion_hook(func):
+    if func not in completion_hooks:
+        completion_hooks.append(func)
+
+def unregister_completion_hook(func):
+    if func in completion_hooks:
+        completion_hooks.remove(func)
+
+def notify_completion(job):
+    """Queue a finished (or failed) job for the next batched notification"""
+    _finished_jobs.append({
+        "job_id": job.job_id,
+        "prompt_id": job.prompt_id,
+        "state": job.state,
+        "workflow": job.workflow_name,
+        "object": job.object_name,
+        "result_path": job.result_path,
+        "error": job.error,
+        "duration": time.time() - job.start_time if job.start_time else 0.0,
+    })
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    if not bpy.app.timers.is_registered(flush_notifications):
+        bpy.app.timers.register(flush_notifications, first_interval=max(prefs.notify_batch_window, 0.01))
+
+def flush_notifications():
+    if not _finished_jobs:
+        return None
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    jobs = list(_finished_jobs)
+    _finished_jobs.clear()
+    event = {
+        "count": len(jobs),
+        "failed": sum(1 for job in jobs if job["state"] == 'FAILED'),
+        "jobs": jobs,
+    }
+
+    if prefs.play_sound_on_finish and event["failed"] < event["count"]:
+        play_finish_sound(prefs)
+
+    active_hooks = list(completion_hooks)
+    if prefs.notify_desktop:
+        active_hooks.append(hooks.desktop_hook())
+    if prefs.webhook_url:
+        active_hooks.append(hooks.webhook_hook(prefs.webhook_url))
+    if prefs.hook_script:
+        active_hooks.append(hooks.script_hook(bpy.path.abspath(prefs.hook_script)))
+    _hook_runner.submit(event, active_hooks)
+    return None
+
+def get_finish_sound(prefs):
+    """Decoded notification sound, rebuilt only when the configured file changes"""
+    import aud
+    sound_file = bpy.path.abspath(prefs.custom_sound_path) if prefs.custom_sound_path else ""
+    if sound_file and os.path.exists(sound_file):
+        key = (sound_file, os.path.getmtime(sound_file))
+    else:
+        key = None
 
-                except Exception as e:
-                    print(f"[Retexturity] Failed to play sound: {e}")
+    if _sound_cache["sound"] is None or _sound_cache["key"] != key:
+        if key:
+            # cache() decodes once into memory instead of streaming from disk on every play
+            sound = aud.Sound(sound_file).cache()
+        else:
+            # Default chime, synthesized in memory
+            rate = 44100
+            sound = aud.Sound.buffer(gen_sound.chime(rate).reshape(-1, 1), rate)
+        _sound_cache["sound"] = sound
+        _sound_cache["key"] = key
+    return _sound_cache["sound"]
+
+def play_finish_sound(prefs):
+    try:
+        import aud
+        if _sound_cache["device"] is None:
+            _sound_cache["device"] = aud.Device()
+        _sound_cache["device"].play(get_finish_sound(prefs))
+    except Exception as e:
+        print(f"[Retexturity] Failed to play sound: {e}")
 
-            self.report({'INFO'}, "Generation Complete! See panel to Import.")
+# ------------------------------------------------------------------------
+# Result Download
+# ------------------------------------------------------------------------
+# Results not reachable through comfyui_output_path come over /view, which
+# can take minutes for a large mesh. The download runs on a worker; the
+# dispatcher finds the job still outside the server queue on a later tick
+# and handle_result() picks the bytes up from there.
+
+DOWNLOAD_WORKERS = 2
+
+# handle_result() path while a job's download is in flight
+DOWNLOADING = object()
+
+_downloads = {}
+_download_pool = None
+
+def get_download_pool():
+    global _download_pool
+    if _download_pool is None:
+        _download_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=DOWNLOAD_WORKERS, thread_name_prefix="retexturity-download")
+    return _download_pool
+
+def fetch_result(server, filename, subfolder, folder_type):
+    """Worker-thread download of an output file (no bpy access). Returns bytes or None."""
+    return worker_client(server).get_image(filename, subfolder, folder_type)
+
+def result_metadata(job):
+    """Metadata indexed alongside the stored file"""
+    finished = time.time()
+    return {
+        "workflow": job.workflow_name,
+        "object_name": job.object_name,
+        "params": json.loads(job.injected_json) if job.injected_json else {},
+        "prompt_id": job.prompt_id,
+        "timings": {
+            "queued": job.start_time,
+            "finished": finished,
+            "duration": finished - job.start_time,
+        },
+    }
+
+def collect_store_garbage(store, final_path, prefs):
+    thumbnails = get_thumbnail_cache()
+    removed, freed = store.gc(
+        max_bytes=prefs.store_max_size_mb * 1024 * 1024,
+        max_age_days=prefs.store_max_age_days,
+        protect=[final_path] + store_references(store),
+        on_remove=lambda blob_hash, ext: thumbnails.discard(blob_hash))
+    if removed:
+        print(f"[Retexturity] Artifact store GC removed {removed} files ({freed // (1024 * 1024)} MB)")
+
+def collect_download(job, prefs):
+    """(path, filename) of a finished download of job, or (DOWNLOADING, filename)"""
+    future, fname = _downloads[job.job_id]
+    if not future.done():
+        return DOWNLOADING, fname
+    del _downloads[job.job_id]
+    raw_data = future.result()
+    if not raw_data:
+        return None, None
+    store = get_artifact_store(prefs)
+    final_path = store.put_bytes(raw_data, fname, **result_metadata(job))
+    print(f"[Retexturity] Downloaded: {fname}")
+    collect_store_garbage(store, final_path, prefs)
+    return final_path, fname
+
+def handle_result(job, prompt_data, prefs):
+    """
+    Fetch the job's output file into the artifact store. Returns (path,
+    filename); path is DOWNLOADING while it is being downloaded.
+    """
+    if job.job_id in _downloads:
+        return collect_download(job, prefs)
+
+    if "outputs" not in prompt_data:
+         print(f"[Retexturity] WARNING: 'outputs' key missing in history for {job.prompt_id}. Data keys: {prompt_data.keys()}")
+         return None, None
+
+    outputs = prompt_data.get("outputs", {})
+    print(f"[Retexturity] Outputs keys: {list(outputs.keys())}")
+    
+    output_id = job.output_node_id
+    print(f"[Retexturity] Expected Output Node ID: {output_id}")
+    
+    target_file = None
+    source_path = None
+    fname = None
+    sub = ""
+    ftype = "output"
+    
+    # 1. Try to get file from History API
+    if output_id in outputs:
+        node_output = outputs[output_id]
+        print(f"[Retexturity] Output Data for {output_id}: {node_output}")
+        
+        valid_keys = ['images', 'gifs', 'files', 'meshes']
+        for key in valid_keys:
+            if key in node_output and len(node_output[key]) > 0:
+                target_file = node_output[key][0]
+                print(f"[Retexturity] Found target file in key '{key}': {target_file}")
+                break
+    
+    # 2. If API failed (silent node), try Fallback: Scan Output Folder for latest file
+    comfyui_output_dir_pref = prefs.comfyui_output_path
+    
+    if not target_file:
+        print(f"[Retexturity] Target node {output_id} not in history outputs.")
+        
+        if comfyui_output_dir_pref and os.path.exists(comfyui_output_dir_pref):
+             print(f"[Retexturity] Attempting fallback: Scaning {comfyui_output_dir_pref} for recent files...")
+             # Find latest file
+             latest_file = None
+             latest_time = 0
+             
+             # Scan for specific extensions to be safe
+             valid_exts = ['.glb', '.gltf', '.obj', '.png', '.jpg', '.exr']
+             
+             for f in os.listdir(comfyui_output_dir_pref):
+                 fp = os.path.join(comfyui_output_dir_pref, f)
+                 if os.path.isfile(fp):
+                     ext = os.path.splitext(f)[1].lower()
+                     if ext in valid_exts:
+                         mtime = os.path.getmtime(fp)
+                         if mtime > latest_time:
+                             latest_time = mtime
+                             latest_file = fp
+             
+             # Check if it was created AFTER we started
+             # Giving a small buffer (e.g. -1s) just in case of clock skew, though unlikely on same machine
+             if latest_file and latest_time >= (job.start_time - 1.0):
+                 print(f"[Retexturity] Fallback SUCCESS. Found recent file: {latest_file}")
+                 source_path = latest_file
+                 fname = os.path.basename(latest_file)
+                 # We have a source path directly now
+             else:
+                 print(f"[Retexturity] Fallback Failed. No new files found. Latest was {latest_file} at {latest_time} (Job start: {job.start_time})")
         else:
-            self.report({'ERROR'}, "Failed to retrieve file via Copy or Download.")
+             print(f"[Retexturity] No ComfyUI Output Path configured for fallback.")
 
+    # 3. Construct Source/Dest if we got it from API
+    if target_file and "filename" in target_file:
+        fname = target_file.get("filename")
+        sub = target_file.get("subfolder", "")
+        ftype = target_file.get("type", "output")
+        
+    if not fname and not source_path:
+         print(f"[Retexturity] ERROR: Could not determine result file from API or Fallback.")
+         job.error = "Could not determine result file. Check console."
+         return None, None
 
-    def cancel(self, context):
-        props = context.scene.retexturity_props
-        props.is_generating = False
-        wm = context.window_manager
-        if self._timer:
-            wm.event_timer_remove(self._timer)
-            self._timer = None
-        return {'FINISHED'}
+    print(f"[Retexturity] Processing result for file: {fname}")
+    
+    store = get_artifact_store(prefs)
+
+    # If we didn't get source_path from fallback, try to build it from API data
+    if not source_path and comfyui_output_dir_pref:
+         comfyui_output_dir_abs = os.path.abspath(bpy.path.abspath(comfyui_output_dir_pref))
+         if os.path.exists(comfyui_output_dir_abs):
+            if sub:
+                source_path = os.path.join(comfyui_output_dir_abs, sub, fname)
+            else:
+                source_path = os.path.join(comfyui_output_dir_abs, fname)
+            
+            # Check existence
+            if not os.path.exists(source_path):
+                 print(f"[Retexturity] File from API not found at {source_path}")
+
+    final_path = None
+    
+    if source_path and os.path.exists(source_path):
+        # Copy local file into the store
+        try:
+            final_path = store.put_file(source_path, filename=fname, **result_metadata(job))
+            print(f"[Retexturity] Stored {source_path} -> {final_path}")
+        except Exception as e:
+            print(f"[Retexturity] Copy FAILED: {e}")
+            job.error = f"Failed to copy: {e}"
+            return None, None
+    elif target_file:
+         # Fallback to API, off the timer thread
+         print(f"[Retexturity] Trying API download for {fname}")
+         future = get_download_pool().submit(fetch_result, job.server, fname, sub, ftype)
+         _downloads[job.job_id] = (future, fname)
+         return DOWNLOADING, fname
+
+    if final_path:
+        collect_store_garbage(store, final_path, prefs)
+
+    return final_path, fname
 
 class RETEXTURITY_OT_import_result(bpy.types.Operator):
     """Import the generated model into the scene"""
     bl_idname = "retexturity.import_result"
     bl_label = "Import Result"
     bl_options = {'REGISTER', 'UNDO'}
+
+    job_id: bpy.props.StringProperty()
     
     def execute(self, context):
         props = context.scene.retexturity_props
-        filepath = props.latest_generated_filepath
+        _, job = find_job(props, self.job_id)
+        if job is None:
+            self.report({'ERROR'}, "Job not found.")
+            return {'CANCELLED'}
+        filepath = job.result_path
         
         if not filepath or not os.path.exists(filepath):
             self.report({'ERROR'}, "File not found.")
@@ -861,23 +2083,47 @@ class RETEXTURITY_OT_import_result(bpy.types.Operator):
         except:
             pass
 
-        # Load Logic
+        # Load Logic. A failed import leaves the job DONE so it can be retried.
+        imported = False
         ext = os.path.splitext(fname)[1].lower()
         if ext in ['.png', '.jpg', '.jpeg', '.tga', '.exr']:
             try:
-                loaded_img = bpy.data.images.load(filepath)
+                # Stored results are named by content hash: same path, same pixels
+                loaded_img = bpy.data.images.load(filepath, check_existing=True)
+                if job.result_name:
+                    loaded_img.name = job.result_name
                 self.report({'INFO'}, f"Generated image loaded: {loaded_img.name}")
+                imported = True
             except Exception as e:
                 print(f"[Retexturity] Failed to load image: {e}")
                 self.report({'ERROR'}, f"Could not load image into Blender: {e}")
         
         elif ext in ['.glb', '.gltf']:
             try:
+                images_before = import_dedup.ids_snapshot(bpy.data.images)
+                materials_before = import_dedup.ids_snapshot(bpy.data.materials)
                 bpy.ops.import_scene.gltf(filepath=filepath)
                 self.report({'INFO'}, f"Imported GLB: {fname}")
+                target = bpy.data.objects.get(job.texture_target_name) if job.texture_target_name else None
+                source = bpy.data.objects.get(job.object_name) if job.place_at_source else None
+                lost = mesh_export.apply_result_in_place(target, list(context.selected_objects)) if target else None
+                if lost is not None:
+                    target.select_set(True)
+                    context.view_layer.objects.active = target
+                    self.report({'INFO'}, f"Applied new texture to {target.name}")
+                    if lost:
+                        self.report({'WARNING'}, f"{target.name}: the new mesh has no {', '.join(lost)}")
+                elif source:
+                    object_render.place_like(list(context.selected_objects), source)
+
+                dedup = import_dedup.dedup_import(images_before, materials_before)
+                if dedup["images"] or dedup["materials"]:
+                    self.report({'INFO'}, f"Reused {dedup['images']} textures and {dedup['materials']} materials "
+                                          f"(~{dedup['bytes'] / (1024 * 1024):.1f} MB saved)")
                 for obj in context.selected_objects:
                     obj.select_set(True)
                     context.view_layer.objects.active = obj
+                imported = True
             except Exception as e:
                 print(f"[Retexturity] Failed to import GLB: {e}")
                 self.report({'ERROR'}, f"Failed to import GLB: {e}")
@@ -894,6 +2140,7 @@ class RETEXTURITY_OT_import_result(bpy.types.Operator):
                 for obj in context.selected_objects:
                     obj.select_set(True)
                     context.view_layer.objects.active = obj
+                imported = True
             except Exception as e:
                     print(f"[Retexturity] Failed to import OBJ: {e}")
                     self.report({'ERROR'}, f"Failed to import OBJ: {e}")
@@ -901,46 +2148,383 @@ class RETEXTURITY_OT_import_result(bpy.types.Operator):
             print(f"[Retexturity] Unknown file type for auto-load: {ext}")
             self.report({'INFO'}, f"File saved to: {filepath} (Type unknown to auto-load)")
             
-        # Clear property after import? Up to user preference, but usually yes.
-        props.latest_generated_filepath = ""
+        if imported:
+            job.state = 'IMPORTED'
             
         return {'FINISHED'}
 
+IMAGE_RESULT_EXTS = {'.png', '.jpg', '.jpeg', '.tga', '.exr'}
+MODEL_RESULT_EXTS = {'.glb', '.gltf', '.obj'}
+
+def import_model_file(filepath):
+    """Import a GLB/glTF/OBJ file and return the objects it created"""
+    before = import_dedup.ids_snapshot(bpy.data.objects)
+    if filepath.lower().endswith('.obj'):
+        bpy.ops.wm.obj_import(filepath=filepath)
+    else:
+        bpy.ops.import_scene.gltf(filepath=filepath)
+    return import_dedup.new_datablocks(bpy.data.objects, before)
+
+def linked_duplicates(objects):
+    """Copy objects sharing their mesh data, keeping parenting and collections"""
+    copies = {obj: obj.copy() for obj in objects}
+    for obj, copy in copies.items():
+        if obj.parent in copies:
+            copy.parent = copies[obj.parent]
+        for collection in obj.users_collection:
+            collection.objects.link(copy)
+    return list(copies.values())
+
+class RETEXTURITY_OT_import_all(bpy.types.Operator):
+    """Import every finished result of this scene as one undo step, laid out on a grid"""
+    bl_idname = "retexturity.import_all"
+    bl_label = "Import All Results"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    spacing: bpy.props.FloatProperty(
+        name="Grid Spacing",
+        default=2.0,
+        min=0.0,
+        subtype='DISTANCE',
+        description="Distance between imported results"
+    )
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        jobs = [job for job in props.jobs
+                if job.state == 'DONE' and job.result_path and os.path.exists(job.result_path)]
+        if not jobs:
+            self.report({'WARNING'}, "No finished results to import.")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        images_before = import_dedup.ids_snapshot(bpy.data.images)
+        materials_before = import_dedup.ids_snapshot(bpy.data.materials)
+
+        # Each distinct file still goes through the glTF importer, which creates
+        # its datablocks (meshes, materials, textures) one file at a time. What
+        # is saved over N Import Result clicks: one undo push instead of N,
+        # identical results share a stored file and are imported once (the
+        # rest are linked duplicates), and the texture dedup pass runs once.
+        imported = {}
+        applied = {}
+        placed = []
+        lost_data = []
+        failed = 0
+        for job in jobs:
+            path = job.result_path
+            ext = os.path.splitext(path)[1].lower()
+            try:
+                if ext in IMAGE_RESULT_EXTS:
+                    image = bpy.data.images.load(path, check_existing=True)
+                    if job.result_name:
+                        image.name = job.result_name
+                elif ext in MODEL_RESULT_EXTS:
+                    target = bpy.data.objects.get(job.texture_target_name) if job.texture_target_name else None
+                    source = bpy.data.objects.get(job.object_name) if job.place_at_source else None
+                    lost = None
+                    if target and path in applied:
+                        lost = mesh_export.replace_mesh(target, applied[path])
+                    elif target and path not in imported:
+                        objects = import_model_file(path)
+                        lost = mesh_export.apply_result_in_place(target, objects)
+                        if lost is not None:
+                            applied[path] = target.data
+                        else:
+                            imported[path] = objects
+                            placed.append(objects)
+                    else:
+                        objects = linked_duplicates(imported[path]) if path in imported else import_model_file(path)
+                        imported.setdefault(path, objects)
+                        # Multi-object results go back to their source object, the rest onto the grid
+                        if not (source and object_render.place_like(objects, source)):
+                            placed.append(objects)
+                    if lost:
+                        lost_data.append(f"{target.name} ({', '.join(lost)})")
+                else:
+                    continue
+            except Exception as e:
+                print(f"[Retexturity] Failed to import {path}: {e}")
+                failed += 1
+                continue
+            job.state = 'IMPORTED'
+
+        # Grid around the 3D cursor, one cell per result
+        origin = context.scene.cursor.location
+        columns = max(1, math.ceil(math.sqrt(len(placed))))
+        for index, objects in enumerate(placed):
+            row, column = divmod(index, columns)
+            offset = (column * self.spacing, -row * self.spacing, 0.0)
+            for obj in objects:
+                if obj.parent not in objects:
+                    obj.location = (origin.x + offset[0], origin.y + offset[1], origin.z)
+
+        dedup = import_dedup.dedup_import(images_before, materials_before)
+        elapsed = time.perf_counter() - start
+        print(f"[Retexturity] Import All: {len(jobs) - failed} results ({len(imported)} files) in {elapsed:.2f}s, "
+              f"merged {dedup['images']} textures / {dedup['materials']} materials")
+
+        if lost_data:
+            print(f"[Retexturity] Import All: new meshes have no shape keys / vertex groups for {'; '.join(lost_data)}")
+            self.report({'WARNING'}, f"{len(lost_data)} retextured objects lost shape keys or vertex groups (see console).")
+        if failed:
+            self.report({'WARNING'}, f"Imported {len(jobs) - failed} results, {failed} failed (see console).")
+        else:
+            self.report({'INFO'}, f"Imported {len(jobs)} results in {elapsed:.1f}s "
+                                  f"(~{dedup['bytes'] / (1024 * 1024):.1f} MB of textures shared)")
+        return {'FINISHED'}
+
+def add_stored_job(props, result):
+    """Add an artifact store result (see ArtifactStore.latest) as a finished job"""
+    job = props.jobs.add()
+    job.job_id = uuid.uuid4().hex
+    job.prompt_id = result["prompt_id"] or ""
+    job.state = 'DONE'
+    job.progress = 1.0
+    job.workflow_name = result["workflow"] or ""
+    job.object_name = result["object_name"] or ""
+    job.result_path = result["path"]
+    job.result_name = result["filename"] or ""
+    return job
+
+class RETEXTURITY_OT_load_latest(bpy.types.Operator):
+    """Pick the most recent stored result for the current workflow and active object"""
+    bl_idname = "retexturity.load_latest"
+    bl_label = "Latest Stored Result"
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        prefs = context.preferences.addons[__package__].preferences
+        obj = context.active_object
+
+        store = get_artifact_store(prefs)
+        result = store.latest(
+            workflow=os.path.basename(props.workflow_file),
+            object_name=obj.name if obj else "")
+        if not result:
+            self.report({'WARNING'}, "No stored result for this workflow and object.")
+            return {'CANCELLED'}
+
+        add_stored_job(props, result)
+        self.report({'INFO'}, f"Selected {result['filename']}")
+        return {'FINISHED'}
+
 class RETEXTURITY_OT_discard_result(bpy.types.Operator):
-    """Discard the generated result"""
+    """Remove the job from the job table"""
     bl_idname = "retexturity.discard_result"
     bl_label = "Discard"
+
+    job_id: bpy.props.StringProperty()
     
     def execute(self, context):
         props = context.scene.retexturity_props
-        props.latest_generated_filepath = ""
+        index, job = find_job(props, self.job_id)
+        if job is None:
+            return {'CANCELLED'}
+        if job.state in ACTIVE_JOB_STATES:
+            self.report({'WARNING'}, "Cancel the job before discarding it.")
+            return {'CANCELLED'}
+        props.jobs.remove(index)
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_retry_job(bpy.types.Operator):
+    """Queue the same prompt again"""
+    bl_idname = "retexturity.retry_job"
+    bl_label = "Retry"
+
+    job_id: bpy.props.StringProperty()
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        _, job = find_job(props, self.job_id)
+        if job is None or not job.prompt_json:
+            self.report({'ERROR'}, "Nothing to retry.")
+            return {'CANCELLED'}
+
+        if job.lane == 'BULK':
+            job.state = 'PENDING'
+            job.error = ""
+            job.start_time = time.time()
+            journal_submit(job)
+        elif not submit_job(job):
+            self.report({'ERROR'}, f"Could not queue prompt on {job.server}.")
+            return {'CANCELLED'}
+
+        ensure_dispatcher()
+        self.report({'INFO'}, f"Prompt re-queued: {job.prompt_id or 'bulk lane'}")
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_clear_jobs(bpy.types.Operator):
+    """Remove finished, failed and cancelled jobs from the job table"""
+    bl_idname = "retexturity.clear_jobs"
+    bl_label = "Clear Finished"
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        for index in reversed(range(len(props.jobs))):
+            if props.jobs[index].state in {'IMPORTED', 'FAILED', 'CANCELLED'}:
+                props.jobs.remove(index)
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_reset_stages(bpy.types.Operator):
+    """Forget the cached uploads so the next Generate re-renders and runs every stage"""
+    bl_idname = "retexturity.reset_stages"
+    bl_label = "Refresh Input"
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        props.stage_snapshot_json = ""
         return {'FINISHED'}
 
 class RETEXTURITY_OT_cancel(bpy.types.Operator):
-    """Cancel the current generation process"""
+    """Cancel a running generation"""
     bl_idname = "retexturity.cancel"
     bl_label = "Cancel Generation"
+
+    job_id: bpy.props.StringProperty()
     
     def execute(self, context):
         props = context.scene.retexturity_props
-        # This operator just sets the flag, the modal op ensures cleanup if it reads it?
-        # Actually modal op holds the timer. We can't easily kill it from outside without shared state or brute force.
-        # But wait, modal op checks 'TIMER'. It doesn't check 'is_generating' actively for cancellation unless we tell it.
-        # Actually simplest way: just set is_generating to False, and modal will see it?
-        # No, 'self' instance in modal is not accessible here easily.
-        # BUT: The modal operator returns running modal. 
-        # For valid cancellation, the modal needs to check a prop.
-        
-        # Let's verify if user can click this button while modal is blocking? 
-        # Wait, if modal is RUNNING_MODAL with PASS_THROUGH, UI IS interactive!
-        # So yes, user can click this button.
-        
-        props.is_generating = False
+        _, job = find_job(props, self.job_id)
+        if job is None:
+            return {'CANCELLED'}
+
+        cancel_jobs([job])
+        self.report({'INFO'}, f"Cancelling {job.prompt_id}...")
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_cancel_all(bpy.types.Operator):
+    """Cancel every queued or running job of this scene on the server"""
+    bl_idname = "retexturity.cancel_all"
+    bl_label = "Cancel All"
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        jobs = [job for job in props.jobs if job.state in {'PENDING', 'QUEUED', 'RUNNING'}]
+        if not jobs:
+            return {'CANCELLED'}
+
+        cancel_jobs(jobs)
+        self.report({'INFO'}, f"Cancelling {len(jobs)} jobs...")
         return {'FINISHED'}
-# We need to update modal to check props.is_generating
 
 
 
+# ------------------------------------------------------------------------
+# Result Gallery
+# ------------------------------------------------------------------------
+# Lists the artifact store, newest first. Previews are keyed by the content
+# hash the store names its files by. Image results go straight to
+# bpy.utils.previews, which makes their thumbnails in Blender's own
+# background job; models are rasterized by the ThumbnailCache worker and
+# picked up by a timer once ready.
+
+GALLERY_PAGE_SIZE = 12
+
+_gallery = {"root": None, "items": None, "error": None}
+_previews = None
+_thumbnails = None
+
+def get_thumbnail_cache():
+    global _thumbnails
+    if _thumbnails is None:
+        root = bpy.utils.extension_path_user(__package__, path="thumbnails", create=True)
+        _thumbnails = ThumbnailCache(root)
+    return _thumbnails
+
+def gallery_items(prefs):
+    """
+    Stored results shown in the gallery, or None until load_gallery() has
+    read them. Called from draw(), so it never opens the store itself.
+    """
+    if _gallery["root"] != artifact_store_root(prefs) or _gallery["items"] is None:
+        if not bpy.app.timers.is_registered(load_gallery):
+            bpy.app.timers.register(load_gallery)
+        return None
+    return _gallery["items"]
+
+def load_gallery():
+    """Open the store and thumbnail cache (creating them if needed) and read the gallery items"""
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    try:
+        store = get_artifact_store(prefs)
+        get_thumbnail_cache()
+        items = [item for item in store.recent() if os.path.exists(item["path"])]
+        error = None
+    except Exception as e:
+        print(f"[Retexturity] Could not read stored results: {e}")
+        items, error = [], str(e)
+    _gallery.update(root=artifact_store_root(prefs), items=items, error=error)
+    tag_redraw()
+    return None
+
+def invalidate_gallery():
+    _gallery["items"] = None
+    _gallery["error"] = None
+
+def gallery_icon(item):
+    """Preview icon id of a stored result, or 0 if its thumbnail is not ready or failed"""
+    key = f"{item['hash']}{item['ext']}"
+    if key in _previews:
+        return _previews[key].icon_id
+    if item["ext"] in IMAGE_RESULT_EXTS:
+        return _previews.load(key, item["path"], 'IMAGE').icon_id
+
+    thumbnails = get_thumbnail_cache()
+    thumb_path = thumbnails.get(item["hash"])
+    if thumb_path:
+        return _previews.load(key, thumb_path, 'IMAGE').icon_id
+    if thumbnails.request(item["hash"], item["path"]) and not bpy.app.timers.is_registered(poll_thumbnails):
+        bpy.app.timers.register(poll_thumbnails, first_interval=0.2)
+    return 0
+
+def poll_thumbnails():
+    if _thumbnails.pop_finished():
+        tag_redraw()
+    return 0.2 if _thumbnails.busy() else None
+
+class RETEXTURITY_OT_gallery_page(bpy.types.Operator):
+    """Show the previous or next page of results"""
+    bl_idname = "retexturity.gallery_page"
+    bl_label = "Gallery Page"
+
+    step: bpy.props.IntProperty(default=1)
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        prefs = context.preferences.addons[__package__].preferences
+        pages = max(1, math.ceil(len(gallery_items(prefs) or []) / GALLERY_PAGE_SIZE))
+        props.gallery_page = min(max(props.gallery_page + self.step, 0), pages - 1)
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_refresh_gallery(bpy.types.Operator):
+    """Re-read the stored results (e.g. after another Blender wrote to the same output folder)"""
+    bl_idname = "retexturity.refresh_gallery"
+    bl_label = "Refresh Gallery"
+
+    def execute(self, context):
+        invalidate_gallery()
+        return {'FINISHED'}
+
+class RETEXTURITY_OT_gallery_import(bpy.types.Operator):
+    """Import this stored result into the scene"""
+    bl_idname = "retexturity.gallery_import"
+    bl_label = "Import Stored Result"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    path: bpy.props.StringProperty()
+
+    def execute(self, context):
+        props = context.scene.retexturity_props
+        prefs = context.preferences.addons[__package__].preferences
+        result = next((item for item in gallery_items(prefs) or [] if item["path"] == self.path), None)
+        if result is None or not os.path.exists(self.path):
+            self.report({'ERROR'}, "Stored result not found.")
+            return {'CANCELLED'}
+
+        job = add_stored_job(props, result)
+        return bpy.ops.retexturity.import_result(job_id=job.job_id)
+
 # ------------------------------------------------------------------------
 # Panel
 # ------------------------------------------------------------------------
@@ -982,9 +2566,54 @@ def draw_node_ui(layout, state, props):
                     col.prop(param, "str_val", text=param.param_name)
                 elif param.value_type == 'BOOL':
                     col.prop(param, "bool_val", text=param.param_name)
+                elif param.value_type == 'ENUM':
+                    col.prop(param, "enum_val", text=param.param_name)
                 elif param.value_type == 'IMAGE':
                     col.prop(param, "image_path", text=param.param_name)
 
+JOB_STATE_ICONS = {
+    'PENDING': 'PAUSE',
+    'QUEUED': 'SORTTIME',
+    'RUNNING': 'PLAY',
+    'DONE': 'CHECKMARK',
+    'IMPORTED': 'IMPORT',
+    'FAILED': 'ERROR',
+    'CANCELLING': 'CANCEL',
+    'CANCELLED': 'CANCEL',
+}
+
+def draw_job_ui(layout, job):
+    col = layout.column(align=True)
+    row = col.row(align=True)
+
+    title = os.path.splitext(job.result_name or job.workflow_name or "Job")[0]
+    if job.object_name:
+        title = f"{title} ({job.object_name})"
+    row.label(text=title, icon=JOB_STATE_ICONS.get(job.state, 'QUESTION'))
+
+    if job.state == 'PENDING':
+        row.label(text="Bulk lane")
+        row.operator("retexturity.cancel", icon='CANCEL', text="").job_id = job.job_id
+    elif job.state == 'QUEUED':
+        status = f"Queued #{job.queue_position}" if job.queue_position else "Queued"
+        row.label(text=status)
+        row.operator("retexturity.cancel", icon='CANCEL', text="").job_id = job.job_id
+    elif job.state == 'RUNNING':
+        row.label(text="Running")
+        row.operator("retexturity.cancel", icon='CANCEL', text="").job_id = job.job_id
+    elif job.state == 'CANCELLING':
+        row.label(text="Cancelling...")
+    elif job.state == 'DONE':
+        row.operator("retexturity.import_result", icon='IMPORT', text="Import").job_id = job.job_id
+        row.operator("retexturity.discard_result", icon='TRASH', text="").job_id = job.job_id
+    else:
+        if job.prompt_json:
+            row.operator("retexturity.retry_job", icon='FILE_REFRESH', text="").job_id = job.job_id
+        row.operator("retexturity.discard_result", icon='TRASH', text="").job_id = job.job_id
+
+    if job.state == 'FAILED' and job.error:
+        col.label(text=job.error)
+
 class RETEXTURITY_PT_main(bpy.types.Panel):
     bl_label = "UliImageTo3D"
     bl_idname = "RETEXTURITY_PT_main"
@@ -1010,6 +2639,15 @@ class RETEXTURITY_PT_main(bpy.types.Panel):
         row = box.row()
         row.prop(props, "workflow_file", text="")
         row.operator("retexturity.load_workflow", icon='FILE_REFRESH', text="")
+
+        if props.full_workflow_json:
+            row = box.row()
+            warmup = _warmup.status(prefs.api_url)
+            if warmup:
+                row.label(text=warmup["message"], icon=WARMUP_STATE_ICONS[warmup["state"]])
+            else:
+                row.label(text="Models not warmed up", icon='FREEZE')
+            row.operator("retexturity.warmup", icon='FORCE_CHARGE', text="")
         
         if props.cached_nodes_json:
             box.prop(props, "input_node_id")
@@ -1068,24 +2706,107 @@ class RETEXTURITY_PT_main(bpy.types.Panel):
 
                 layout.separator()
 
-            if props.is_generating:
-                layout.operator("retexturity.cancel", icon='CANCEL', text="Generating... (Click to Cancel)")
-            elif props.latest_generated_filepath:
-                # Show Result Actions
-                box_res = layout.box()
-                box_res.label(text="Generation Complete!", icon='CHECKMARK')
-                fname = os.path.basename(props.latest_generated_filepath)
-                box_res.label(text=fname)
-                
-                row_res = box_res.row()
-                row_res.operator("retexturity.import_result", icon='IMPORT', text="Import Result")
-                row_res.operator("retexturity.discard_result", icon='TRASH', text="Discard")
+            box_tex = layout.box()
+            box_tex.prop(props, "texture_only_mode", icon='TEXTURE')
+            if props.texture_only_mode:
+                obj = context.active_object
+                if obj and obj.type == 'MESH':
+                    box_tex.label(text=f"Mesh: {obj.name}", icon='MESH_DATA')
+                else:
+                    box_tex.label(text="Select a mesh object", icon='ERROR')
+
+            box_stage = layout.box()
+            row_stage = box_stage.row()
+            row_stage.prop(props, "staged_execution", icon='LINKED')
+            if props.staged_execution and props.stage_snapshot_json:
+                row_stage.operator("retexturity.reset_stages", icon='FILE_REFRESH', text="")
+
+            box_pre = layout.box()
+            box_pre.prop(props, "preprocess_enabled")
+            if props.preprocess_enabled:
+                col_pre = box_pre.column(align=True)
+                col_pre.prop(props, "preprocess_size")
+                col_pre.prop(props, "preprocess_padding")
+                col_pre.prop(props, "preprocess_format")
+                if props.preprocess_format != 'PNG':
+                    col_pre.prop(props, "preprocess_quality")
+
+            row_gen = layout.row(align=True)
+            if is_bulk_workflow(prefs, props.workflow_file):
+                row_gen.operator("retexturity.generate", icon='SEQ_STRIP_DUPLICATE', text="Generate (Bulk Lane)")
             else:
-                layout.operator("retexturity.generate", icon='RENDER_RESULT')
+                row_gen.operator("retexturity.generate", icon='RENDER_RESULT')
+                row_gen.operator("retexturity.generate", icon='SEQ_STRIP_DUPLICATE', text="").bulk = True
+            if len(context.selected_objects) > 1:
+                layout.operator("retexturity.generate_selected", icon='OUTLINER_OB_GROUP_INSTANCE',
+                                text=f"Generate per Object ({len(context.selected_objects)})")
+            row_gen.operator("retexturity.load_latest", icon='RECOVER_LAST', text="")
+
+            if len(props.jobs) > 0:
+                box_jobs = layout.box()
+                row_jobs = box_jobs.row()
+                row_jobs.label(text="Jobs", icon='SEQUENCE')
+                if any(job.state in {'PENDING', 'QUEUED', 'RUNNING'} for job in props.jobs):
+                    row_jobs.operator("retexturity.cancel_all", icon='CANCEL', text="")
+                if sum(1 for job in props.jobs if job.state == 'DONE') > 1:
+                    row_jobs.operator("retexturity.import_all", icon='IMPORT', text="")
+                row_jobs.operator("retexturity.clear_jobs", icon='BRUSH_DATA', text="")
+                for job in reversed(props.jobs):
+                    draw_job_ui(box_jobs, job)
             
             layout.separator()
             layout.operator("retexturity.open_folder", icon='FILE_FOLDER')
 
+class RETEXTURITY_PT_gallery(bpy.types.Panel):
+    bl_label = "Result Gallery"
+    bl_idname = "RETEXTURITY_PT_gallery"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Retexturity'
+    bl_parent_id = "RETEXTURITY_PT_main"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.retexturity_props
+        prefs = context.preferences.addons[__package__].preferences
+
+        items = gallery_items(prefs)
+        row = layout.row(align=True)
+        if items is None:
+            row.label(text="Loading stored results...", icon='TIME')
+            return
+        if _gallery["error"]:
+            row.label(text=f"Store unavailable: {_gallery['error']}", icon='ERROR')
+            row.operator("retexturity.refresh_gallery", icon='FILE_REFRESH', text="")
+            return
+        if not items:
+            row.label(text="No stored results yet", icon='INFO')
+            row.operator("retexturity.refresh_gallery", icon='FILE_REFRESH', text="")
+            return
+
+        pages = max(1, math.ceil(len(items) / GALLERY_PAGE_SIZE))
+        page = min(props.gallery_page, pages - 1)
+        row.operator("retexturity.gallery_page", icon='TRIA_LEFT', text="").step = -1
+        row.label(text=f"Page {page + 1} / {pages} ({len(items)} results)")
+        row.operator("retexturity.gallery_page", icon='TRIA_RIGHT', text="").step = 1
+        row.operator("retexturity.refresh_gallery", icon='FILE_REFRESH', text="")
+
+        grid = layout.grid_flow(row_major=True, columns=0, even_columns=True, even_rows=True, align=True)
+        for item in items[page * GALLERY_PAGE_SIZE:(page + 1) * GALLERY_PAGE_SIZE]:
+            col = grid.box().column(align=True)
+            icon_id = gallery_icon(item)
+            if icon_id:
+                col.template_icon(icon_value=icon_id, scale=5.0)
+            elif item["ext"] in THUMBNAIL_MODEL_EXTS and not get_thumbnail_cache().failed(item["hash"]):
+                col.label(text="Rendering preview...", icon='TIME')
+            else:
+                col.label(text="No preview", icon='FILE_3D')
+            title = os.path.splitext(item["filename"] or item["hash"][:12])[0]
+            if item["object_name"]:
+                title = item["object_name"]
+            col.operator("retexturity.gallery_import", text=title, icon='IMPORT').path = item["path"]
+
 # ------------------------------------------------------------------------
 # Registration
 # ------------------------------------------------------------------------
@@ -1094,22 +2815,87 @@ classes = (
     RetexturityAddonPreferences,
     RetexturityNodeState,
     RetexturityNodeParam,
+    RetexturityJob,
     RetexturityProperties,
     RETEXTURITY_OT_load_workflow,
+    RETEXTURITY_OT_refresh_schema,
+    RETEXTURITY_OT_warmup,
     RETEXTURITY_OT_generate,
     RETEXTURITY_OT_cancel,
+    RETEXTURITY_OT_cancel_all,
+    RETEXTURITY_OT_reset_stages,
     RETEXTURITY_OT_import_result,
+    RETEXTURITY_OT_import_all,
+    RETEXTURITY_OT_generate_selected,
+    RETEXTURITY_OT_load_latest,
     RETEXTURITY_OT_discard_result,
+    RETEXTURITY_OT_retry_job,
+    RETEXTURITY_OT_clear_jobs,
     RETEXTURITY_OT_open_folder,
+    RETEXTURITY_OT_gallery_page,
+    RETEXTURITY_OT_refresh_gallery,
+    RETEXTURITY_OT_gallery_import,
     RETEXTURITY_PT_main,
+    RETEXTURITY_PT_gallery,
 )
 
+def reattach_on_register():
+    reattach_jobs()
+    return None
+
+@bpy.app.handlers.persistent
+def on_load_post(*args):
+    # Jobs lost with an unsaved session or a crash come back from the journal
+    reattach_jobs()
+    # Jobs saved in the .blend are still in the server's queue/history
+    if any(True for _ in iter_jobs(ACTIVE_JOB_STATES)):
+        ensure_dispatcher()
+
+@bpy.app.handlers.persistent
+def on_save_post(*args):
+    # Jobs journaled while the file was unsaved (or under another name) are
+    # reattached by its path, so follow the file to where it was saved
+    journal_rekey()
+
 def register():
+    global _previews
+    _previews = bpy.utils.previews.new()
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.retexturity_props = bpy.props.PointerProperty(type=RetexturityProperties)
+    bpy.app.handlers.load_post.append(on_load_post)
+    bpy.app.handlers.save_post.append(on_save_post)
+    # Enabling the addon in a running session doesn't trigger load_post
+    bpy.app.timers.register(reattach_on_register, first_interval=1.0)
 
 def unregister():
+    global _previews, _journal, _download_pool
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    if on_save_post in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.remove(on_save_post)
+    if bpy.app.timers.is_registered(dispatch_jobs):
+        bpy.app.timers.unregister(dispatch_jobs)
+    if bpy.app.timers.is_registered(redraw_warmup):
+        bpy.app.timers.unregister(redraw_warmup)
+    if bpy.app.timers.is_registered(flush_notifications):
+        bpy.app.timers.unregister(flush_notifications)
+    if bpy.app.timers.is_registered(poll_thumbnails):
+        bpy.app.timers.unregister(poll_thumbnails)
+    if bpy.app.timers.is_registered(load_gallery):
+        bpy.app.timers.unregister(load_gallery)
+    if _download_pool is not None:
+        _download_pool.shutdown(wait=False, cancel_futures=True)
+        _download_pool = None
+    _downloads.clear()
+    _sound_cache.update(device=None, key=None, sound=None)
+    if _journal is not None:
+        # Unfinished jobs of this session become adoptable by other instances
+        _journal.close_session()
+        _journal = None
+    if _previews is not None:
+        bpy.utils.previews.remove(_previews)
+        _previews = None
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.retexturity_props
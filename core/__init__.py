@@ -0,0 +1,5 @@
+# ------------------------------------------------------------------------
+# Retexturity core helpers
+# ------------------------------------------------------------------------
+# Modules in this package must not import bpy so they can be used (and
+# benchmarked) outside of Blender.
@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+import contextlib
+
+# ------------------------------------------------------------------------
+# Content-addressed artifact store
+# ------------------------------------------------------------------------
+# Result files live under objects/<2 hex>/<sha256><ext>, so identical outputs
+# are stored once. Metadata (workflow, params, prompt_id, timings) goes into
+# a small SQLite index that also drives LRU garbage collection.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (hash, ext)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    filename TEXT,
+    workflow TEXT,
+    object_name TEXT,
+    params TEXT,
+    prompt_id TEXT,
+    timings TEXT,
+    created REAL NOT NULL,
+    FOREIGN KEY (hash, ext) REFERENCES blobs(hash, ext) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS results_lookup ON results(workflow, object_name, created);
+CREATE INDEX IF NOT EXISTS results_prompt ON results(prompt_id);
+CREATE INDEX IF NOT EXISTS blobs_lru ON blobs(last_access);
+"""
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ArtifactStore:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.db_path = os.path.join(self.root, "retexturity_index.db")
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=10.0)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def blob_path(self, digest, ext):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{ext}")
+
+    # --------------------------------------------------------------------
+    # Writing
+    # --------------------------------------------------------------------
+
+    def put_file(self, src_path, filename=None, **metadata):
+        """Hash and copy src_path into the store. Returns the stored path."""
+        filename = filename or os.path.basename(src_path)
+        with open(src_path, 'rb') as src:
+            return self._put_stream(src, filename, metadata)
+
+    def put_bytes(self, data, filename, **metadata):
+        """Store an in-memory result. Returns the stored path."""
+        digest = hashlib.sha256(data).hexdigest()
+        ext = os.path.splitext(filename)[1].lower()
+        path = self.blob_path(digest, ext)
+        if not os.path.exists(path):
+            self._write_atomic(path, [data])
+        return self._record(digest, ext, len(data), filename, metadata)
+
+    def _put_stream(self, src, filename, metadata):
+        ext = os.path.splitext(filename)[1].lower()
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(self.objects_dir, f".tmp-{uuid.uuid4().hex}{ext}")
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            path = self.blob_path(digest, ext)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self._record(digest, ext, size, filename, metadata)
+
+    def _write_atomic(self, path, chunks):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(self.objects_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            with open(tmp_path, 'wb') as dst:
+                for chunk in chunks:
+                    dst.write(chunk)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _record(self, digest, ext, size, filename, metadata):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT INTO blobs (hash, ext, size, created, last_access) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(hash, ext) DO UPDATE SET last_access = excluded.last_access",
+                (digest, ext, size, now, now))
+            db.execute(
+                "INSERT INTO results (hash, ext, filename, workflow, object_name, params, prompt_id, timings, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, ext, filename,
+                 metadata.get("workflow"), metadata.get("object_name"),
+                 json.dumps(metadata.get("params") or {}, sort_keys=True),
+                 metadata.get("prompt_id"),
+                 json.dumps(metadata.get("timings") or {}),
+                 now))
+        return self.blob_path(digest, ext)
+
+    # --------------------------------------------------------------------
+    # Lookups
+    # --------------------------------------------------------------------
+
+    def latest(self, workflow=None, object_name=None):
+        """Most recent result (as a dict with a 'path' key) matching the filters, or None"""
+        query = "SELECT r.* FROM results r JOIN blobs b ON b.hash = r.hash AND b.ext = r.ext"
+        clauses = []
+        args = []
+        if workflow is not None:
+            clauses.append("r.workflow = ?")
+            args.append(workflow)
+        if object_name is not None:
+            clauses.append("r.object_name = ?")
+            args.append(object_name)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY r.created DESC, r.id DESC LIMIT 1"
+
+        with self._connect() as db:
+            row = db.execute(query, args).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result["path"] = self.blob_path(row["hash"], row["ext"])
+        if not os.path.exists(result["path"]):
+            return None
+        self.touch(row["hash"], row["ext"])
+        return result
+
+    def recent(self, limit=None):
+        """Stored results, newest first, one per distinct file (dicts with a 'path' key)"""
+        query = ("SELECT r.* FROM results r JOIN blobs b ON b.hash = r.hash AND b.ext = r.ext "
+                 "WHERE r.id IN (SELECT MAX(id) FROM results GROUP BY hash, ext) "
+                 "ORDER BY r.created DESC, r.id DESC")
+        args = []
+        if limit:
+            query += " LIMIT ?"
+            args.append(limit)
+        with self._connect() as db:
+            rows = db.execute(query, args).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["path"] = self.blob_path(row["hash"], row["ext"])
+            results.append(result)
+        return results
+
+    def find_by_prompt(self, prompt_id):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT r.* FROM results r JOIN blobs b ON b.hash = r.hash AND b.ext = r.ext "
+                "WHERE r.prompt_id = ? ORDER BY r.id DESC LIMIT 1", (prompt_id,)).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result["path"] = self.blob_path(row["hash"], row["ext"])
+        return result
+
+    def touch(self, digest, ext):
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE blobs SET last_access = ? WHERE hash = ? AND ext = ?", (time.time(), digest, ext))
+
+    def total_size(self):
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    # --------------------------------------------------------------------
+    # Retention
+    # --------------------------------------------------------------------
+
+    def gc(self, max_bytes=0, max_age_days=0, protect=(), on_remove=None):
+        """
+        Drop blobs older than max_age_days (by last access), then evict the
+        least recently used ones until the store fits in max_bytes.
+        A limit of 0 disables that rule. Paths in protect are never removed.
+        on_remove(hash, ext) is called for each dropped blob, e.g. to remove
+        files derived from it. Returns (removed_count, freed_bytes).
+        """
+        protect = {os.path.abspath(p) for p in protect if p}
+        victims = []
+        with self._lock, self._connect() as db:
+            rows = db.execute("SELECT hash, ext, size, last_access FROM blobs ORDER BY last_access ASC").fetchall()
+            total = sum(row["size"] for row in rows)
+            cutoff = time.time() - max_age_days * 86400 if max_age_days > 0 else None
+
+            for row in rows:
+                path = self.blob_path(row["hash"], row["ext"])
+                if path in protect:
+                    continue
+                expired = cutoff is not None and row["last_access"] < cutoff
+                oversize = max_bytes > 0 and total > max_bytes
+                if not (expired or oversize):
+                    continue
+                victims.append((row["hash"], row["ext"], path, row["size"]))
+                total -= row["size"]
+
+            db.executemany("DELETE FROM blobs WHERE hash = ? AND ext = ?", [(v[0], v[1]) for v in victims])
+
+        freed = 0
+        for blob_hash, ext, path, size in victims:
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+            if on_remove is not None:
+                on_remove(blob_hash, ext)
+        return len(victims), freed
@@ -0,0 +1,330 @@
+import json
+import http.client
+import urllib.parse
+import os
+import uuid
+import random
+import mimetypes
+import threading
+import time
+
+from .transport import default_transport
+
+# ------------------------------------------------------------------------
+# ComfyUI API Client (using urllib to avoid external dependencies)
+# ------------------------------------------------------------------------
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for idempotent requests"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=4.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (0-based) failed attempt"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(cap * (1.0 - self.jitter), cap)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class CircuitBreaker:
+    """
+    Per-server breaker. After failure_threshold consecutive transport
+    failures the circuit opens and requests fail fast for reset_timeout
+    seconds, then a single trial request decides whether it closes again.
+    A trial that never reports back is replaced after trial_timeout seconds.
+    """
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, trial_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trial_timeout = trial_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        with self._lock:
+            return self.state == self.OPEN and time.time() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.time()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_started = now
+                return True
+            if self.state == self.HALF_OPEN and now - self.trial_started >= self.trial_timeout:
+                # The trial was lost without an outcome, send another
+                self.trial_started = now
+                return True
+            # OPEN, or HALF_OPEN with the trial request still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[Retexturity] Circuit opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(base_url):
+    """Breakers are shared by every client talking to the same server"""
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker()
+            _breakers[base_url] = breaker
+        return breaker
+
+
+class ComfyUIClient:
+    DEFAULT_TIMEOUT = 30.0
+    TRANSFER_TIMEOUT = 300.0
+
+    def __init__(self, base_url, retry_policy=None, transport=None):
+        self.base_url = base_url.rstrip('/')
+        self.client_id = str(uuid.uuid4())
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.transport = transport or default_transport()
+        self.breaker = get_breaker(self.base_url)
+        # Status and body of the last HTTP error response (e.g. /prompt validation errors)
+        self.last_error_status = None
+        self.last_error_body = None
+        self.last_response_headers = {}
+
+    def _request(self, endpoint, method='GET', data=None, headers=None, retry=None, timeout=None):
+        url = f"{self.base_url}{endpoint}"
+        if headers is None:
+            headers = {}
+        policy = self.retry_policy if retry is None else retry
+
+        if data is not None and method == 'POST':
+            if headers.get('Content-Type') == 'application/json':
+                data = json.dumps(data).encode('utf-8')
+            elif not isinstance(data, bytes):
+                 # Assume data is already encoded bytes if not json
+                 pass
+
+        self.last_error_status = None
+        self.last_error_body = None
+
+        for attempt in range(policy.max_attempts):
+            if not self.breaker.allow():
+                print(f"ComfyUI Error: {self.base_url} unavailable (circuit open), skipping {endpoint}")
+                return None
+
+            try:
+                response = self.transport.send(method, url, data=data, headers=headers,
+                                               timeout=timeout or self.DEFAULT_TIMEOUT)
+            except (OSError, http.client.HTTPException) as e:
+                # URLError, timeouts, resets, refused connections and truncated responses
+                response = None
+                error = e
+            except BaseException:
+                # Anything else still has to be recorded, or a HALF_OPEN trial never ends
+                self.breaker.record_failure()
+                raise
+
+            if response is not None:
+                self.last_response_headers = response.headers
+                if response.status < 300:
+                    self.breaker.record_success()
+                    return response.body
+
+                self.last_error_status = response.status
+                self.last_error_body = response.body
+                if response.status < 500:
+                    # The server is up, the request itself was rejected (or 304 Not Modified):
+                    # retrying won't help
+                    self.breaker.record_success()
+                    if response.status != 304:
+                        print(f"ComfyUI Error: HTTP {response.status} for {endpoint}")
+                    return None
+                error = f"HTTP {response.status}"
+
+            self.breaker.record_failure()
+            print(f"ComfyUI Error: {error} (attempt {attempt + 1}/{policy.max_attempts})")
+            if attempt + 1 < policy.max_attempts:
+                time.sleep(policy.delay(attempt))
+
+        return None
+
+    def check_connection(self):
+        # Simple check to see if server is up, e.g. getting system stats or just root
+        return self._request("/system_stats") is not None
+
+    def get_system_stats(self, retry=None):
+        response = self._request("/system_stats", retry=retry)
+        if response:
+            return json.loads(response)
+        return None
+
+    def get_object_info(self, etag=None):
+        """Return (object_info, etag). object_info is None on failure or 304 Not Modified."""
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self._request("/object_info", headers=headers, timeout=self.TRANSFER_TIMEOUT)
+        if response:
+            return json.loads(response), self.last_response_headers.get('etag')
+        return None, etag
+
+    def queue_prompt(self, prompt, client_id=None, front=False, retry=None):
+        """
+        Queue a prompt without ever running it twice. The prompt_id is chosen
+        client-side; when a submission fails without a clear rejection the
+        server's history and queue are checked for it before re-posting.
+        With front=True the prompt is put at the head of the pending queue.
+        """
+        if client_id is None:
+            client_id = self.client_id
+
+        prompt_id = str(uuid.uuid4())
+        data = {"prompt": prompt, "client_id": client_id, "prompt_id": prompt_id}
+        if front:
+            data["front"] = True
+        policy = self.retry_policy if retry is None else retry
+
+        for attempt in range(policy.max_attempts):
+            response = self._request("/prompt", method='POST', data=data,
+                                     headers={'Content-Type': 'application/json'}, retry=NO_RETRY)
+            if response:
+                return json.loads(response)
+
+            if self.last_error_status is not None and self.last_error_status < 500:
+                # Rejected (validation error): resubmitting the same prompt is pointless
+                return None
+
+            # The request may have reached the server even if the response was lost
+            found = self.find_submitted(prompt_id, client_id, prompt)
+            if found:
+                print(f"[Retexturity] Prompt {found} was accepted despite the failed response")
+                return {"prompt_id": found}
+
+            if attempt + 1 < policy.max_attempts:
+                time.sleep(policy.delay(attempt))
+
+        return None
+
+    def find_submitted(self, prompt_id, client_id, prompt):
+        """Return the id under which prompt is known to the server, or None"""
+        history = self.get_history(prompt_id, retry=NO_RETRY)
+        if history and prompt_id in history:
+            return prompt_id
+
+        queue = self.get_queue(retry=NO_RETRY)
+        if not queue:
+            return None
+        for item in queue.get("queue_running", []) + queue.get("queue_pending", []):
+            # [number, prompt_id, prompt, extra_data, outputs_to_execute]
+            if item[1] == prompt_id:
+                return item[1]
+            extra = item[3] if len(item) > 3 and isinstance(item[3], dict) else {}
+            if extra.get("client_id") == client_id and item[2] == prompt:
+                # Older servers ignore the requested prompt_id
+                return item[1]
+        return None
+
+    def upload_image(self, filepath, subfolder="", folder_type="input"):
+        # Multipart form data upload implementation using urllib
+        if not os.path.exists(filepath):
+            print(f"File not found: {filepath}")
+            return None
+
+        boundary = '----WebKitFormBoundary' + uuid.uuid4().hex
+        headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+        filename = os.path.basename(filepath)
+        mime_type = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+
+        with open(filepath, 'rb') as f:
+            file_content = f.read()
+
+        body = []
+        # Image part
+        body.append(f'--{boundary}'.encode('utf-8'))
+        body.append(f'Content-Disposition: form-data; name="image"; filename="{filename}"'.encode('utf-8'))
+        body.append(f'Content-Type: {mime_type}'.encode('utf-8'))
+        body.append(b'')
+        body.append(file_content)
+
+        # Other fields
+        if subfolder:
+            body.append(f'--{boundary}'.encode('utf-8'))
+            body.append(b'Content-Disposition: form-data; name="subfolder"')
+            body.append(b'')
+            body.append(subfolder.encode('utf-8'))
+
+        body.append(f'--{boundary}'.encode('utf-8'))
+        body.append(b'Content-Disposition: form-data; name="type"')
+        body.append(b'')
+        body.append(folder_type.encode('utf-8'))
+
+        body.append(f'--{boundary}--'.encode('utf-8'))
+        body.append(b'')
+
+        payload = b'\r\n'.join(body)
+
+        # Re-uploading identical content is harmless: ComfyUI returns the existing name
+        response = self._request("/upload/image", method='POST', data=payload, headers=headers,
+                                 timeout=self.TRANSFER_TIMEOUT)
+        if response:
+            return json.loads(response)
+        return None
+
+    def get_history(self, prompt_id, retry=None):
+        response = self._request(f"/history/{prompt_id}", retry=retry)
+        if response:
+            return json.loads(response)
+        return None
+
+    def get_queue(self, retry=None):
+        response = self._request("/queue", retry=retry)
+        if response:
+            return json.loads(response)
+        return None
+
+    def delete_from_queue(self, prompt_ids, retry=None):
+        data = {"delete": list(prompt_ids)}
+        return self._request("/queue", method='POST', data=data, headers={'Content-Type': 'application/json'},
+                             retry=retry) is not None
+
+    def interrupt(self, prompt_id=None):
+        # Newer ComfyUI only interrupts the given prompt; older builds ignore the body
+        # Never retried: on older builds a late duplicate could stop someone else's prompt
+        data = {"prompt_id": prompt_id} if prompt_id else {}
+        return self._request("/interrupt", method='POST', data=data, headers={'Content-Type': 'application/json'},
+                             retry=NO_RETRY) is not None
+
+    def get_image(self, filename, subfolder, folder_type):
+        params = urllib.parse.urlencode({
+            "filename": filename,
+            "subfolder": subfolder,
+            "type": folder_type
+        })
+        return self._request(f"/view?{params}", timeout=self.TRANSFER_TIMEOUT)
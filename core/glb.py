@@ -0,0 +1,208 @@
+import json
+import struct
+
+import numpy as np
+
+# ------------------------------------------------------------------------
+# Minimal GLB (binary glTF 2.0) reader/writer
+# ------------------------------------------------------------------------
+
+GLB_MAGIC = 0x46546C67  # b"glTF"
+CHUNK_JSON = 0x4E4F534A  # b"JSON"
+CHUNK_BIN = 0x004E4942  # b"BIN\0"
+
+COMPONENT_FLOAT = 5126
+COMPONENT_UINT16 = 5123
+COMPONENT_UINT32 = 5125
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def _pad4(data, fill=b'\x00'):
+    return data + fill * ((4 - len(data) % 4) % 4)
+
+
+def blender_to_gltf(positions):
+    """Convert Z-up Blender coordinates to Y-up glTF coordinates"""
+    out = np.empty_like(positions)
+    out[:, 0] = positions[:, 0]
+    out[:, 1] = positions[:, 2]
+    out[:, 2] = -positions[:, 1]
+    return out
+
+
+def write_glb(positions, indices, name="mesh"):
+    """
+    Build a single-mesh GLB from an (N, 3) float array of vertex positions
+    (already in glTF space) and a flat triangle index array.
+    Returns the file content as bytes.
+    """
+    positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+    if len(positions) > 0xFFFF:
+        indices = np.ascontiguousarray(indices, dtype=np.uint32).ravel()
+        index_component = COMPONENT_UINT32
+    else:
+        indices = np.ascontiguousarray(indices, dtype=np.uint16).ravel()
+        index_component = COMPONENT_UINT16
+
+    pos_bytes = positions.tobytes()
+    idx_bytes = _pad4(indices.tobytes())
+    bin_chunk = pos_bytes + idx_bytes
+
+    if len(positions):
+        pos_min = positions.min(axis=0).tolist()
+        pos_max = positions.max(axis=0).tolist()
+    else:
+        pos_min = pos_max = [0.0, 0.0, 0.0]
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "Retexturity"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "name": name}],
+        "meshes": [{
+            "name": name,
+            "primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "mode": 4}],
+        }],
+        "buffers": [{"byteLength": len(bin_chunk)}],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": len(pos_bytes), "target": TARGET_ARRAY_BUFFER},
+            {"buffer": 0, "byteOffset": len(pos_bytes), "byteLength": indices.nbytes,
+             "target": TARGET_ELEMENT_ARRAY_BUFFER},
+        ],
+        "accessors": [
+            {"bufferView": 0, "componentType": COMPONENT_FLOAT, "count": len(positions),
+             "type": "VEC3", "min": pos_min, "max": pos_max},
+            {"bufferView": 1, "componentType": index_component, "count": len(indices), "type": "SCALAR"},
+        ],
+    }
+
+    json_chunk = _pad4(json.dumps(gltf, separators=(',', ':')).encode('utf-8'), b' ')
+    total = 12 + 8 + len(json_chunk) + 8 + len(bin_chunk)
+
+    parts = [
+        struct.pack('<III', GLB_MAGIC, 2, total),
+        struct.pack('<II', len(json_chunk), CHUNK_JSON), json_chunk,
+        struct.pack('<II', len(bin_chunk), CHUNK_BIN), bin_chunk,
+    ]
+    return b''.join(parts)
+
+
+def read_glb(data):
+    """Split GLB bytes into (gltf_dict, bin_chunk). Raises ValueError on bad input."""
+    if len(data) < 20:
+        raise ValueError("File too small to be a GLB")
+    magic, version, length = struct.unpack_from('<III', data, 0)
+    if magic != GLB_MAGIC or version != 2:
+        raise ValueError("Not a glTF 2.0 binary file")
+
+    gltf = None
+    bin_chunk = b''
+    offset = 12
+    end = min(length, len(data))
+    while offset + 8 <= end:
+        chunk_len, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_len]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk.decode('utf-8'))
+        elif chunk_type == CHUNK_BIN:
+            bin_chunk = chunk
+        offset += 8 + chunk_len
+
+    if gltf is None:
+        raise ValueError("GLB has no JSON chunk")
+    return gltf, bin_chunk
+
+
+# ------------------------------------------------------------------------
+# Mesh reading
+# ------------------------------------------------------------------------
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    COMPONENT_UINT16: np.uint16,
+    COMPONENT_UINT32: np.uint32,
+    COMPONENT_FLOAT: np.float32,
+}
+TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+MODE_TRIANGLES = 4
+
+
+def read_accessor(gltf, bin_chunk, index):
+    """Accessor data as a (count, width) array. Only the embedded BIN buffer is supported."""
+    accessor = gltf["accessors"][index]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]]).newbyteorder('<')
+    width = TYPE_WIDTHS[accessor["type"]]
+    count = accessor["count"]
+    if "bufferView" not in accessor:
+        return np.zeros((count, width), dtype=dtype)
+
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    if view.get("buffer", 0) != 0 or "uri" in gltf["buffers"][view.get("buffer", 0)]:
+        raise ValueError("External glTF buffers are not supported")
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride") or dtype.itemsize * width
+    return np.ndarray((count, width), dtype=dtype, buffer=bin_chunk, offset=offset,
+                      strides=(stride, dtype.itemsize)).copy()
+
+
+def node_matrix(node):
+    """Local 4x4 transform of a glTF node"""
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+    x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    matrix = np.identity(4)
+    matrix[:3, :3] = rotation * np.array(node.get("scale", (1.0, 1.0, 1.0)))
+    matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+    return matrix
+
+
+def read_mesh(data):
+    """
+    Every triangle of the default scene as (positions, triangles) in world
+    space (glTF Y-up): float32 (N, 3) and int64 (M, 3). Non-triangle
+    primitives are skipped.
+    """
+    gltf, bin_chunk = read_glb(data)
+    nodes = gltf.get("nodes", [])
+    scenes = gltf.get("scenes", [])
+    if scenes:
+        roots = scenes[gltf.get("scene", 0)].get("nodes", [])
+    else:
+        roots = range(len(nodes))
+
+    positions = []
+    triangles = []
+    vertex_count = 0
+    stack = [(index, np.identity(4)) for index in roots]
+    while stack:
+        index, parent = stack.pop()
+        node = nodes[index]
+        world = parent @ node_matrix(node)
+        stack.extend((child, world) for child in node.get("children", []))
+        if "mesh" not in node:
+            continue
+
+        for primitive in gltf["meshes"][node["mesh"]].get("primitives", []):
+            if primitive.get("mode", MODE_TRIANGLES) != MODE_TRIANGLES or "POSITION" not in primitive["attributes"]:
+                continue
+            local = read_accessor(gltf, bin_chunk, primitive["attributes"]["POSITION"]).astype(np.float64)
+            if "indices" in primitive:
+                tris = read_accessor(gltf, bin_chunk, primitive["indices"]).astype(np.int64).reshape(-1, 3)
+            else:
+                tris = np.arange(len(local) - len(local) % 3, dtype=np.int64).reshape(-1, 3)
+            positions.append((local @ world[:3, :3].T + world[:3, 3]).astype(np.float32))
+            triangles.append(tris + vertex_count)
+            vertex_count += len(local)
+
+    if not positions:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64)
+    return np.concatenate(positions), np.concatenate(triangles)
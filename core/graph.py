@@ -0,0 +1,168 @@
+# ------------------------------------------------------------------------
+# Workflow graph helpers (API format)
+# ------------------------------------------------------------------------
+# In API-format JSON a linked input is a two element list [node_id, slot];
+# everything else is a literal widget value.
+
+def is_link(value):
+    return (isinstance(value, list) and len(value) == 2
+            and isinstance(value[0], str) and isinstance(value[1], int))
+
+
+def node_links(node_data):
+    """Yield (input_name, source_node_id) for every linked input of a node"""
+    for name, value in node_data.get("inputs", {}).items():
+        if is_link(value):
+            yield name, value[0]
+
+
+def build_children(workflow):
+    """Map node_id -> set of node_ids that consume its outputs"""
+    children = {node_id: set() for node_id in workflow}
+    for node_id, node_data in workflow.items():
+        for _, src in node_links(node_data):
+            children.setdefault(src, set()).add(node_id)
+    return children
+
+
+def upstream_nodes(workflow, node_ids):
+    """All nodes that node_ids depend on (not including node_ids themselves)"""
+    seen = set()
+    stack = list(node_ids)
+    while stack:
+        node_id = stack.pop()
+        node_data = workflow.get(node_id)
+        if not node_data:
+            continue
+        for _, src in node_links(node_data):
+            if src not in seen:
+                seen.add(src)
+                stack.append(src)
+    return seen - set(node_ids)
+
+
+def downstream_nodes(workflow, node_ids, children=None):
+    """All nodes that consume (directly or not) the outputs of node_ids"""
+    if children is None:
+        children = build_children(workflow)
+    seen = set()
+    stack = list(node_ids)
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen - set(node_ids)
+
+
+def next_node_id(workflow):
+    numeric = [int(k) for k in workflow if k.isdigit()]
+    return str(max(numeric, default=0) + 1)
+
+
+def find_nodes(workflow, class_type):
+    return [node_id for node_id, node_data in workflow.items() if node_data.get("class_type") == class_type]
+
+
+# ------------------------------------------------------------------------
+# Texture-only retexturing
+# ------------------------------------------------------------------------
+
+TEXTURING_CLASS = "Trellis2MeshTexturing"
+
+
+def build_texture_only_prompt(workflow, mesh_filename, loader_class, loader_input):
+    """
+    Rewire a full image-to-3D workflow so that Trellis2MeshTexturing reads an
+    uploaded mesh instead of the generated one, and drop every node that is
+    no longer needed (the geometry generation stages).
+
+    Returns the new prompt dict. Raises ValueError if the workflow has no
+    texturing stage.
+    """
+    texturing = find_nodes(workflow, TEXTURING_CLASS)
+    if not texturing:
+        raise ValueError(f"Workflow has no {TEXTURING_CLASS} node")
+
+    prompt = {node_id: dict(node_data, inputs=dict(node_data.get("inputs", {})))
+              for node_id, node_data in workflow.items()}
+
+    loader_id = next_node_id(prompt)
+    prompt[loader_id] = {
+        "class_type": loader_class,
+        "inputs": {loader_input: mesh_filename},
+        "_meta": {"title": "Retexturity : Source Mesh"},
+    }
+    for node_id in texturing:
+        prompt[node_id]["inputs"]["trimesh"] = [loader_id, 0]
+
+    # Keep the texturing stage, everything fed by it, and whatever those need
+    stage = set(texturing) | downstream_nodes(prompt, texturing)
+    keep = stage | upstream_nodes(prompt, stage)
+    return {node_id: node_data for node_id, node_data in prompt.items() if node_id in keep}
+
+
+# ------------------------------------------------------------------------
+# Staged execution
+# ------------------------------------------------------------------------
+# ComfyUI keys its node cache on node id + input signature. As long as node
+# ids stay stable and upstream inputs are byte-identical (same uploaded file
+# names, same widget values) only nodes downstream of a changed param are
+# executed again.
+
+def changed_nodes(previous, current):
+    """Node ids whose injected {param: value} dict differs between two snapshots"""
+    changed = set()
+    for node_id in set(previous) | set(current):
+        if previous.get(node_id) != current.get(node_id):
+            changed.add(node_id)
+    return changed
+
+
+def dirty_nodes(workflow, changed):
+    """Nodes that must be re-executed when the params of changed nodes differ"""
+    changed = {node_id for node_id in changed if node_id in workflow}
+    return changed | downstream_nodes(workflow, changed)
+
+
+def stage_summary(workflow, dirty):
+    """Return (rerun_classes, cached_classes), each a sorted list of class_type names"""
+    rerun = {workflow[n].get("class_type", "") for n in workflow if n in dirty}
+    cached = {workflow[n].get("class_type", "") for n in workflow if n not in dirty} - rerun
+    return sorted(rerun), sorted(cached)
+
+
+# ------------------------------------------------------------------------
+# Model warm-up
+# ------------------------------------------------------------------------
+# Node ids and inputs of the loader subgraph are kept verbatim so the real
+# prompt hits ComfyUI's cache for them instead of loading the model again.
+
+WARMUP_SINK_CLASS = "PreviewAny"
+WARMUP_SINK_INPUT = "source"
+
+
+def build_warmup_prompt(workflow, loader_classes):
+    """
+    Minimal prompt that only runs the model loaders (and whatever they
+    depend on), each feeding a PreviewAny output node. Returns None if the
+    workflow has no loader of the given classes.
+    """
+    loaders = [node_id for node_id, node_data in workflow.items()
+               if node_data.get("class_type") in loader_classes]
+    if not loaders:
+        return None
+
+    keep = set(loaders) | upstream_nodes(workflow, loaders)
+    prompt = {node_id: dict(workflow[node_id], inputs=dict(workflow[node_id].get("inputs", {})))
+              for node_id in keep}
+    # Sink ids come after every id of the full workflow so they never shadow a cached node
+    first_sink = int(next_node_id(workflow))
+    for offset, loader_id in enumerate(sorted(loaders)):
+        sink_id = str(first_sink + offset)
+        prompt[sink_id] = {
+            "class_type": WARMUP_SINK_CLASS,
+            "inputs": {WARMUP_SINK_INPUT: [loader_id, 0]},
+            "_meta": {"title": "Retexturity : Warm-up"},
+        }
+    return prompt
@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import queue
+import threading
+import subprocess
+import importlib.util
+import urllib.request
+
+# ------------------------------------------------------------------------
+# Completion hooks
+# ------------------------------------------------------------------------
+# Hooks receive one event per batch of finished jobs:
+#
+#   {"count": 3, "failed": 1, "jobs": [{"job_id", "prompt_id", "state",
+#    "workflow", "object", "result_path", "error", "duration"}, ...]}
+#
+# They run one after another on a background thread, so a slow webhook or
+# a hanging notifier never blocks Blender. They must not touch bpy.
+
+
+def summarize(event):
+    """(title, message) describing an event for humans"""
+    count = event["count"]
+    failed = event["failed"]
+    if count == 1:
+        job = event["jobs"][0]
+        name = job["object"] or job["workflow"] or "Job"
+        if failed:
+            return "Retexturity: generation failed", f"{name}: {job['error'] or 'failed'}"
+        return "Retexturity: result ready", f"{name} finished in {job['duration']:.0f}s"
+    title = f"Retexturity: {count} jobs finished"
+    return title, f"{count - failed} ready, {failed} failed" if failed else f"{count} results ready to import"
+
+
+class HookRunner:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, event, hooks):
+        if not hooks:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="retexturity-hooks", daemon=True)
+                self._thread.start()
+        self._queue.put((event, list(hooks)))
+
+    def _loop(self):
+        while True:
+            event, hooks = self._queue.get()
+            for hook in hooks:
+                try:
+                    hook(event)
+                except Exception as e:
+                    print(f"[Retexturity] Completion hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+
+def webhook_hook(url, timeout=5.0):
+    """POST the event as JSON to url"""
+    def post_webhook(event):
+        req = urllib.request.Request(url, data=json.dumps(event).encode('utf-8'), method='POST')
+        req.add_header('Content-Type', 'application/json')
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+    return post_webhook
+
+
+def desktop_hook():
+    """Show a native desktop notification"""
+    def notify_desktop(event):
+        title, message = summarize(event)
+        if sys.platform.startswith("linux"):
+            cmd = ["notify-send", "--app-name=Blender", title, message]
+        elif sys.platform == "darwin":
+            script = f"display notification {json.dumps(message)} with title {json.dumps(title)}"
+            cmd = ["osascript", "-e", script]
+        elif sys.platform == "win32":
+            script = (
+                "[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] > $null;"
+                "$t = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02);"
+                f"$t.GetElementsByTagName('text')[0].AppendChild($t.CreateTextNode({json.dumps(title)})) > $null;"
+                f"$t.GetElementsByTagName('text')[1].AppendChild($t.CreateTextNode({json.dumps(message)})) > $null;"
+                "[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('Blender').Show("
+                "[Windows.UI.Notifications.ToastNotification]::new($t))"
+            )
+            cmd = ["powershell", "-NoProfile", "-Command", script]
+        else:
+            return
+        subprocess.run(cmd, check=False, timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return notify_desktop
+
+
+_scripts = {}
+
+
+def script_hook(path):
+    """Call on_complete(event) from a user Python file (reloaded when it changes)"""
+    def run_script(event):
+        mtime = os.path.getmtime(path)
+        cached = _scripts.get(path)
+        if cached is None or cached[0] != mtime:
+            spec = importlib.util.spec_from_file_location("retexturity_user_hook", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            cached = (mtime, module)
+            _scripts[path] = cached
+        callback = getattr(cached[1], "on_complete", None)
+        if callback is None:
+            raise AttributeError(f"{path} does not define on_complete(event)")
+        callback(event)
+    return run_script
@@ -0,0 +1,65 @@
+import json
+import hashlib
+
+# ------------------------------------------------------------------------
+# Precompiled parameter injection
+# ------------------------------------------------------------------------
+# A workflow is parsed once when it is loaded. Every generation then starts
+# from the same template and only copies the nodes whose inputs it changes;
+# all other nodes are shared with the template, which is never mutated.
+
+# Input names that hold an uploaded image filename, in order of preference
+IMAGE_INPUT_KEYS = ("image", "filename", "image_path")
+
+
+def image_input_key(node_inputs):
+    """Name of the input an uploaded image should be written to"""
+    for key in IMAGE_INPUT_KEYS:
+        if key in node_inputs:
+            return key
+    return "image"
+
+
+class InjectionPlan:
+    """
+    Immutable template plus a flat list of (node_id, input_name, kind)
+    entries, one per exposed parameter and in the same order. getters maps
+    a kind to the function reading a parameter's value; it is resolved per
+    entry here (None for kinds without a getter, e.g. images), so reading
+    values never dispatches on the kind again.
+    """
+
+    def __init__(self, workflow_json, entries, getters=None):
+        self.workflow_hash = hashlib.sha1(workflow_json.encode('utf-8')).hexdigest()
+        self.template = json.loads(workflow_json)
+        self.entries = tuple((node_id, key, kind) for node_id, key, kind in entries)
+        self.getters = tuple((getters or {}).get(kind) for _, _, kind in self.entries)
+        self.image_slots = tuple(i for i, entry in enumerate(self.entries) if entry[2] == 'IMAGE')
+        # Same workflow and entries give the same key, whichever scene compiled it
+        self.key = hashlib.sha1(json.dumps([self.workflow_hash, self.entries]).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def values(self, params):
+        """{node_id: {input_name: value}} read from params (parallel to entries) with the getters"""
+        values = {}
+        for param, (node_id, key, _), getter in zip(params, self.entries, self.getters):
+            if getter is not None:
+                values.setdefault(node_id, {})[key] = getter(param)
+        return values
+
+    def instantiate(self, values):
+        """
+        Build a prompt with values ({node_id: {input_name: value}}) applied.
+        Only the touched nodes and their inputs dicts are copied.
+        """
+        prompt = dict(self.template)
+        for node_id, inputs in values.items():
+            node = prompt.get(node_id)
+            if node is None:
+                continue
+            new_inputs = dict(node.get("inputs", {}))
+            new_inputs.update(inputs)
+            prompt[node_id] = dict(node, inputs=new_inputs)
+        return prompt
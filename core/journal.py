@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ------------------------------------------------------------------------
+# Append-only job journal
+# ------------------------------------------------------------------------
+# One JSON object per line. A job is written in full when it is submitted
+# and then only its changed fields; replaying the file in order and merging
+# by job_id gives the latest known state of every job. The file lives
+# outside the .blend so a crash or an unsaved reload doesn't orphan prompts
+# that are still running on the server.
+#
+# Several Blender instances share the file. Every line carries the session
+# (one per process) that wrote it, and each session holds an OS lock on
+# sessions/<id>.lock while it runs, so an instance only adopts jobs whose
+# owner has exited or crashed. Appends and compaction take jobs.jsonl.lock
+# so a rewrite can't drop lines another instance is appending.
+
+# Rewrite the journal without finished jobs once it grows past this size
+COMPACT_SIZE = 1024 * 1024
+
+
+def lock_file(f, blocking=True):
+    """Exclusive OS lock on an open file; raises OSError if non-blocking and taken"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.sessions_dir = os.path.join(os.path.dirname(path), "sessions")
+        self.session = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._session_file = None
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        self.open_session()
+
+    # --------------------------------------------------------------------
+    # Sessions
+    # --------------------------------------------------------------------
+
+    def _session_path(self, session):
+        return os.path.join(self.sessions_dir, f"{session}.lock")
+
+    def open_session(self):
+        """Hold this process' session lock until close_session() or exit"""
+        if self._session_file is None:
+            f = open(self._session_path(self.session), 'a+b')
+            lock_file(f)
+            self._session_file = f
+
+    def close_session(self):
+        if self._session_file is not None:
+            self._session_file.close()
+            self._session_file = None
+            try:
+                os.remove(self._session_path(self.session))
+            except OSError:
+                pass
+
+    def session_running(self, session):
+        """True if session belongs to another instance that is still running"""
+        if not session or session == self.session:
+            return False
+        try:
+            f = open(self._session_path(session), 'r+b')
+        except OSError:
+            return False
+        with f:
+            try:
+                lock_file(f, blocking=False)
+            except OSError:
+                return True
+            unlock_file(f)
+        return False
+
+    def prune_sessions(self):
+        """Remove the lock files of sessions that are no longer running"""
+        for name in os.listdir(self.sessions_dir):
+            session, ext = os.path.splitext(name)
+            if ext == ".lock" and session != self.session and not self.session_running(session):
+                try:
+                    os.remove(os.path.join(self.sessions_dir, name))
+                except OSError:
+                    pass
+
+    # --------------------------------------------------------------------
+    # Records
+    # --------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """Serialize journal access between threads and between instances"""
+        with self._lock:
+            with open(self.lock_path, 'a+b') as f:
+                lock_file(f)
+                try:
+                    yield
+                finally:
+                    unlock_file(f)
+
+    def record(self, job_id, **fields):
+        """Append fields for job_id; the job now belongs to this session"""
+        entry = dict(fields, job_id=job_id, session=self.session, ts=time.time())
+        line = json.dumps(entry, separators=(',', ':')) + "\n"
+        with self._exclusive():
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _replay(self):
+        jobs = {}
+        if not os.path.exists(self.path):
+            return jobs
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                jobs.setdefault(entry.get("job_id"), {}).update(entry)
+        return jobs
+
+    def replay(self):
+        """Return {job_id: merged record} in submission order"""
+        with self._exclusive():
+            return self._replay()
+
+    def unfinished(self, active_states):
+        return [job for job in self.replay().values() if job.get("state") in active_states]
+
+    def adoptable(self, active_states, blend):
+        """
+        Unfinished jobs journaled for the file at blend ("" for unsaved)
+        that no other running instance owns: this session's own, or those
+        of a session that has exited or crashed.
+        """
+        return [job for job in self.unfinished(active_states)
+                if job.get("blend", "") == blend and not self.session_running(job.get("session"))]
+
+    def compact(self, active_states, force=False, max_age=None):
+        """
+        Drop finished jobs from the file, and unfinished ones not updated for
+        max_age seconds (nobody is going to reattach them any more).
+        Returns the number of jobs kept, or None if skipped.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        if not force and os.path.getsize(self.path) < COMPACT_SIZE:
+            return None
+        cutoff = time.time() - max_age if max_age is not None else None
+        tmp_path = f"{self.path}.tmp"
+        with self._exclusive():
+            keep = [job for job in self._replay().values()
+                    if job.get("state") in active_states and (cutoff is None or job.get("ts", 0) >= cutoff)]
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for job in keep:
+                    f.write(json.dumps(job, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        self.prune_sessions()
+        return len(keep)
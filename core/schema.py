@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .client import NO_RETRY
+from .graph import is_link
+
+# ------------------------------------------------------------------------
+# /object_info schema index
+# ------------------------------------------------------------------------
+# API-format workflows only carry the current widget values. /object_info
+# describes every node type (input types, enum options, numeric ranges),
+# which is enough to type the exposed params and to validate a prompt
+# before it takes a queue slot.
+
+# Cached schemas are re-validated against the server after this long even
+# if the ComfyUI version did not change (new custom nodes, new models)
+SCHEMA_MAX_AGE = 24 * 3600
+
+
+def parse_input_spec(raw, required):
+    """Normalize one /object_info input entry to a flat dict"""
+    if not isinstance(raw, (list, tuple)) or not raw:
+        return None
+    type_ = raw[0]
+    opts = raw[1] if len(raw) > 1 and isinstance(raw[1], dict) else {}
+
+    options = None
+    if isinstance(type_, list):
+        # Legacy combo format: the option list is the type
+        options = type_
+        type_ = "COMBO"
+    elif type_ == "COMBO":
+        options = opts.get("options") or []
+
+    return {
+        "type": type_,
+        "options": options,
+        "min": opts.get("min"),
+        "max": opts.get("max"),
+        "step": opts.get("step"),
+        "default": opts.get("default"),
+        "required": required,
+        # File inputs (LoadImage etc.): uploads land under names the cached
+        # option list has never seen, e.g. "render (3).png"
+        "image_upload": bool(opts.get("image_upload")),
+    }
+
+
+class SchemaIndex:
+    def __init__(self, object_info):
+        self._nodes = {}
+        for class_type, info in object_info.items():
+            inputs = {}
+            for section, required in (("required", True), ("optional", False)):
+                for name, raw in (info.get("input", {}).get(section) or {}).items():
+                    spec = parse_input_spec(raw, required)
+                    if spec:
+                        inputs[name] = spec
+            self._nodes[class_type] = {
+                "inputs": inputs,
+                "output_node": bool(info.get("output_node")),
+                "outputs": list(info.get("output") or []),
+            }
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def has_class(self, class_type):
+        return class_type in self._nodes
+
+    def is_output_node(self, class_type):
+        node = self._nodes.get(class_type)
+        return bool(node and node["output_node"])
+
+    def input_spec(self, class_type, name):
+        node = self._nodes.get(class_type)
+        if not node:
+            return None
+        return node["inputs"].get(name)
+
+    def required_inputs(self, class_type):
+        node = self._nodes.get(class_type)
+        if not node:
+            return []
+        return [name for name, spec in node["inputs"].items() if spec["required"]]
+
+
+def check_value(value, spec):
+    """Return an error string if value does not satisfy spec, else None"""
+    if value is None:
+        return None
+    if spec["options"] is not None:
+        if spec.get("image_upload"):
+            return None
+        if value not in spec["options"]:
+            preview = ", ".join(str(o) for o in spec["options"][:5])
+            more = "..." if len(spec["options"]) > 5 else ""
+            return f"'{value}' is not a valid option ({preview}{more})"
+        return None
+
+    if spec["type"] in ("INT", "FLOAT") and isinstance(value, (int, float)) and not isinstance(value, bool):
+        if spec["min"] is not None and value < spec["min"]:
+            return f"{value} is below the minimum {spec['min']}"
+        if spec["max"] is not None and value > spec["max"]:
+            return f"{value} is above the maximum {spec['max']}"
+    return None
+
+
+def validate_prompt(prompt, index, skip=()):
+    """
+    Check a prompt against the schema. Returns a list of error strings.
+    skip holds (node_id, input_name) pairs whose values are not checked,
+    e.g. the names of files uploaded for this prompt.
+    """
+    skip = set(skip)
+    errors = []
+    for node_id, node_data in prompt.items():
+        class_type = node_data.get("class_type")
+        title = node_data.get("_meta", {}).get("title", class_type)
+        if not index.has_class(class_type):
+            errors.append(f"{title} [{node_id}]: node type '{class_type}' is not installed on the server")
+            continue
+
+        inputs = node_data.get("inputs", {})
+        for name in index.required_inputs(class_type):
+            if name not in inputs:
+                errors.append(f"{title} [{node_id}]: missing required input '{name}'")
+
+        for name, value in inputs.items():
+            if is_link(value):
+                if value[0] not in prompt:
+                    errors.append(f"{title} [{node_id}]: input '{name}' links to missing node {value[0]}")
+                continue
+            spec = index.input_spec(class_type, name)
+            if spec is None or (node_id, name) in skip:
+                continue
+            error = check_value(value, spec)
+            if error:
+                errors.append(f"{title} [{node_id}].{name}: {error}")
+    return errors
+
+
+# ------------------------------------------------------------------------
+# On-disk cache
+# ------------------------------------------------------------------------
+
+class SchemaCache:
+    """
+    One cached /object_info per server. A cached copy is reused while the
+    server reports the same ComfyUI version and it is younger than
+    SCHEMA_MAX_AGE; otherwise it is re-fetched (conditionally, with the
+    stored ETag, when the server provides one).
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._indexes = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, server):
+        key = hashlib.sha1(server.rstrip('/').encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"object_info_{key}.json")
+
+    def _load(self, server):
+        path = self._path(server)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, server, entry):
+        path = self._path(server)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def cached(self, server):
+        """Index from memory or disk without any network access, or None"""
+        with self._lock:
+            index = self._indexes.get(server)
+        if index is not None:
+            return index
+        entry = self._load(server)
+        if entry and entry.get("object_info"):
+            index = SchemaIndex(entry["object_info"])
+            with self._lock:
+                self._indexes[server] = index
+            return index
+        return None
+
+    def get(self, client, refresh=False):
+        """Return a SchemaIndex for client's server, fetching only when needed"""
+        server = client.base_url
+        entry = self._load(server) or {}
+
+        stats = client.get_system_stats(retry=NO_RETRY)
+        version = ((stats or {}).get("system") or {}).get("comfyui_version")
+        if stats is None:
+            # Offline: whatever we have is better than nothing
+            return self.cached(server)
+
+        fresh = (entry.get("object_info")
+                 and entry.get("version") == version
+                 and time.time() - entry.get("fetched", 0) < SCHEMA_MAX_AGE)
+        if fresh and not refresh:
+            return self.cached(server)
+
+        object_info, etag = client.get_object_info(etag=entry.get("etag") if not refresh else None)
+        if object_info is None:
+            if client.last_error_status == 304 and entry.get("object_info"):
+                entry["version"] = version
+                entry["fetched"] = time.time()
+                self._save(server, entry)
+            return self.cached(server)
+
+        entry = {
+            "version": version,
+            "etag": etag,
+            "fetched": time.time(),
+            "object_info": object_info,
+        }
+        self._save(server, entry)
+        index = SchemaIndex(object_info)
+        with self._lock:
+            self._indexes[server] = index
+        print(f"[Retexturity] Cached /object_info for {server} ({len(index)} node types)")
+        return index
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import uuid
+import socket
+import hashlib
+
+# ------------------------------------------------------------------------
+# Shared team result cache
+# ------------------------------------------------------------------------
+# A directory every workstation can read and write, e.g. an NFS mount:
+#
+#   <root>/blobs/<2 hex>/<sha256><ext>       result files, named by content
+#   <root>/manifests/<2 hex>/<key>.json      generation key -> blob + metadata
+#
+# Nothing is locked. Every file is written under a unique temporary name on
+# the same filesystem and renamed into place, which is atomic locally and on
+# NFS. Blobs are content-addressed, so writers racing on one blob rename
+# identical bytes over each other. A manifest is only renamed into place
+# after its blob, so a reader that finds a manifest always finds a complete
+# file. Racing manifests for one key are equally valid; the last one wins.
+
+CHUNK_SIZE = 1024 * 1024
+TEMP_PREFIX = ".tmp-"
+# Temporary files this old were left behind by a crashed writer
+STALE_TEMP_SECONDS = 24 * 3600
+
+
+def file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def cache_key(workflow_hash, params, inputs, **extra):
+    """Key of a generation: workflow, injected param values and input file digests"""
+    payload = {"workflow": workflow_hash, "params": params, "inputs": list(inputs)}
+    payload.update(extra)
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class TeamCache:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.manifests_dir = os.path.join(self.root, "manifests")
+
+    def blob_path(self, digest, ext):
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}{ext}")
+
+    def manifest_path(self, key):
+        return os.path.join(self.manifests_dir, key[:2], f"{key}.json")
+
+    def _temp_path(self, directory):
+        # Unique across every host and process sharing the directory
+        return os.path.join(directory, f"{TEMP_PREFIX}{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex}")
+
+    # --------------------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------------------
+
+    def lookup(self, key):
+        """Published entry for key (manifest dict plus 'path'), or None"""
+        try:
+            with open(self.manifest_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            path = self.blob_path(entry["hash"], entry["ext"])
+            if os.path.getsize(path) != entry["size"]:
+                return None
+        except (OSError, ValueError, KeyError):
+            # Missing, unreadable, or a blob removed by hand
+            return None
+        entry["path"] = path
+        return entry
+
+    # --------------------------------------------------------------------
+    # Publishing
+    # --------------------------------------------------------------------
+
+    def publish(self, key, src_path, filename=None, **metadata):
+        """Copy src_path into the cache and publish it under key. Returns the manifest."""
+        filename = filename or os.path.basename(src_path)
+        ext = os.path.splitext(filename)[1].lower()
+        digest, size = self._put_blob(src_path, ext)
+
+        entry = dict(metadata)
+        entry.update(key=key, hash=digest, ext=ext, size=size, filename=filename,
+                     host=socket.gethostname(), created=time.time())
+        data = json.dumps(entry, indent=2).encode("utf-8")
+        self._write_atomic(self.manifest_path(key), self.manifests_dir, [data])
+        return entry
+
+    def _put_blob(self, src_path, ext):
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        tmp_path = self._temp_path(self.blobs_dir)
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            digest = hasher.hexdigest()
+            path = self.blob_path(digest, ext)
+            if os.path.exists(path) and os.path.getsize(path) == size:
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, size
+
+    def _write_atomic(self, path, temp_dir, chunks):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = self._temp_path(temp_dir)
+        try:
+            with open(tmp_path, 'wb') as dst:
+                for chunk in chunks:
+                    dst.write(chunk)
+                dst.flush()
+                # The rename must not become visible before the data reaches the server
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove_stale_temp(self, max_age=STALE_TEMP_SECONDS):
+        """Delete temporary files of writers that died mid-publish. Returns the count."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for directory in (self.blobs_dir, self.manifests_dir):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if not name.startswith(TEMP_PREFIX):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    # Renamed or removed by its writer or another cleaner meanwhile
+                    pass
+        return removed
@@ -0,0 +1,232 @@
+import os
+import math
+import uuid
+import zlib
+import queue
+import struct
+import threading
+import collections
+
+import numpy as np
+
+from . import glb
+
+# ------------------------------------------------------------------------
+# Result thumbnails
+# ------------------------------------------------------------------------
+# Model results are rasterized into small PNGs on a background thread, so
+# the gallery never has to import a GLB to show it. Thumbnails are named by
+# the content hash of the result (artifact store files already are), so
+# they are generated once per distinct result and survive restarts.
+
+THUMBNAIL_SIZE = 128
+MODEL_EXTS = {".glb"}
+
+# Three-quarter view from the front right, like a default Blender camera
+VIEW_AZIMUTH = math.radians(35.0)
+VIEW_ELEVATION = math.radians(25.0)
+LIGHT_DIR = np.array([0.4, 0.6, 0.7])
+CLAY_COLOR = np.array([205, 200, 195])
+# Triangles are sampled on a grid about one sample per pixel along their longest edge
+MAX_SUBDIVISIONS = 2 * THUMBNAIL_SIZE
+# Upper bound on samples per thumbnail, and per batch held in memory at once
+MAX_SAMPLES = 8 * 1024 * 1024
+BATCH_SAMPLES = 1024 * 1024
+
+
+def write_png(path, rgba):
+    """Write an (h, w, 4) uint8 array as an RGBA PNG (atomically)"""
+    height, width, _ = rgba.shape
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgba.reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    png = b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)),
+        chunk(b'IEND', b''),
+    ])
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(png)
+    os.replace(tmp_path, path)
+
+
+def _grid_size(levels):
+    return (levels + 1) * (levels + 2) // 2 + 1
+
+
+def _barycentric_grid(level):
+    """Barycentric weights of a triangular grid with level steps per edge, plus the centroid"""
+    weights = [(i / level, j / level, (level - i - j) / level)
+               for i in range(level + 1) for j in range(level + 1 - i)]
+    weights.append((1 / 3, 1 / 3, 1 / 3))
+    return np.array(weights)
+
+
+def rasterize_mesh(positions, triangles, size=THUMBNAIL_SIZE, margin=0.08):
+    """
+    Flat-shaded orthographic render of a mesh as an (size, size, 4) uint8
+    RGBA array with a transparent background. Triangles are point-sampled
+    into a z-buffer, which is plenty at thumbnail resolution.
+    """
+    image = np.zeros((size, size, 4), dtype=np.uint8)
+    if len(triangles) == 0:
+        return image
+
+    # World (Y-up) to view space: x right, y up, z towards the camera
+    ca, sa = math.cos(VIEW_AZIMUTH), math.sin(VIEW_AZIMUTH)
+    ce, se = math.cos(VIEW_ELEVATION), math.sin(VIEW_ELEVATION)
+    yaw = np.array([[ca, 0, -sa], [0, 1, 0], [sa, 0, ca]])
+    pitch = np.array([[1, 0, 0], [0, ce, -se], [0, se, ce]])
+    view = positions.astype(np.float64) @ (pitch @ yaw).T
+
+    lo = view[:, :2].min(axis=0)
+    hi = view[:, :2].max(axis=0)
+    extent = max(hi - lo) or 1.0
+    scale = size * (1.0 - 2 * margin) / extent
+    screen = np.empty_like(view)
+    screen[:, :2] = (view[:, :2] - (lo + hi) / 2) * scale + size / 2
+    screen[:, 2] = view[:, 2]
+
+    corners = screen[triangles]  # (M, 3, 3)
+    edge1 = view[triangles[:, 1]] - view[triangles[:, 0]]
+    edge2 = view[triangles[:, 2]] - view[triangles[:, 0]]
+    normals = np.cross(edge1, edge2)
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+    light = LIGHT_DIR / np.linalg.norm(LIGHT_DIR)
+    # Winding is not trusted, both sides are lit
+    shade = 0.3 + 0.7 * np.abs(normals @ light)
+
+    edges = np.stack([
+        np.linalg.norm(corners[:, 1, :2] - corners[:, 0, :2], axis=1),
+        np.linalg.norm(corners[:, 2, :2] - corners[:, 1, :2], axis=1),
+        np.linalg.norm(corners[:, 0, :2] - corners[:, 2, :2], axis=1),
+    ], axis=1)
+    levels = np.clip(np.ceil(edges.max(axis=1) * 1.5), 1, MAX_SUBDIVISIONS).astype(np.int64)
+    while levels.max() > 1 and _grid_size(levels).sum() > MAX_SAMPLES:
+        levels = np.maximum(levels // 2, 1)
+
+    # Z-buffer: per pixel keep the sample closest to the camera
+    zbuffer = np.full(size * size, -np.inf)
+    shading = np.zeros(size * size)
+    for level in np.unique(levels):
+        weights = _barycentric_grid(int(level))  # (K, 3)
+        selected = np.nonzero(levels == level)[0]
+        step = max(1, BATCH_SAMPLES // len(weights))
+        for start in range(0, len(selected), step):
+            batch = selected[start:start + step]
+            samples = np.einsum('kc,mcd->mkd', weights, corners[batch]).reshape(-1, 3)
+            x = np.clip(samples[:, 0].astype(np.int64), 0, size - 1)
+            y = np.clip(samples[:, 1].astype(np.int64), 0, size - 1)
+            pixels = (size - 1 - y) * size + x
+            depths = samples[:, 2]
+            shades = np.repeat(shade[batch], len(weights))
+
+            order = np.lexsort((-depths, pixels))
+            pixels = pixels[order]
+            first = np.ones(len(pixels), dtype=bool)
+            first[1:] = pixels[1:] != pixels[:-1]
+            pixels = pixels[first]
+            depths = depths[order][first]
+            closer = depths > zbuffer[pixels]
+            zbuffer[pixels[closer]] = depths[closer]
+            shading[pixels[closer]] = shades[order][first][closer]
+
+    covered = np.isfinite(zbuffer)
+    flat = image.reshape(-1, 4)
+    flat[covered, :3] = np.clip(CLAY_COLOR * shading[covered, None], 0, 255).astype(np.uint8)
+    flat[covered, 3] = 255
+    return image
+
+
+def render_model_thumbnail(src_path, dst_path, size=THUMBNAIL_SIZE):
+    with open(src_path, 'rb') as f:
+        positions, triangles = glb.read_mesh(f.read())
+    write_png(dst_path, rasterize_mesh(positions, triangles, size))
+
+
+class ThumbnailCache:
+    """
+    Thumbnails under root/<key>.png, generated by one worker thread.
+    request() never blocks; finished keys (made or failed) are collected
+    with pop_finished(), and failed() tells the two apart.
+    """
+
+    def __init__(self, root, size=THUMBNAIL_SIZE):
+        self.root = root
+        self.size = size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._failed = set()
+        self._finished = collections.deque()
+        self._thread = None
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.png")
+
+    def get(self, key):
+        """Thumbnail path for key if it has been generated, else None"""
+        path = self.path(key)
+        return path if os.path.exists(path) else None
+
+    def request(self, key, src_path):
+        """Queue a thumbnail for src_path. Returns False if it can't be made."""
+        if os.path.splitext(src_path)[1].lower() not in MODEL_EXTS:
+            return False
+        with self._lock:
+            if key in self._failed:
+                return False
+            if key in self._pending:
+                return True
+            self._pending.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="retexturity-thumbnails", daemon=True)
+                self._thread.start()
+        self._queue.put((key, src_path))
+        return True
+
+    def discard(self, key):
+        """Forget key and delete its thumbnail (its source is gone)"""
+        with self._lock:
+            self._failed.discard(key)
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def failed(self, key):
+        """True if a thumbnail for key was attempted and could not be made"""
+        with self._lock:
+            return key in self._failed
+
+    def busy(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def pop_finished(self):
+        finished = []
+        while self._finished:
+            finished.append(self._finished.popleft())
+        return finished
+
+    def _loop(self):
+        while True:
+            key, src_path = self._queue.get()
+            try:
+                render_model_thumbnail(src_path, self.path(key), self.size)
+                failed = False
+            except Exception as e:
+                print(f"[Retexturity] Thumbnail for {os.path.basename(src_path)} failed: {e}")
+                failed = True
+            with self._lock:
+                if failed:
+                    self._failed.add(key)
+                self._finished.append(key)
+                self._pending.discard(key)
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+import collections
+import urllib.request
+import urllib.parse
+import urllib.error
+
+# ------------------------------------------------------------------------
+# HTTP transports for ComfyUIClient
+# ------------------------------------------------------------------------
+# The client only talks to a transport: send() returns a Response for every
+# HTTP status and raises OSError when the server could not be reached. The
+# recording transport writes a session into a cassette directory and the
+# replay transport serves it back without any network:
+#
+#   <cassette>/interactions.jsonl   one line per request, in order
+#   <cassette>/bodies/<2 hex>/<sha256>   request and response bodies
+#
+# Set RETEXTURITY_CASSETTE=<dir> and RETEXTURITY_CASSETTE_MODE=record|replay
+# (RETEXTURITY_REPLAY_SPEED: 1 = recorded timing, 0 = no delays) to use
+# them from the addon or any script built on core.client.
+
+# Header names in Response.headers are always lower-case
+Response = collections.namedtuple("Response", ["status", "headers", "body"])
+
+INTERACTIONS_FILE = "interactions.jsonl"
+
+
+def normalize_headers(headers):
+    """HTTP header names are case-insensitive: lower-case them for lookups"""
+    return {name.lower(): value for name, value in (headers or {}).items()}
+
+
+class CassetteMiss(LookupError):
+    """A replayed session made a request the cassette has no answer for"""
+
+
+class UrllibTransport:
+    def send(self, method, url, data=None, headers=None, timeout=None):
+        req = urllib.request.Request(url, data=data, method=method)
+        for k, v in (headers or {}).items():
+            req.add_header(k, v)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                return Response(response.status, normalize_headers(response.headers), response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                body = e.read()
+            except Exception:
+                body = None
+            return Response(e.code, normalize_headers(e.headers), body)
+
+
+def request_key(method, url):
+    """Cassette key of a request: method plus path and query, without the server"""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{method} {path}"
+
+
+class BodyStore:
+    def __init__(self, root):
+        self.root = os.path.join(root, "bodies")
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data):
+        if data is None:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        if digest is None:
+            return None
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
+
+
+class RecordingTransport:
+    """Pass requests through to inner and append every interaction to the cassette"""
+
+    def __init__(self, cassette_dir, inner=None):
+        self.cassette_dir = cassette_dir
+        self.inner = inner or UrllibTransport()
+        self.bodies = BodyStore(cassette_dir)
+        self.path = os.path.join(cassette_dir, INTERACTIONS_FILE)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._seq = 0
+        os.makedirs(cassette_dir, exist_ok=True)
+
+    def send(self, method, url, data=None, headers=None, timeout=None):
+        start = time.time()
+        entry = {
+            "key": request_key(method, url),
+            "offset": start - self.started,
+            "request_body": self.bodies.put(data),
+        }
+        try:
+            response = self.inner.send(method, url, data=data, headers=headers, timeout=timeout)
+        except OSError as e:
+            entry.update(elapsed=time.time() - start, error=type(e).__name__, message=str(e))
+            self._append(entry)
+            raise
+
+        entry.update(elapsed=time.time() - start, status=response.status,
+                     headers=response.headers, response_body=self.bodies.put(response.body))
+        self._append(entry)
+        return response
+
+    def _append(self, entry):
+        with self._lock:
+            entry["seq"] = self._seq
+            self._seq += 1
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+class ReplayTransport:
+    """
+    Serve a recorded cassette. Requests are matched by method, path and
+    query in recorded order; once a key's recordings are used up the last
+    one keeps being returned (polling endpoints such as /queue). speed
+    scales the recorded latency: 1.0 = as recorded, 0 = instant.
+    """
+
+    def __init__(self, cassette_dir, speed=1.0):
+        self.bodies = BodyStore(cassette_dir)
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries = collections.defaultdict(collections.deque)
+        self._last = {}
+        with open(os.path.join(cassette_dir, INTERACTIONS_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def send(self, method, url, data=None, headers=None, timeout=None):
+        key = request_key(method, url)
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {key}")
+
+        if self.speed > 0:
+            time.sleep(entry.get("elapsed", 0.0) / self.speed)
+
+        if "error" in entry:
+            error_class = TimeoutError if entry["error"] in ("TimeoutError", "timeout") else ConnectionError
+            raise error_class(entry.get("message", "recorded transport error"))
+        # Cassettes recorded before header names were normalized keep the server's casing
+        return Response(entry["status"], normalize_headers(entry.get("headers")),
+                        self.bodies.get(entry.get("response_body")))
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """Transport shared by every client, chosen from the environment"""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            cassette = os.environ.get("RETEXTURITY_CASSETTE")
+            mode = os.environ.get("RETEXTURITY_CASSETTE_MODE", "record")
+            if cassette and mode == "replay":
+                speed = float(os.environ.get("RETEXTURITY_REPLAY_SPEED", "1.0"))
+                _default_transport = ReplayTransport(cassette, speed=speed)
+            elif cassette:
+                _default_transport = RecordingTransport(cassette)
+            else:
+                _default_transport = UrllibTransport()
+        return _default_transport
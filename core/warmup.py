@@ -0,0 +1,126 @@
+import json
+import time
+import hashlib
+import threading
+
+from .client import ComfyUIClient, NO_RETRY
+
+# ------------------------------------------------------------------------
+# Background model warm-up
+# ------------------------------------------------------------------------
+# A warm-up runs in its own thread with its own client: it only talks HTTP,
+# the UI reads the status through WarmupTracker.status().
+
+ACTIVE_WARMUP_STATES = {'QUEUED', 'RUNNING'}
+
+POLL_INTERVAL = 1.0
+WARMUP_TIMEOUT = 600.0
+
+# A model counts as still resident if at least this share of the VRAM used
+# right after the warm-up is still in use
+RESIDENT_FRACTION = 0.9
+
+
+def prompt_signature(prompt):
+    return hashlib.sha1(json.dumps(prompt, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def vram_used(stats):
+    """VRAM in use on the first device from a /system_stats response, or None"""
+    devices = (stats or {}).get("devices") or []
+    if not devices:
+        return None
+    device = devices[0]
+    total = device.get("vram_total")
+    free = device.get("vram_free")
+    if not total or free is None:
+        return None
+    return total - free
+
+
+class WarmupTracker:
+    def __init__(self):
+        self._status = {}
+        self._lock = threading.Lock()
+
+    def status(self, server):
+        """Copy of the warm-up status for server ({state, message, ...}) or None"""
+        with self._lock:
+            entry = self._status.get(server.rstrip('/'))
+            return dict(entry) if entry else None
+
+    def is_active(self):
+        with self._lock:
+            return any(entry["state"] in ACTIVE_WARMUP_STATES for entry in self._status.values())
+
+    def _set(self, server, **fields):
+        with self._lock:
+            self._status.setdefault(server, {}).update(fields)
+
+    def is_resident(self, server, signature, stats):
+        """True if the same loaders were warmed on server and their memory looks untouched"""
+        with self._lock:
+            entry = self._status.get(server)
+            if not entry or entry.get("signature") != signature or entry.get("state") not in ('WARM', 'SKIPPED'):
+                return False
+            baseline = entry.get("vram_used")
+        if baseline is None:
+            # No GPU statistics: trust the earlier warm-up
+            return True
+        used = vram_used(stats)
+        return used is not None and used >= baseline * RESIDENT_FRACTION
+
+    def start(self, base_url, prompt):
+        """Queue prompt on base_url in the background. Returns False if not started."""
+        client = ComfyUIClient(base_url, retry_policy=NO_RETRY)
+        server = client.base_url
+        signature = prompt_signature(prompt)
+        with self._lock:
+            entry = self._status.get(server)
+            if entry and entry["state"] in ACTIVE_WARMUP_STATES:
+                return False
+
+        thread = threading.Thread(target=self._run, args=(client, prompt, signature),
+                                  name="retexturity-warmup", daemon=True)
+        self._set(server, state='QUEUED', message="Checking server...", started=time.time())
+        thread.start()
+        return True
+
+    def _run(self, client, prompt, signature):
+        server = client.base_url
+        try:
+            stats = client.get_system_stats()
+            if stats is None:
+                self._set(server, state='FAILED', message="Server unreachable")
+                return
+            if self.is_resident(server, signature, stats):
+                self._set(server, state='SKIPPED', message="Model already loaded")
+                return
+
+            resp = client.queue_prompt(prompt)
+            if not resp or "prompt_id" not in resp:
+                self._set(server, state='FAILED', message="Warm-up prompt was rejected")
+                return
+            prompt_id = resp["prompt_id"]
+            self._set(server, state='QUEUED', message="Waiting in queue", prompt_id=prompt_id)
+
+            deadline = time.time() + WARMUP_TIMEOUT
+            while time.time() < deadline:
+                time.sleep(POLL_INTERVAL)
+                history = client.get_history(prompt_id) or {}
+                if prompt_id in history:
+                    status = history[prompt_id].get("status", {})
+                    if status.get("status_str") == "error":
+                        self._set(server, state='FAILED', message="Warm-up failed on the server")
+                    else:
+                        duration = time.time() - self.status(server)["started"]
+                        self._set(server, state='WARM', message=f"Model loaded ({duration:.0f}s)",
+                                  signature=signature, vram_used=vram_used(client.get_system_stats()))
+                    return
+                queue = client.get_queue() or {}
+                if any(item[1] == prompt_id for item in queue.get("queue_running", [])):
+                    self._set(server, state='RUNNING', message="Loading model...")
+
+            self._set(server, state='FAILED', message="Warm-up timed out")
+        except Exception as e:
+            self._set(server, state='FAILED', message=f"Warm-up error: {e}")
@@ -0,0 +1,174 @@
+import os
+import hashlib
+import bpy
+import numpy as np
+
+# ------------------------------------------------------------------------
+# Texture and material dedup after import
+# ------------------------------------------------------------------------
+# The glTF importer creates new images and materials on every import, even
+# when the baked textures are byte-identical to ones already in the file.
+# Images are matched by a hash of their encoded bytes (the packed GLB image
+# or the file on disk), so nothing has to be decoded for the comparison.
+# The hash is cached on the image together with what it was computed from;
+# images edited in Blender (dirty) are hashed by their pixels, uncached.
+
+HASH_KEY = "retexturity_hash"
+HASH_SOURCE_KEY = "retexturity_hash_source"
+CHUNK_SIZE = 1024 * 1024
+
+
+def ids_snapshot(collection):
+    return {datablock.as_pointer() for datablock in collection}
+
+
+def new_datablocks(collection, before):
+    return [datablock for datablock in collection if datablock.as_pointer() not in before]
+
+
+def image_path(image):
+    return bpy.path.abspath(image.filepath) if image.filepath else ""
+
+
+def hash_source(image):
+    """
+    Fingerprint of the bytes image_digest() reads: packed size and path, or
+    the file's path, mtime and size. A cached hash is only reused while it
+    matches. None if the hash must not be cached (edited pixels).
+    """
+    if image.is_dirty:
+        return None
+    if image.packed_file:
+        return f"packed:{image.packed_file.size}:{image.filepath}"
+    path = image_path(image)
+    if path and os.path.isfile(path):
+        st = os.stat(path)
+        return f"file:{path}:{st.st_mtime_ns}:{st.st_size}"
+    return None
+
+
+def image_digest(image):
+    """Content hash of an image, cached on the datablock. None if it has no content."""
+    source = hash_source(image)
+    if source is not None and image.get(HASH_SOURCE_KEY) == source and image.get(HASH_KEY):
+        return image[HASH_KEY]
+
+    hasher = hashlib.sha256()
+    path = image_path(image)
+    if image.is_dirty or not (image.packed_file or os.path.isfile(path)):
+        # Edited in Blender (the encoded bytes are stale) or generated without a source
+        if not image.has_data:
+            return None
+        width, height = image.size
+        buf = np.empty(width * height * image.channels, dtype=np.float32)
+        image.pixels.foreach_get(buf)
+        hasher.update(f"{width}x{height}x{image.channels}".encode('utf-8'))
+        hasher.update(buf.tobytes())
+    elif image.packed_file:
+        hasher.update(image.packed_file.data)
+    else:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+
+    digest = hasher.hexdigest()
+    if source is not None:
+        image[HASH_KEY] = digest
+        image[HASH_SOURCE_KEY] = source
+    return digest
+
+
+def image_memory(image):
+    """Approximate bytes a copy of image occupies once loaded (pixels plus packed data)"""
+    width, height = image.size
+    bytes_per_channel = 4 if image.is_float else 1
+    size = width * height * max(image.channels, 1) * bytes_per_channel
+    if image.packed_file:
+        size += image.packed_file.size
+    return size
+
+
+def material_signature(material):
+    """Hashable description of a material's node tree (images by name)"""
+    if not material.use_nodes or not material.node_tree:
+        return ("flat", tuple(material.diffuse_color))
+
+    nodes = []
+    for node in sorted(material.node_tree.nodes, key=lambda n: n.name):
+        values = []
+        for socket in node.inputs:
+            if not socket.is_linked and hasattr(socket, "default_value"):
+                value = socket.default_value
+                values.append(tuple(value) if hasattr(value, "__len__") else value)
+        image = getattr(node, "image", None)
+        nodes.append((node.name, node.bl_idname, image.name if image else None, tuple(values)))
+
+    links = sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                   for link in material.node_tree.links)
+    return (getattr(material, "surface_render_method", ""), tuple(nodes), tuple(links))
+
+
+def dedup_images(new_images):
+    """Replace new images that duplicate existing ones. Returns (removed, bytes_saved)."""
+    new_ptrs = {image.as_pointer() for image in new_images}
+
+    # Hashes are cached on the datablocks, so unchanged images are read only once
+    known = {}
+    for image in bpy.data.images:
+        if image.as_pointer() in new_ptrs or image.type != 'IMAGE':
+            continue
+        digest = image_digest(image)
+        if digest:
+            known.setdefault(digest, image)
+
+    removed = 0
+    saved = 0
+    for image in new_images:
+        digest = image_digest(image)
+        if not digest:
+            continue
+        original = known.get(digest)
+        if original is None:
+            known[digest] = image
+            continue
+        saved += image_memory(original)
+        image.user_remap(original)
+        bpy.data.images.remove(image)
+        removed += 1
+    return removed, saved
+
+
+def dedup_materials(new_materials):
+    """Replace new materials identical to existing ones. Returns the number removed."""
+    new_ptrs = {material.as_pointer() for material in new_materials}
+    known = {}
+    for material in bpy.data.materials:
+        if material.as_pointer() not in new_ptrs:
+            known.setdefault(material_signature(material), material)
+
+    removed = 0
+    for material in new_materials:
+        signature = material_signature(material)
+        original = known.get(signature)
+        if original is None:
+            known[signature] = material
+            continue
+        material.user_remap(original)
+        bpy.data.materials.remove(material)
+        removed += 1
+    return removed
+
+
+def dedup_import(images_before, materials_before):
+    """
+    Dedup the images and materials created since the snapshots were taken.
+    Returns a stats dict with removed counts and the estimated bytes saved.
+    """
+    images_removed, saved = dedup_images(new_datablocks(bpy.data.images, images_before))
+    # Materials only compare equal once their images point to the same datablocks
+    materials_removed = dedup_materials(new_datablocks(bpy.data.materials, materials_before))
+    return {
+        "images": images_removed,
+        "materials": materials_removed,
+        "bytes": saved,
+    }
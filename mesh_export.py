@@ -0,0 +1,89 @@
+import bpy
+import numpy as np
+
+from .core import glb
+
+# ------------------------------------------------------------------------
+# Compact mesh export for texture-only jobs
+# ------------------------------------------------------------------------
+# Only positions and triangle indices are sent; Trellis2MeshTexturing
+# unwraps and bakes its own UVs, so anything else would be wasted upload.
+
+
+def mesh_buffers(obj, depsgraph):
+    """Return (positions (N, 3) float32, triangle indices (M * 3,) uint32) of an evaluated object"""
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+
+        indices = np.empty(len(mesh.loop_triangles) * 3, dtype=np.uint32)
+        mesh.loop_triangles.foreach_get("vertices", indices)
+    finally:
+        eval_obj.to_mesh_clear()
+
+    return positions.reshape(-1, 3), indices
+
+
+def export_object_glb(obj, depsgraph, filepath):
+    """
+    Write obj (with modifiers, in local space) to a minimal GLB.
+    Returns a dict with vertex/triangle counts and file size.
+    """
+    positions, indices = mesh_buffers(obj, depsgraph)
+    data = glb.write_glb(glb.blender_to_gltf(positions), indices, name=obj.name)
+
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+    return {
+        "vertices": len(positions),
+        "triangles": len(indices) // 3,
+        "bytes": len(data),
+    }
+
+
+def replace_mesh(target, new_mesh):
+    """
+    Give target new_mesh. The exported mesh was the modifier-evaluated one,
+    so the result already has target's modifiers baked in; the stack is
+    cleared so they are not applied a second time. Returns descriptions of
+    the data the new mesh cannot carry (shape keys, vertex groups).
+    """
+    lost = []
+    old_mesh = target.data
+    if old_mesh.shape_keys and len(old_mesh.shape_keys.key_blocks) > 1:
+        lost.append(f"{len(old_mesh.shape_keys.key_blocks) - 1} shape keys")
+    if target.vertex_groups:
+        lost.append(f"{len(target.vertex_groups)} vertex groups")
+    if target.modifiers:
+        print(f"[Retexturity] {target.name}: modifiers already applied by the result: "
+              f"{', '.join(mod.name for mod in target.modifiers)}")
+        target.modifiers.clear()
+    target.data = new_mesh
+    return lost
+
+
+def apply_result_in_place(target, imported_objects):
+    """
+    Move the mesh (with its new UVs and material) of a freshly imported
+    texture-only result onto target, keeping target's transform, and delete
+    the imported objects. Returns the list from replace_mesh(), or None if
+    there was no mesh to apply.
+    """
+    meshes = [obj for obj in imported_objects if obj.type == 'MESH']
+    if not meshes:
+        return None
+
+    source = meshes[0]
+    new_mesh = source.data
+    # Bake any importer-side node transform so vertices stay in target's local space
+    new_mesh.transform(source.matrix_world)
+    lost = replace_mesh(target, new_mesh)
+
+    for obj in imported_objects:
+        bpy.data.objects.remove(obj, do_unlink=True)
+    return lost
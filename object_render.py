@@ -0,0 +1,115 @@
+import os
+import bpy
+from mathutils import Vector, Euler
+
+# ------------------------------------------------------------------------
+# Isolated per-object renders
+# ------------------------------------------------------------------------
+# Each selected object is rendered alone (every other object hidden from
+# the render) through a temporary camera fitted to its bounds. Results are
+# later placed back at the object they were generated from.
+
+# View direction used when the scene has no camera
+DEFAULT_CAMERA_ROTATION = Euler((1.1, 0.0, 0.785), 'XYZ')
+
+
+def world_bbox(objects):
+    """(min, max) corners of the world-space bounding box of objects, or None"""
+    corners = [obj.matrix_world @ Vector(corner) for obj in objects for corner in obj.bound_box]
+    if not corners:
+        return None
+    lo = Vector((min(c.x for c in corners), min(c.y for c in corners), min(c.z for c in corners)))
+    hi = Vector((max(c.x for c in corners), max(c.y for c in corners), max(c.z for c in corners)))
+    return lo, hi
+
+
+def fit_camera(camera, obj, depsgraph, padding=0.1):
+    """Move camera along its current view direction so obj fills the frame"""
+    lo, hi = world_bbox([obj])
+    center = (lo + hi) / 2
+    corners = [center + (Vector((x, y, z)) - center) * (1.0 + padding)
+               for x in (lo.x, hi.x) for y in (lo.y, hi.y) for z in (lo.z, hi.z)]
+    coords = [value for corner in corners for value in corner]
+    location, scale = camera.camera_fit_coords(depsgraph, coords)
+    camera.location = location
+    if camera.data.type == 'ORTHO':
+        camera.data.ortho_scale = scale
+
+
+def render_isolated(context, obj, filepath, padding=0.1):
+    """
+    Render obj alone to filepath (PNG with alpha). Other objects are hidden
+    from the render and a temporary camera is fitted to obj; the scene is
+    restored afterwards. Returns True if the file was written.
+    """
+    scene = context.scene
+    render = scene.render
+
+    cam_data = bpy.data.cameras.new("retexturity_isolate")
+    cam_obj = bpy.data.objects.new("retexturity_isolate", cam_data)
+    scene.collection.objects.link(cam_obj)
+    if scene.camera:
+        # Keep the artist's viewing angle and lens, only the framing changes
+        cam_obj.rotation_euler = scene.camera.matrix_world.to_euler()
+        if scene.camera.type == 'CAMERA':
+            cam_data.lens = scene.camera.data.lens
+    else:
+        cam_obj.rotation_euler = DEFAULT_CAMERA_ROTATION
+
+    # Visibility override: everything but obj and the lights
+    hidden = []
+    for other in scene.objects:
+        if other is obj or other is cam_obj or other.type == 'LIGHT' or other.hide_render:
+            continue
+        other.hide_render = True
+        hidden.append(other)
+
+    # A file left over from an earlier run must not pass for this render
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+    prev = (scene.camera, render.filepath, render.image_settings.file_format, render.film_transparent)
+    try:
+        context.view_layer.update()
+        fit_camera(cam_obj, obj, context.evaluated_depsgraph_get(), padding)
+        scene.camera = cam_obj
+        render.filepath = filepath
+        render.image_settings.file_format = 'PNG'
+        render.film_transparent = True
+        bpy.ops.render.render(write_still=True)
+    finally:
+        scene.camera, render.filepath, render.image_settings.file_format, render.film_transparent = prev
+        for other in hidden:
+            other.hide_render = False
+        bpy.data.objects.remove(cam_obj, do_unlink=True)
+        bpy.data.cameras.remove(cam_data)
+
+    return os.path.exists(filepath)
+
+
+def place_like(objects, source):
+    """
+    Move and uniformly scale freshly imported objects so their bounds are
+    centered on source and match its largest dimension.
+
+    This is a bounding-box approximation, not a transform copy: the result
+    is a new model in the generator's own normalized frame, reconstructed
+    from a render, so source's rotation and non-uniform scale have no
+    counterpart in it. Rotate the result by hand if the source was posed.
+    """
+    bpy.context.view_layer.update()
+    roots = [obj for obj in objects if obj.parent not in objects]
+    target = world_bbox([source])
+    bounds = world_bbox([obj for obj in objects if obj.type == 'MESH'])
+    if not roots or not target or not bounds:
+        return False
+
+    target_size = max(target[1] - target[0])
+    size = max(bounds[1] - bounds[0])
+    factor = target_size / size if size > 0 else 1.0
+    offset = (target[0] + target[1]) / 2 - (bounds[0] + bounds[1]) / 2 * factor
+
+    for root in roots:
+        root.location = root.location * factor + offset
+        root.scale = root.scale * factor
+    return True
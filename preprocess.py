@@ -0,0 +1,132 @@
+import os
+import bpy
+import numpy as np
+
+# ------------------------------------------------------------------------
+# Client-side image preprocessing
+# ------------------------------------------------------------------------
+# Trellis2PreProcessImage crops the foreground and resizes to the model
+# resolution on the server anyway, so doing the same locally shrinks the
+# upload and leaves the server very little work.
+
+FORMAT_EXTENSIONS = {
+    'PNG': ".png",
+    'WEBP': ".webp",
+    'JPEG': ".jpg",
+}
+
+
+def alpha_bbox(rgba, threshold=0.02):
+    """Return (x0, y0, x1, y1) of pixels whose alpha exceeds threshold, or None"""
+    mask = rgba[:, :, 3] > threshold
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def read_pixels(image):
+    """Read an image's pixels into a (height, width, channels) float32 array"""
+    width, height = image.size
+    channels = image.channels
+    buf = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(buf)
+    return buf.reshape(height, width, channels)
+
+
+def write_image(rgba, filepath, file_format='PNG', quality=90):
+    """Save an RGBA float array through a temporary Blender image"""
+    height, width = rgba.shape[:2]
+    tmp = bpy.data.images.new("retexturity_preprocess", width, height, alpha=True)
+    try:
+        tmp.pixels.foreach_set(np.ascontiguousarray(rgba, dtype=np.float32).ravel())
+        tmp.filepath_raw = filepath
+        tmp.file_format = file_format
+        tmp.save(filepath=filepath, quality=quality)
+    finally:
+        bpy.data.images.remove(tmp)
+
+
+def preprocess_image(filepath, target_size=1024, padding=0.05, file_format='PNG',
+                     quality=90, alpha_threshold=0.02, out_dir=None):
+    """
+    Crop an image to its alpha bounding box, fit it into target_size and
+    re-encode it. Returns (output_path, stats) or (filepath, None) when the
+    source could not be processed.
+    """
+    src = bpy.data.images.load(filepath, check_existing=False)
+    try:
+        width, height = src.size
+        if width == 0 or height == 0:
+            return filepath, None
+
+        pixels = read_pixels(src)
+        if pixels.shape[2] == 3:
+            pixels = np.concatenate([pixels, np.ones((height, width, 1), dtype=np.float32)], axis=2)
+    finally:
+        bpy.data.images.remove(src)
+
+    # 1. Crop to the foreground (renders with Film > Transparent carry alpha)
+    bbox = alpha_bbox(pixels, alpha_threshold)
+    if bbox:
+        x0, y0, x1, y1 = bbox
+        margin = int(round(max(x1 - x0, y1 - y0) * padding))
+        x0 = max(0, x0 - margin)
+        y0 = max(0, y0 - margin)
+        x1 = min(width, x1 + margin)
+        y1 = min(height, y1 + margin)
+        pixels = pixels[y0:y1, x0:x1]
+
+    # 2. Downscale so the longest side fits target_size (never upscale)
+    crop_h, crop_w = pixels.shape[:2]
+    scale = min(1.0, float(target_size) / max(crop_w, crop_h))
+    new_w = max(1, int(round(crop_w * scale)))
+    new_h = max(1, int(round(crop_h * scale)))
+    if (new_w, new_h) != (crop_w, crop_h):
+        pixels = resize_area(pixels, new_w, new_h)
+
+    # 3. Encode
+    if out_dir is None:
+        out_dir = bpy.app.tempdir
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    out_path = os.path.join(out_dir, f"{name}_pre{FORMAT_EXTENSIONS.get(file_format, '.png')}")
+    write_image(pixels, out_path, file_format, quality)
+
+    stats = {
+        "source_size": (width, height),
+        "output_size": (new_w, new_h),
+        "source_bytes": os.path.getsize(filepath),
+        "output_bytes": os.path.getsize(out_path) if os.path.exists(out_path) else 0,
+    }
+    return out_path, stats
+
+
+def resize_area(pixels, new_w, new_h):
+    """Area-average resize of a (h, w, c) array using cumulative sums"""
+    out = _resize_axis(pixels, 0, new_h)
+    out = _resize_axis(out, 1, new_w)
+    return out.astype(np.float32)
+
+
+def _resize_axis(arr, axis, dst_len):
+    src_len = arr.shape[axis]
+    # Destination bin edges in source pixel coordinates
+    edges = np.linspace(0.0, src_len, dst_len + 1)
+
+    # Integral along the axis with a leading zero so csum[i] == sum(arr[:i])
+    pad_shape = list(arr.shape)
+    pad_shape[axis] = 1
+    csum = np.concatenate([np.zeros(pad_shape), np.cumsum(arr, axis=axis, dtype=np.float64)], axis=axis)
+
+    bcast = [1] * arr.ndim
+    bcast[axis] = -1
+
+    def _integral(pos):
+        lo = np.clip(np.floor(pos).astype(np.int64), 0, src_len - 1)
+        frac = (pos - lo).reshape(bcast)
+        base = np.take(csum, lo, axis=axis)
+        return base + (np.take(csum, lo + 1, axis=axis) - base) * frac
+
+    area = _integral(edges[1:]) - _integral(edges[:-1])
+    return area / np.diff(edges).reshape(bcast)
@@ -1,18 +1,31 @@
+import os
 import wave
-import math
-import struct
+import numpy as np
 
-def generate_beep(filename, duration=0.5, frequency=880, sample_rate=44100):
+def tone(duration=0.5, frequency=880, sample_rate=44100, fade=0.02, volume=0.8):
+    """Mono sine tone as float32 samples in [-1, 1], with short fades to avoid clicks"""
     n_samples = int(sample_rate * duration)
+    t = np.arange(n_samples, dtype=np.float32) / sample_rate
+    samples = np.sin(2.0 * np.pi * frequency * t) * volume
+
+    n_fade = min(int(sample_rate * fade), n_samples // 2)
+    if n_fade:
+        ramp = np.linspace(0.0, 1.0, n_fade, dtype=np.float32)
+        samples[:n_fade] *= ramp
+        samples[-n_fade:] *= ramp[::-1]
+    return samples.astype(np.float32)
+
+def chime(sample_rate=44100):
+    """Two rising notes, the default 'result ready' sound"""
+    return np.concatenate([tone(0.12, 880, sample_rate), tone(0.22, 1318.5, sample_rate)])
+
+def generate_beep(filename, duration=0.5, frequency=880, sample_rate=44100):
+    samples = tone(duration, frequency, sample_rate)
     with wave.open(filename, 'w') as obj:
         obj.setnchannels(1) # mono
         obj.setsampwidth(2) # 2 bytes
         obj.setframerate(sample_rate)
-        
-        for i in range(n_samples):
-            value = int(32767.0 * math.sin(2.0 * math.pi * frequency * i / sample_rate))
-            data = struct.pack('<h', value)
-            obj.writeframesraw(data)
+        obj.writeframes((samples * 32767.0).astype('<i2').tobytes())
 
 if __name__ == "__main__":
-    generate_beep("c:/Users/ulise/OneDrive/Escritorio/retexturity/sounds/sound.wav")
+    generate_beep(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sounds", "sound.wav"))
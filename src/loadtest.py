@@ -0,0 +1,293 @@
+"""
+Load test: N simulated Retexturity clients against one stub ComfyUI server.
+
+Every simulated client runs the addon's traffic pattern through the real
+core.client.ComfyUIClient: connection check, image upload, /prompt, then a
+/queue poll per dispatcher tick and /history once the prompt has left the
+queue, and finally the /view download. The stub executes prompts one at a
+time, like a single-GPU ComfyUI box.
+
+    python src/loadtest.py --clients 1,2,4,8 --jobs 3 --exec-time 1.0 --poll-interval 2.0
+"""
+import os
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import argparse
+import tempfile
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.client import ComfyUIClient, CircuitBreaker, NO_RETRY  # noqa: E402
+
+
+# ------------------------------------------------------------------------
+# Stub server
+# ------------------------------------------------------------------------
+
+class StubComfyUI:
+    """Single-worker prompt queue with ComfyUI's HTTP surface"""
+
+    def __init__(self, exec_time=1.0, result_bytes=2 * 1024 * 1024):
+        self.exec_time = exec_time
+        self.result = os.urandom(1024) * max(1, result_bytes // 1024)
+        self.lock = threading.Condition()
+        self.pending = collections.deque()
+        self.running = None
+        self.history = {}
+        self.times = {}
+        self.requests = collections.Counter()
+        self.number = 0
+        self.stopped = False
+        self.worker = threading.Thread(target=self._work, daemon=True)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.handle(self, 'GET')
+
+            def do_POST(self):
+                stub.handle(self, 'POST')
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.worker.start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.lock.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests.clear()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while not self.pending and not self.stopped:
+                    self.lock.wait()
+                if self.stopped:
+                    return
+                item = self.pending.popleft()
+                self.running = item
+                self.times[item[1]]["started"] = time.time()
+            time.sleep(self.exec_time)
+            with self.lock:
+                prompt_id = item[1]
+                self.running = None
+                self.times[prompt_id]["finished"] = time.time()
+                self.history[prompt_id] = {
+                    "prompt": list(item),
+                    "outputs": {"1": {"files": [{"filename": f"{prompt_id}.glb", "subfolder": "", "type": "output"}]}},
+                    "status": {"status_str": "success", "completed": True, "messages": []},
+                }
+
+    def handle(self, request, method):
+        path = request.path.split("?", 1)[0]
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        endpoint = re.sub(r"^/history/.*", "/history/{id}", path)
+        with self.lock:
+            self.requests[f"{method} {endpoint}"] += 1
+
+        if method == 'GET' and path == "/system_stats":
+            return self._send(request, {"system": {"comfyui_version": "stub"}, "devices": []})
+        if method == 'POST' and path == "/upload/image":
+            return self._send(request, {"name": f"upload_{uuid.uuid4().hex[:8]}.png", "subfolder": "", "type": "input"})
+        if method == 'POST' and path == "/prompt":
+            data = json.loads(body)
+            prompt_id = data.get("prompt_id") or str(uuid.uuid4())
+            with self.lock:
+                self.number += 1
+                item = (self.number, prompt_id, data.get("prompt"), {"client_id": data.get("client_id")}, ["1"])
+                self.times[prompt_id] = {"queued": time.time()}
+                if data.get("front"):
+                    self.pending.appendleft(item)
+                else:
+                    self.pending.append(item)
+                self.lock.notify()
+            return self._send(request, {"prompt_id": prompt_id, "number": item[0], "node_errors": {}})
+        if method == 'GET' and path == "/queue":
+            with self.lock:
+                running = [list(self.running)] if self.running else []
+                pending = [list(item) for item in self.pending]
+            return self._send(request, {"queue_running": running, "queue_pending": pending})
+        if method == 'GET' and path.startswith("/history/"):
+            prompt_id = path[len("/history/"):]
+            with self.lock:
+                entry = self.history.get(prompt_id)
+            return self._send(request, {prompt_id: entry} if entry else {})
+        if method == 'GET' and path == "/view":
+            return self._send_bytes(request, self.result, "application/octet-stream")
+        return self._send(request, {"error": "not found"}, status=404)
+
+    def _send(self, request, payload, status=200):
+        self._send_bytes(request, json.dumps(payload).encode("utf-8"), "application/json", status)
+
+    def _send_bytes(self, request, data, content_type, status=200):
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+# ------------------------------------------------------------------------
+# Simulated addon
+# ------------------------------------------------------------------------
+
+def simulated_client(url, jobs, poll_interval, upload_path, records):
+    """One Blender instance generating jobs one after another, like the job dispatcher"""
+    client = ComfyUIClient(url)
+    # Every simulated Blender has its own breaker, as separate processes would
+    client.breaker = CircuitBreaker()
+
+    for _ in range(jobs):
+        record = {"submit": time.time(), "polls": 0}
+        if not client.check_connection() or not client.upload_image(upload_path):
+            record["error"] = "connect/upload failed"
+            records.append(record)
+            continue
+        resp = client.queue_prompt({"1": {"class_type": "Stub", "inputs": {"seed": uuid.uuid4().int % 10000}}})
+        if not resp:
+            record["error"] = "queue failed"
+            records.append(record)
+            continue
+        prompt_id = resp["prompt_id"]
+        record["prompt_id"] = prompt_id
+
+        while True:
+            time.sleep(poll_interval)
+            record["polls"] += 1
+            queue = client.get_queue(retry=NO_RETRY) or {}
+            queued = {item[1] for item in queue.get("queue_running", []) + queue.get("queue_pending", [])}
+            if prompt_id in queued:
+                continue
+            record["polls"] += 1
+            history = client.get_history(prompt_id, retry=NO_RETRY) or {}
+            if prompt_id in history:
+                record["detected"] = time.time()
+                break
+
+        client.get_image(f"{prompt_id}.glb", "", "output")
+        record["done"] = time.time()
+        records.append(record)
+
+
+# ------------------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------------------
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_level(stub, clients, jobs, poll_interval, upload_path):
+    stub.reset_counters()
+    records = []
+    threads = [threading.Thread(target=simulated_client, args=(stub.url, jobs, poll_interval, upload_path, records))
+               for _ in range(clients)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    with stub.lock:
+        requests = dict(stub.requests)
+        times = dict(stub.times)
+
+    ok = [r for r in records if "done" in r]
+    total = sum(requests.values())
+    polls = sum(count for key, count in requests.items() if key in ("GET /queue", "GET /history/{id}"))
+    return {
+        "clients": clients,
+        "jobs": len(ok),
+        "failed": len(records) - len(ok),
+        "elapsed": elapsed,
+        "req_rate": total / elapsed,
+        "poll_share": polls / total if total else 0.0,
+        "polls_per_job": polls / len(ok) if ok else float("nan"),
+        "queue_wait": [times[r["prompt_id"]]["started"] - times[r["prompt_id"]]["queued"] for r in ok],
+        "detect_lag": [r["detected"] - times[r["prompt_id"]]["finished"] for r in ok],
+        "latency": [r["done"] - r["submit"] for r in ok],
+        "requests": requests,
+    }
+
+
+def print_report(results):
+    header = (f"{'N':>4} {'jobs':>5} {'fail':>4} {'req/s':>7} {'poll%':>6} {'polls/job':>9} "
+              f"{'wait p50':>9} {'wait p95':>9} {'lag p50':>8} {'e2e p50':>8} {'e2e p95':>8} {'e2e p99':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['clients']:>4} {r['jobs']:>5} {r['failed']:>4} {r['req_rate']:>7.1f} {r['poll_share'] * 100:>5.0f}% "
+              f"{r['polls_per_job']:>9.1f} "
+              f"{percentile(r['queue_wait'], 50):>8.2f}s {percentile(r['queue_wait'], 95):>8.2f}s "
+              f"{percentile(r['detect_lag'], 50):>7.2f}s "
+              f"{percentile(r['latency'], 50):>7.2f}s {percentile(r['latency'], 95):>7.2f}s "
+              f"{percentile(r['latency'], 99):>7.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", default="1,2,4,8", help="Comma-separated client counts to test")
+    parser.add_argument("--jobs", type=int, default=3, help="Jobs per client")
+    parser.add_argument("--exec-time", type=float, default=1.0, help="Seconds the stub spends on each prompt")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Dispatcher tick in seconds")
+    parser.add_argument("--upload-kb", type=int, default=512, help="Size of the uploaded render")
+    parser.add_argument("--result-kb", type=int, default=2048, help="Size of the downloaded result")
+    parser.add_argument("--json", help="Also write the raw results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        f.write(os.urandom(args.upload_kb * 1024))
+        upload_path = f.name
+
+    results = []
+    try:
+        for clients in [int(n) for n in args.clients.split(",") if n.strip()]:
+            # A fresh server per level so queues and histories don't carry over
+            stub = StubComfyUI(exec_time=args.exec_time, result_bytes=args.result_kb * 1024)
+            stub.start()
+            try:
+                print(f"[loadtest] {clients} clients x {args.jobs} jobs...", file=sys.stderr)
+                results.append(run_level(stub, clients, args.jobs, args.poll_interval, upload_path))
+            finally:
+                stub.stop()
+    finally:
+        os.remove(upload_path)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
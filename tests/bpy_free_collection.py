@@ -0,0 +1,11 @@
+import pytest
+
+# The repository root is the addon package, and its __init__.py imports bpy.
+# Collected as a Package, pytest would import it to look for setup_module;
+# collecting it as a plain directory keeps the core/ tests runnable without
+# Blender. Loaded from pytest.ini.
+
+
+def pytest_collect_directory(path, parent):
+    if path == parent.config.rootpath:
+        return pytest.Dir.from_parent(parent, path=path)
@@ -0,0 +1,51 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.artifact_store import ArtifactStore  # noqa: E402
+from core.thumbnails import ThumbnailCache  # noqa: E402
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = ArtifactStore(os.path.join(self.dir, "store"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_identical_results_share_a_blob(self):
+        first = self.store.put_bytes(b"mesh", "a.glb", prompt_id="p1")
+        second = self.store.put_bytes(b"mesh", "b.glb", prompt_id="p2")
+        self.assertEqual(first, second)
+        self.assertEqual(self.store.total_size(), 4)
+
+    def test_gc_keeps_protected_paths(self):
+        old = self.store.put_bytes(b"old result", "old.glb")
+        new = self.store.put_bytes(b"new result", "new.glb")
+        removed, freed = self.store.gc(max_bytes=1, protect=[new])
+        self.assertEqual((removed, freed), (1, len(b"old result")))
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+
+    def test_gc_prunes_thumbnails_of_removed_blobs(self):
+        thumbnails = ThumbnailCache(os.path.join(self.dir, "thumbnails"))
+        paths = [self.store.put_bytes(data, "result.glb") for data in (b"one", b"two")]
+        hashes = [item["hash"] for item in self.store.recent()]
+        for blob_hash in hashes:
+            with open(thumbnails.path(blob_hash), 'wb') as f:
+                f.write(b"png")
+
+        self.store.gc(max_bytes=1, protect=[paths[1]],
+                      on_remove=lambda blob_hash, ext: thumbnails.discard(blob_hash))
+        kept = [blob_hash for blob_hash in hashes if thumbnails.get(blob_hash)]
+        self.assertEqual(len(kept), 1)
+        self.assertTrue(paths[1].endswith(f"{kept[0]}.glb"))
+
+
+if __name__ == "__main__":
+    unittest.main()
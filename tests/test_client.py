@@ -0,0 +1,87 @@
+import os
+import sys
+import http.client
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.client import ComfyUIClient, CircuitBreaker, NO_RETRY  # noqa: E402
+from core.transport import Response, CassetteMiss  # noqa: E402
+
+
+class ScriptedTransport:
+    """Returns (or raises) the given outcomes in order"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def send(self, method, url, data=None, headers=None, timeout=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def open_client(*outcomes):
+    """A client whose breaker is open and due for its trial request"""
+    client = ComfyUIClient("http://breaker.test", retry_policy=NO_RETRY, transport=ScriptedTransport(*outcomes))
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    client.breaker.record_failure()
+    return client
+
+
+OK = Response(200, {}, b'{}')
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_incomplete_read_during_trial_reopens_and_recovers(self):
+        client = open_client(http.client.IncompleteRead(b'{"queue'), OK)
+        self.assertIsNone(client.get_queue())
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        # Server is back: the next trial closes the circuit
+        self.assertEqual(client.get_queue(), {})
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_during_trial_is_recorded(self):
+        client = open_client(CassetteMiss("GET /queue"), OK)
+        with self.assertRaises(CassetteMiss):
+            client.get_queue()
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(client.get_queue(), {})
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_lost_trial_times_out(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0, trial_timeout=0.0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        # No outcome was ever recorded for the first trial
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+
+class QueuePromptTest(unittest.TestCase):
+    def test_no_retry_makes_a_single_attempt(self):
+        transport = ScriptedTransport(ConnectionResetError(), OSError("history"), OSError("queue"))
+        client = ComfyUIClient("http://queue.test", transport=transport)
+        client.breaker = CircuitBreaker()
+        client.retry_policy.base_delay = client.retry_policy.max_delay = 60.0
+        # One POST plus the lookup for a lost response, no backoff sleeps
+        self.assertIsNone(client.queue_prompt({}, retry=NO_RETRY))
+        self.assertEqual(transport.outcomes, [])
+
+    def test_rejected_prompt_is_not_resubmitted(self):
+        transport = ScriptedTransport(Response(400, {}, b'{"error": {"message": "bad"}}'))
+        client = ComfyUIClient("http://queue.test", transport=transport)
+        client.breaker = CircuitBreaker()
+        self.assertIsNone(client.queue_prompt({}))
+        self.assertEqual(client.last_error_status, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
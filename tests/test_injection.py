@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.injection import InjectionPlan, image_input_key  # noqa: E402
+
+
+WORKFLOW = json.dumps({
+    "1": {"class_type": "LoadImage", "inputs": {"image": "example.png"}},
+    "2": {"class_type": "KSampler", "inputs": {"seed": 1, "steps": 20, "model": ["3", 0]}},
+    "3": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "model.safetensors"}},
+})
+
+ENTRIES = [("2", "seed", 'INT'), ("2", "steps", 'INT'), ("1", "image", 'IMAGE')]
+
+GETTERS = {'INT': lambda param: param.int_val}
+
+
+def params(*values):
+    return [types.SimpleNamespace(int_val=value) for value in values]
+
+
+class InjectionPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.plan = InjectionPlan(WORKFLOW, ENTRIES, GETTERS)
+
+    def test_values_skip_kinds_without_getter(self):
+        self.assertEqual(self.plan.values(params(7, 30, None)), {"2": {"seed": 7, "steps": 30}})
+        self.assertEqual(self.plan.image_slots, (2,))
+
+    def test_instantiate_leaves_template_untouched(self):
+        prompt = self.plan.instantiate({"2": {"seed": 7}, "1": {"image": "render (3).png"}})
+        self.assertEqual(prompt["2"]["inputs"], {"seed": 7, "steps": 20, "model": ["3", 0]})
+        self.assertEqual(prompt["1"]["inputs"]["image"], "render (3).png")
+        self.assertEqual(self.plan.template["2"]["inputs"]["seed"], 1)
+        self.assertEqual(self.plan.template["1"]["inputs"]["image"], "example.png")
+        # Untouched nodes are shared, not copied
+        self.assertIs(prompt["3"], self.plan.template["3"])
+
+    def test_unknown_nodes_are_ignored(self):
+        self.assertNotIn("99", self.plan.instantiate({"99": {"seed": 1}}))
+
+    def test_key_depends_on_workflow_and_entries(self):
+        self.assertEqual(self.plan.key, InjectionPlan(WORKFLOW, ENTRIES).key)
+        self.assertNotEqual(self.plan.key, InjectionPlan(WORKFLOW, ENTRIES[:2]).key)
+
+    def test_image_input_key(self):
+        self.assertEqual(image_input_key({"filename": "a.png"}), "filename")
+        self.assertEqual(image_input_key({}), "image")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.journal import JobJournal  # noqa: E402
+
+ACTIVE = ('QUEUED', 'RUNNING')
+
+
+class JobJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "jobs.jsonl")
+        self.journals = []
+
+    def tearDown(self):
+        for journal in self.journals:
+            journal.close_session()
+        shutil.rmtree(self.dir)
+
+    def open_journal(self):
+        """A journal as another Blender instance sharing the file would open it"""
+        journal = JobJournal(self.path)
+        self.journals.append(journal)
+        return journal
+
+    def test_replay_merges_updates(self):
+        journal = self.open_journal()
+        journal.record("a", state='QUEUED', prompt_id="p1", blend="")
+        journal.record("a", state='DONE', result_path="/out.glb")
+        job = journal.replay()["a"]
+        self.assertEqual(job["prompt_id"], "p1")
+        self.assertEqual(job["state"], 'DONE')
+        self.assertEqual(journal.unfinished(ACTIVE), [])
+
+    def test_unsaved_jobs_of_running_instance_are_not_adopted(self):
+        first = self.open_journal()
+        second = self.open_journal()
+        first.record("a", state='QUEUED', blend="")
+        self.assertEqual([job["job_id"] for job in first.adoptable(ACTIVE, "")], ["a"])
+        self.assertEqual(second.adoptable(ACTIVE, ""), [])
+
+    def test_jobs_of_exited_instance_are_adopted(self):
+        first = self.open_journal()
+        first.record("a", state='RUNNING', blend="")
+        first.close_session()
+        second = self.open_journal()
+        self.assertEqual([job["job_id"] for job in second.adoptable(ACTIVE, "")], ["a"])
+        # Only for the matching file
+        self.assertEqual(second.adoptable(ACTIVE, "/other.blend"), [])
+
+    def test_compact_keeps_active_jobs(self):
+        journal = self.open_journal()
+        journal.record("a", state='QUEUED', blend="")
+        journal.record("b", state='QUEUED', blend="")
+        journal.record("b", state='DONE')
+        self.assertEqual(journal.compact(ACTIVE, force=True), 1)
+        self.assertEqual(list(journal.replay()), ["a"])
+        self.assertEqual(journal.compact(ACTIVE, force=True, max_age=-1), 0)
+
+    def test_compact_does_not_lose_concurrent_appends(self):
+        writer = self.open_journal()
+        compactor = self.open_journal()
+
+        def append():
+            for i in range(200):
+                writer.record(f"job{i}", state='QUEUED', blend="")
+
+        thread = threading.Thread(target=append)
+        thread.start()
+        while thread.is_alive():
+            compactor.compact(ACTIVE, force=True)
+        thread.join()
+        self.assertEqual(len(compactor.unfinished(ACTIVE)), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
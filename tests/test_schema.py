@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.schema import SchemaIndex, validate_prompt  # noqa: E402
+
+
+OBJECT_INFO = {
+    "LoadImage": {
+        "input": {"required": {"image": [["example.png", "retexturity_input.png"], {"image_upload": True}]}},
+        "output": ["IMAGE", "MASK"],
+    },
+    "CheckpointLoaderSimple": {
+        "input": {"required": {"ckpt_name": [["model_a.safetensors", "model_b.safetensors"]]}},
+        "output": ["MODEL"],
+    },
+    "KSampler": {
+        "input": {"required": {
+            "model": ["MODEL"],
+            "steps": ["INT", {"default": 20, "min": 1, "max": 100}],
+        }},
+        "output": ["LATENT"],
+    },
+}
+
+
+def prompt(image="example.png", ckpt="model_a.safetensors", steps=20):
+    return {
+        "1": {"class_type": "LoadImage", "inputs": {"image": image}},
+        "2": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": ckpt}},
+        "3": {"class_type": "KSampler", "inputs": {"model": ["2", 0], "steps": steps}},
+    }
+
+
+class ValidatePromptTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SchemaIndex(OBJECT_INFO)
+
+    def test_valid_prompt(self):
+        self.assertEqual(validate_prompt(prompt(), self.index), [])
+
+    def test_uploaded_name_not_in_cached_options(self):
+        # ComfyUI renamed a re-upload with different content
+        self.assertEqual(validate_prompt(prompt(image="retexturity_input (3).png"), self.index), [])
+
+    def test_skipped_input_is_not_checked(self):
+        errors = validate_prompt(prompt(ckpt="uploaded.safetensors"), self.index, skip={("2", "ckpt_name")})
+        self.assertEqual(errors, [])
+
+    def test_unknown_option_is_rejected(self):
+        errors = validate_prompt(prompt(ckpt="model_c.safetensors"), self.index)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("'model_c.safetensors' is not a valid option", errors[0])
+
+    def test_out_of_range_value(self):
+        errors = validate_prompt(prompt(steps=0), self.index)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("below the minimum", errors[0])
+
+    def test_missing_link_target(self):
+        bad = prompt()
+        del bad["2"]
+        errors = validate_prompt(bad, self.index)
+        self.assertTrue(any("links to missing node 2" in e for e in errors))
+
+
+if __name__ == "__main__":
+    unittest.main()